@@ -17,23 +17,68 @@ import json
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QTimer, Qt
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton,
-    QLabel, QFileDialog, QListWidget, QListWidgetItem,
-    QStackedWidget, QMessageBox, QSizePolicy, QTextEdit,
-    QComboBox, QHBoxLayout, QFrame, QSplitter, QGridLayout,
-    QScrollArea, QSlider
-)
-from PyQt6.QtGui import QPixmap
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+
+# Qt n'est indispensable qu'à l'interface : les rapports en ligne de commande et
+# les processus de calcul (qui réimportent ce module) se contentent de pandas,
+# numpy et matplotlib (Agg), même sur une machine sans écran ni bibliothèques X.
+try:
+    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+    from PyQt6.QtCore import (
+        QTimer, Qt, QThread, QObject, pyqtSignal, pyqtSlot, QFileSystemWatcher, QCoreApplication
+    )
+    from PyQt6.QtWidgets import (
+        QApplication, QWidget, QVBoxLayout, QPushButton,
+        QLabel, QFileDialog, QListWidget, QListWidgetItem,
+        QStackedWidget, QMessageBox, QSizePolicy, QTextEdit,
+        QComboBox, QHBoxLayout, QFrame, QSplitter, QGridLayout,
+        QScrollArea, QSlider, QDialog, QMenu
+    )
+    from PyQt6.QtGui import QPainter, QPixmap
+    QT_AVAILABLE = True
+except ImportError as e:
+    QT_AVAILABLE = False
+    QT_IMPORT_ERROR = e
+
+    class QtUnavailable:
+        """Remplace les classes de base Qt quand PyQt6 ne peut pas être chargé"""
+
+        def __init__(self, *args, **kwargs):
+            raise ImportError(f"PyQt6 est nécessaire pour cette fonction: {QT_IMPORT_ERROR}")
+
+    QObject = QThread = QWidget = QDialog = QtUnavailable
+
+    def pyqtSignal(*types):
+        return None
+
+    def pyqtSlot(*types):
+        return lambda function: function
+
+# La carte (QtWebEngine, Chromium) doit être chargée avant la création de QApplication
+try:
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    from PyQt6.QtWebChannel import QWebChannel
+except ImportError as e:
+    QWebEngineView = QWebChannel = None
+    WEB_ENGINE_IMPORT_ERROR = e
+
 from datetime import datetime
 import locale
 import math
-from PyQt6.QtGui import QPainter, QPixmap
-from PyQt6.QtCore import Qt
 import shutil  
+import hashlib
+import threading
+import multiprocessing
+import mimetypes
+import argparse
+import time
+import signal
+import io
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 # Configuration locale pour les dates en français
 try:
@@ -46,6 +91,59 @@ except:
 
 DATA_FOLDER = "data_sessions"
 RECENT_FILE_PATH = os.path.join(DATA_FOLDER, "recent_files.json")
+CACHE_FOLDER = os.path.join(DATA_FOLDER, "cache")
+CACHE_VERSION = 2  # À incrémenter si le nettoyage ou le format du cache change
+CATALOG_PATH = os.path.join(DATA_FOLDER, "catalog.json")
+IMPORT_INDEX_PATH = os.path.join(DATA_FOLDER, "import_index.json")
+INBOX_SETTINGS_PATH = os.path.join(DATA_FOLDER, "inbox.json")
+
+RANGE_PREVIEW_INTERVAL_MS = 16  # Aperçu de plage limité à ~60 images/s
+RANGE_SETTLE_DELAY_MS = 200  # Recalcul complet quand le glissement se stabilise
+HOVER_INTERVAL_MS = 16  # Survol des graphiques traité à ~60 images/s au plus
+
+# Carte hors ligne : Leaflet et tuiles servis en local depuis un cache disque
+MAP_CACHE_FOLDER = os.path.join(DATA_FOLDER, "map_cache")
+LEAFLET_URL = "https://unpkg.com/leaflet@1.9.4/dist/"
+# Seuls fichiers Leaflet servis (et préchargés) : la page et les images de son CSS
+LEAFLET_ASSETS = (
+    "leaflet.js", "leaflet.css",
+    "images/marker-icon.png", "images/marker-icon-2x.png", "images/marker-shadow.png",
+    "images/layers.png", "images/layers-2x.png",
+)
+TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+MAP_USER_AGENT = "StyxAnalyse/1.0"  # Exigé par la politique d'usage des tuiles OSM
+TILE_CACHE_MAX_BYTES = 500 * 1024 * 1024  # Au-delà, les tuiles les moins récemment vues sont supprimées
+PREFETCH_ZOOMS = (13, 14, 15, 16)
+PREFETCH_MAX_TILES = 400  # Par session, pour rester raisonnable envers le serveur de tuiles
+
+# Types des colonnes STYX connues : lecture sans inférence et mémoire réduite de moitié.
+# Temps, GPS, compteurs d'énergie et distances restent en float64 (sommes et
+# cumuls) ; les colonnes inconnues gardent les types déduits par pandas.
+STYX_DTYPES = {
+    "Temps": "float64", "Lat": "float64", "Lon": "float64",
+    "WHCharged": "float64", "WHDischarged": "float64",
+    "Distance": "float64", "Distance_GPS": "float64",
+    "Tension": "float32", "Vitesse": "float32", "CurrentIn": "float32", "MotorCurrent": "float32",
+    "Alt": "float32", "Vsat": "float32", "Cap": "float32", "HDOP": "float32",
+    # int16 et non int8 : pandas ne contrôle pas les débordements et ferait
+    # silencieusement de 200 (gaz/frein sur 0-255) la valeur -56
+    "GazFrein": "int16", "Sat": "int16", "Heure": "int32", "Date": "int32",
+}
+# Schémas essayés tour à tour : complet, sans les entiers (valeur manquante ou
+# date texte dans le fichier), puis inférence de pandas
+STYX_DTYPE_FALLBACKS = (
+    STYX_DTYPES,
+    {col: dtype for col, dtype in STYX_DTYPES.items() if dtype.startswith("float")},
+    None,
+)
+
+# Import par blocs : les gros CSV sont lus, nettoyés et écrits par morceaux
+STREAMING_IMPORT_MIN_BYTES = 64 * 1024 * 1024
+IMPORT_CHUNK_ROWS = 100_000
+
+# Dossier de dépôt surveillé : un CSV est importé quand sa taille et sa date
+# de modification n'ont pas bougé pendant ce délai (copie terminée)
+INBOX_SETTLE_MS = 2000
 
 os.makedirs(DATA_FOLDER, exist_ok=True)
 
@@ -110,46 +208,121 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     
     return R * c
 
-def calculate_gps_distance(df):
-    """Calcule la distance cumulée à partir des coordonnées GPS"""
+def haversine_segments(lat, lon):
+    """Calcule en une passe NumPy la longueur (m) de chaque segment entre points consécutifs"""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if len(lat) < 2:
+        return np.zeros(0)
+
+    # Rayon de la Terre en mètres
+    R = 6371000
+
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    dlat = np.diff(lat_rad)
+    dlon = np.diff(lon_rad)
+
+    # Formule de Haversine (identique à haversine_distance)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_rad[:-1]) * np.cos(lat_rad[1:]) * np.sin(dlon / 2) ** 2
+    a = np.clip(a, 0.0, 1.0)
+    segments = R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    # Un segment touchant un point GPS manquant compte pour 0, comme avant
+    return np.where(np.isnan(segments), 0.0, segments)
+
+def calculate_gps_distance(df, state=None):
+    """Calcule la distance cumulée à partir des coordonnées GPS
+
+    Avec state (import par blocs), la distance repart du dernier point du bloc précédent.
+    """
     if "Lat" not in df.columns or "Lon" not in df.columns:
         return df
-    
-    distances = [0]  # Premier point à distance 0
-    total_distance = 0
-    
-    for i in range(1, len(df)):
-        dist = haversine_distance(
-            df.iloc[i-1]["Lat"], df.iloc[i-1]["Lon"],
-            df.iloc[i]["Lat"], df.iloc[i]["Lon"]
-        )
-        total_distance += dist
-        distances.append(total_distance)
-    
+
+    lat = df["Lat"].to_numpy(dtype=np.float64)
+    lon = df["Lon"].to_numpy(dtype=np.float64)
+    if state is None:
+        distances = np.zeros(len(df))  # Premier point à distance 0
+        distances[1:] = np.cumsum(haversine_segments(lat, lon))
+    elif len(df):
+        # Le segment reliant le bloc précédent au premier point de celui-ci est compté ici
+        segments = haversine_segments(np.r_[state.last_lat, lat], np.r_[state.last_lon, lon])
+        distances = state.distance + np.cumsum(segments)
+        state.distance = float(distances[-1])
+        state.last_lat, state.last_lon = lat[-1], lon[-1]
+    else:
+        distances = np.zeros(0)
+
     df["Distance_GPS"] = distances
     return df
 
-def clean_data(df):
-    """Nettoie les données en supprimant les valeurs aberrantes"""
-    df_clean = df.copy()
+class RunningMedian:
+    """Médiane approchée d'une colonne lue par blocs (histogramme au pas de resolution)"""
+
+    def __init__(self, upper, resolution=0.01):
+        self.resolution = resolution
+        # Dernière case : toutes les valeurs au-delà de upper
+        self.counts = np.zeros(int(round(upper / resolution)) + 2, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        bins = np.clip(np.rint(values / self.resolution), 0, len(self.counts) - 1).astype(np.int64)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    def median(self):
+        total = self.counts.sum()
+        if total == 0:
+            return np.nan
+        k = int(np.searchsorted(np.cumsum(self.counts), (total + 1) / 2))
+        return min(k, len(self.counts) - 2) * self.resolution
+
+class ImportState:
+    """État reporté d'un bloc au suivant pendant un import par blocs"""
+
+    def __init__(self):
+        self.medians = {"Vitesse": RunningMedian(80), "Tension": RunningMedian(50)}
+        self.last_alt = np.nan
+        self.last_lat = np.nan
+        self.last_lon = np.nan
+        self.distance = 0.0
+
+def column_median(df, col, state=None):
+    """Médiane d'une colonne, estimée sur tous les blocs déjà lus si state est fourni"""
+    if state is None:
+        return df[col].median()
+    state.medians[col].update(df[col].to_numpy())
+    return state.medians[col].median()
+
+def clean_data(df, state=None):
+    """Nettoie les données en supprimant les valeurs aberrantes
+
+    Avec state (import par blocs), le bloc est nettoyé sur place : les médianes
+    et la dernière altitude viennent des blocs déjà traités.
+    """
+    df_clean = df.copy() if state is None else df
     
     # Vitesse : valeurs négatives et > 80 km/h considérées comme aberrantes
     if "Vitesse" in df_clean.columns:
         df_clean.loc[df_clean["Vitesse"] < 0, "Vitesse"] = 0
-        df_clean.loc[df_clean["Vitesse"] > 80, "Vitesse"] = df_clean["Vitesse"].median()
+        df_clean.loc[df_clean["Vitesse"] > 80, "Vitesse"] = column_median(df_clean, "Vitesse", state)
     
     # Tension : valeurs < 0 ou > 50V considérées comme aberrantes
     if "Tension" in df_clean.columns:
         df_clean.loc[df_clean["Tension"] < 0, "Tension"] = 0
-        df_clean.loc[df_clean["Tension"] > 50, "Tension"] = df_clean["Tension"].median()
+        df_clean.loc[df_clean["Tension"] > 50, "Tension"] = column_median(df_clean, "Tension", state)
     
     # Altitude : variations trop importantes
-    if "Alt" in df_clean.columns:
+    if "Alt" in df_clean.columns and len(df_clean):
         # Supprimer les sauts d'altitude > 100m d'un point à l'autre
         alt_diff = df_clean["Alt"].diff().abs()
+        if state is not None:
+            alt_diff.iloc[0] = abs(df_clean["Alt"].iloc[0] - state.last_alt)
         outliers = alt_diff > 100
         if outliers.any():
             df_clean.loc[outliers, "Alt"] = df_clean["Alt"].interpolate()
+        if state is not None:
+            state.last_alt = df_clean["Alt"].iloc[-1]
     
     # Coordonnées GPS : valeurs hors limites
     if "Lat" in df_clean.columns:
@@ -165,6 +338,13 @@ def clean_data(df):
     
     return df_clean
 
+def cumulative_energy(values):
+    """Retourne l'énergie cumulée : telle quelle si déjà cumulative, sinon cumsum"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) > 1 and np.all(np.diff(values) >= 0) and values[-1] > values[0]:
+        return values  # Déjà cumulatif
+    return np.cumsum(values)  # Calculer le cumulatif
+
 def format_session_name(filename):
     """Formate le nom de session pour l'affichage"""
     try:
@@ -178,7 +358,818 @@ def format_session_name(filename):
         return filename
 
 
+def read_styx_csv(path, **kwargs):
+    """Lit un CSV STYX avec le schéma compact le plus strict auquel il se conforme"""
+    for dtype in STYX_DTYPE_FALLBACKS[:-1]:
+        try:
+            return pd.read_csv(path, dtype=dtype, **kwargs)
+        except pd.errors.ParserError:
+            raise  # Fichier mal formé : aucun schéma n'y changera rien
+        except (ValueError, OverflowError) as e:
+            print(f"Schéma compact non applicable à {path}: {e}")
+    return pd.read_csv(path, **kwargs)
+
+
+# --- Cache binaire des sessions (fichiers .npz à côté des CSV) ---
+def file_fingerprint(path):
+    """Empreinte rapide d'un fichier : taille et date de modification"""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def file_content_hash(path, chunk_size=1 << 20):
+    """Calcule le hash SHA-1 du contenu d'un fichier, lu par blocs"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def session_cache_path(csv_path):
+    """Chemin du cache binaire associé à un fichier de session"""
+    base_name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(CACHE_FOLDER, base_name + ".npz")
+
+def write_session_cache(csv_path, df):
+    """Écrit le DataFrame nettoyé (avec Distance_GPS) dans un cache colonne par colonne"""
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        meta = {
+            "version": CACHE_VERSION,
+            "source": file_fingerprint(csv_path),
+            "hash": file_content_hash(csv_path),
+            "columns": [str(col) for col in df.columns],
+        }
+        arrays = {"__meta__": np.array(json.dumps(meta))}
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            arrays[f"c{i}"] = values
+
+        # Écriture atomique : un lecteur ne voit jamais un cache à moitié écrit
+        cache_path = session_cache_path(csv_path)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, cache_path)
+        return meta
+    except Exception as e:
+        print(f"Erreur écriture cache {csv_path}: {e}")
+        return None
+
+def read_session_cache(csv_path):
+    """Lit le cache d'une session s'il est à jour, sinon retourne None"""
+    cache_path = session_cache_path(csv_path)
+    if not os.path.exists(cache_path) or not os.path.exists(csv_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            meta = json.loads(str(data["__meta__"]))
+            if meta.get("version") != CACHE_VERSION:
+                return None
+            df = pd.DataFrame({col: data[f"c{i}"] for i, col in enumerate(meta["columns"])})
+    except Exception as e:
+        print(f"Cache illisible {cache_path}: {e}")
+        return None
+
+    # Taille + mtime identiques : cache valide sans relire le CSV
+    if meta["source"] == file_fingerprint(csv_path):
+        return df
+
+    # Fichier touché mais peut-être pas modifié : on compare le contenu
+    if meta["source"]["size"] == os.path.getsize(csv_path) and meta.get("hash") == file_content_hash(csv_path):
+        write_session_cache(csv_path, df)
+        return df
+    return None
+
+def delete_session_cache(csv_path):
+    """Supprime le cache binaire d'une session"""
+    cache_path = session_cache_path(csv_path)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+
+def load_session_data(csv_path):
+    """Charge une session nettoyée avec Distance_GPS, depuis le cache si possible"""
+    df = read_session_cache(csv_path)
+    if df is not None:
+        return df
+
+    df = read_styx_csv(csv_path)
+    df_clean = clean_data(df)
+    df_final = calculate_gps_distance(df_clean)
+    write_session_cache(csv_path, df_final)
+    return df_final
+
+
+# --- Index temporel (curseur) ---
+class TimeIndex:
+    """Échantillon le plus proche d'un instant, par dichotomie sur Temps.
+
+    Temps est normalement croissant (avec parfois des horodatages répétés) :
+    la recherche est alors en O(log n). Sinon, on revient au parcours linéaire.
+    En cas d'égalité, le premier échantillon est retenu, comme np.nanargmin.
+    """
+
+    def __init__(self, times):
+        self.times = np.asarray(times, dtype=np.float64)
+        # Faux aussi si Temps contient des NaN
+        self.monotonic = len(self.times) < 2 or bool(np.all(self.times[1:] >= self.times[:-1]))
+
+    def nearest(self, time_value, start=0, end=None):
+        """Indice global le plus proche de time_value dans [start, end]"""
+        end = len(self.times) - 1 if end is None else end
+        window = self.times[start:end + 1]
+        if not self.monotonic:
+            return start + int(np.nanargmin(np.abs(window - time_value)))
+
+        i = int(np.searchsorted(window, time_value, side="left"))
+        if i == len(window) or (i > 0 and time_value - window[i - 1] <= window[i] - time_value):
+            # Le voisin de gauche est plus proche : premier de sa série d'horodatages
+            i = int(np.searchsorted(window, window[i - 1], side="left"))
+        return start + i
+
+
+# --- Vue sur une plage de session (sans copie) ---
+class SessionView:
+    """Fenêtre [start, end] sur les colonnes d'une session chargée.
+
+    Les colonnes sont des tranches NumPy des tableaux complets : changer de
+    plage ne copie aucune donnée. Les indices manipulés par l'interface sont
+    locaux à la vue ; to_global/to_local font la conversion.
+    """
+
+    def __init__(self, df, start=0, end=None, arrays=None, time_index=None):
+        self.df = df
+        self.columns = df.columns
+        self.arrays = arrays if arrays is not None else {col: df[col].to_numpy() for col in df.columns}
+        self.start = start
+        self.end = len(df) - 1 if end is None else end
+        if time_index is None and "Temps" in self.arrays:
+            time_index = TimeIndex(self.arrays["Temps"])
+        self.time_index = time_index  # Construit une fois par session, partagé par les vues
+
+    def __len__(self):
+        return max(0, self.end - self.start + 1)
+
+    def __getitem__(self, column):
+        return self.arrays[column][self.start:self.end + 1]
+
+    def with_range(self, start, end):
+        """Nouvelle vue sur les mêmes données, pour une autre plage"""
+        return SessionView(self.df, start, end, self.arrays, self.time_index)
+
+    def to_global(self, index):
+        return self.start + index
+
+    def to_local(self, index):
+        return index - self.start
+
+    def nearest_index(self, time_value):
+        """Indice local de l'échantillon le plus proche de time_value"""
+        return self.time_index.nearest(time_value, self.start, self.end) - self.start
+
+    def row(self, index):
+        """Valeurs de toutes les colonnes pour un indice local"""
+        position = self.start + index
+        return {col: values[position] for col, values in self.arrays.items()}
+
+    def to_frame(self):
+        """Copie de la plage sous forme de DataFrame (pour l'export uniquement)"""
+        return self.df.iloc[self.start:self.end + 1].reset_index(drop=True)
+
+
+# --- Index de statistiques par plage ---
+class RangeExtremaIndex:
+    """Min ou max sur une plage quelconque en temps quasi constant.
+
+    Les données sont découpées en blocs ; une table creuse sur les extrema
+    des blocs répond pour les blocs complets, et seuls les deux blocs
+    partiels aux extrémités sont parcourus. La mémoire reste en O(n / bloc).
+    """
+
+    BLOCK_SIZE = 256
+
+    def __init__(self, values, use_max=True):
+        self.reduce = np.maximum if use_max else np.minimum
+        self.array_reduce = np.max if use_max else np.min
+        # Les NaN sont ignorés, comme les réductions pandas
+        neutral = -np.inf if use_max else np.inf
+        self.neutral = neutral
+        self.values = np.where(np.isnan(values), neutral, values).astype(np.float64)
+
+        n_blocks = max(1, -(-len(self.values) // self.BLOCK_SIZE))
+        padded = np.full(n_blocks * self.BLOCK_SIZE, neutral)
+        padded[:len(self.values)] = self.values
+        level = self.array_reduce(padded.reshape(n_blocks, self.BLOCK_SIZE), axis=1)
+        self.levels = [level]
+        width = 1
+        while 2 * width <= n_blocks:
+            level = self.reduce(level[:-width], level[width:])
+            self.levels.append(level)
+            width *= 2
+
+    def blocks_query(self, first, last):
+        """Extremum des blocs complets first..last (inclus)"""
+        k = (last - first + 1).bit_length() - 1
+        level = self.levels[k]
+        return self.reduce(level[first], level[last - (1 << k) + 1])
+
+    def query(self, start, end):
+        """Extremum des valeurs start..end (inclus), NaN si aucune valeur"""
+        start, end = int(start), int(end)
+        B = self.BLOCK_SIZE
+        first_block = -(-start // B)
+        last_block = (end + 1) // B - 1
+        if first_block > last_block:
+            result = self.array_reduce(self.values[start:end + 1])
+        else:
+            result = self.blocks_query(first_block, last_block)
+            head = self.values[start:first_block * B]
+            tail = self.values[(last_block + 1) * B:end + 1]
+            if len(head):
+                result = self.reduce(result, self.array_reduce(head))
+            if len(tail):
+                result = self.reduce(result, self.array_reduce(tail))
+        return np.nan if result == self.neutral else float(result)
+
+
+class SessionStatsIndex:
+    """Statistiques d'une session pour n'importe quelle plage [start, end].
+
+    Construit une fois au chargement : sommes cumulées pour les moyennes et
+    totaux, RangeExtremaIndex pour les min/max.
+    """
+
+    SUM_COLUMNS = ["Vitesse", "Tension", "WHCharged", "WHDischarged"]
+    MAX_COLUMNS = ["Vitesse", "Alt", "CurrentIn"]
+    MIN_COLUMNS = ["Alt"]
+
+    def __init__(self, session):
+        self.session = session
+        self.prefix_sums = {}
+        self.prefix_counts = {}
+        for col in self.SUM_COLUMNS:
+            if col in session.columns:
+                values = session.arrays[col].astype(np.float64)
+                valid = ~np.isnan(values)
+                self.prefix_sums[col] = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+                self.prefix_counts[col] = np.concatenate(([0], np.cumsum(valid)))
+        self.max_index = {col: RangeExtremaIndex(session.arrays[col].astype(np.float64), use_max=True)
+                          for col in self.MAX_COLUMNS if col in session.columns}
+        self.min_index = {col: RangeExtremaIndex(session.arrays[col].astype(np.float64), use_max=False)
+                          for col in self.MIN_COLUMNS if col in session.columns}
+
+    def range_sum(self, col, start, end):
+        if col not in self.prefix_sums:
+            return 0
+        return self.prefix_sums[col][end + 1] - self.prefix_sums[col][start]
+
+    def range_mean(self, col, start, end):
+        if col not in self.prefix_sums:
+            return 0
+        count = self.prefix_counts[col][end + 1] - self.prefix_counts[col][start]
+        return self.range_sum(col, start, end) / count if count else np.nan
+
+    def range_max(self, col, start, end):
+        return self.max_index[col].query(start, end) if col in self.max_index else 0
+
+    def range_min(self, col, start, end):
+        return self.min_index[col].query(start, end) if col in self.min_index else 0
+
+    def summary(self, start, end):
+        """Résumé de la plage [start, end] (indices globaux, inclus)"""
+        arrays = self.session.arrays
+        stats = {}
+
+        if "Distance_GPS" in arrays:
+            stats['distance'] = arrays["Distance_GPS"][end] - arrays["Distance_GPS"][start]
+            stats['distance_type'] = "GPS"
+        elif "Distance" in arrays:
+            stats['distance'] = arrays["Distance"][end] - arrays["Distance"][start]
+            stats['distance_type'] = "capteur"
+        else:
+            stats['distance'] = 0
+            stats['distance_type'] = "N/A"
+
+        temps_start = arrays["Temps"][start] if "Temps" in arrays else 0
+        temps_end = arrays["Temps"][end] if "Temps" in arrays else 0
+        stats['duree'] = (temps_end - temps_start) / 60
+        stats['temps_debut'] = temps_start
+        stats['temps_fin'] = temps_end
+
+        stats['vitesse_moy'] = self.range_mean("Vitesse", start, end)
+        stats['vitesse_max'] = self.range_max("Vitesse", start, end)
+
+        stats['alt_max'] = self.range_max("Alt", start, end)
+        stats['alt_min'] = self.range_min("Alt", start, end)
+        stats['denivele'] = stats['alt_max'] - stats['alt_min']
+
+        stats['wh_charged'] = self.range_sum("WHCharged", start, end)
+        stats['wh_discharged'] = self.range_sum("WHDischarged", start, end)
+
+        stats['tension_moy'] = self.range_mean("Tension", start, end)
+        stats['current_max'] = self.range_max("CurrentIn", start, end)
+        return stats
+
+
+# --- Index spatial (clics sur la carte) ---
+class SpatialGridIndex:
+    """Point GPS le plus proche d'une position, limité à une plage [start, end].
+
+    Les points valides sont projetés en mètres (équirectangulaire local) et
+    rangés dans une grille uniforme d'environ POINTS_PER_CELL points par case.
+    Dans chaque case, les indices sont triés : le filtrage par plage est une
+    dichotomie. La recherche parcourt des anneaux de cases autour du clic et
+    s'arrête dès qu'aucune case restante ne peut contenir un point plus proche.
+    """
+
+    POINTS_PER_CELL = 8
+
+    def __init__(self, latitudes, longitudes):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+        self.indices = np.flatnonzero(valid)
+        self.size = len(self.indices)
+        if self.size == 0:
+            return
+
+        self.lat0 = float(np.mean(latitudes[valid]))
+        self.x, self.y = self.project(latitudes[valid], longitudes[valid])
+        self.x_min, self.y_min = self.x.min(), self.y.min()
+        width = max(self.x.max() - self.x_min, 1.0)
+        height = max(self.y.max() - self.y_min, 1.0)
+        self.cell = max(math.sqrt(width * height * self.POINTS_PER_CELL / self.size), 1.0)
+        self.nx = int(width // self.cell) + 1
+        self.ny = int(height // self.cell) + 1
+
+        cx = ((self.x - self.x_min) // self.cell).astype(np.int64)
+        cy = ((self.y - self.y_min) // self.cell).astype(np.int64)
+        cell_ids = cy * self.nx + cx
+        # Tri stable : dans une case, les points restent dans l'ordre du temps
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.cell_starts = np.searchsorted(cell_ids[self.order], np.arange(self.nx * self.ny + 1))
+
+    def project(self, lat, lon):
+        """Coordonnées locales en mètres"""
+        return (np.asarray(lon) * 111320.0 * math.cos(math.radians(self.lat0)),
+                np.asarray(lat) * 110540.0)
+
+    def cell_candidates(self, cx, cy, start, end):
+        """Positions (dans les points valides) d'une case, limitées à la plage"""
+        cell_id = cy * self.nx + cx
+        members = self.order[self.cell_starts[cell_id]:self.cell_starts[cell_id + 1]]
+        session_indices = self.indices[members]
+        lo = np.searchsorted(session_indices, start, side="left")
+        hi = np.searchsorted(session_indices, end, side="right")
+        return members[lo:hi]
+
+    def nearest_bruteforce(self, qx, qy, start, end):
+        lo = np.searchsorted(self.indices, start, side="left")
+        hi = np.searchsorted(self.indices, end, side="right")
+        if lo >= hi:
+            return None
+        d = (self.x[lo:hi] - qx) ** 2 + (self.y[lo:hi] - qy) ** 2
+        return int(self.indices[lo + int(np.argmin(d))])
+
+    def nearest(self, lat, lon, start=0, end=None):
+        """Indice de session du point valide le plus proche dans [start, end] (None si aucun)"""
+        if self.size == 0:
+            return None
+        end = int(self.indices[-1]) if end is None else end
+        qx, qy = self.project(lat, lon)
+        qx, qy = float(qx), float(qy)
+        fx = (qx - self.x_min) / self.cell
+        fy = (qy - self.y_min) / self.cell
+        ccx = min(max(int(math.floor(fx)), 0), self.nx - 1)
+        ccy = min(max(int(math.floor(fy)), 0), self.ny - 1)
+
+        # Une case coûte quelques µs en Python, un point de la plage quelques ns en
+        # NumPy : au-delà de ce nombre de cases, le parcours vectorisé est moins cher
+        max_cells = max(16, (end - start + 1) // 512)
+        visited = 0
+        best, best_d = None, math.inf
+        r = 0
+        while True:
+            x0, x1 = ccx - r, ccx + r
+            y0, y1 = ccy - r, ccy + r
+            ring = []
+            for cy in range(max(y0, 0), min(y1, self.ny - 1) + 1):
+                if cy in (y0, y1):
+                    xs = range(max(x0, 0), min(x1, self.nx - 1) + 1)
+                else:
+                    xs = [cx for cx in (x0, x1) if 0 <= cx < self.nx]
+                for cx in xs:
+                    candidates = self.cell_candidates(cx, cy, start, end)
+                    if len(candidates):
+                        ring.append(candidates)
+                    visited += 1
+            if ring:
+                members = np.concatenate(ring)
+                d = (self.x[members] - qx) ** 2 + (self.y[members] - qy) ** 2
+                d_min = float(d.min())
+                # À distance égale (points à l'arrêt), le premier échantillon gagne
+                candidate = int(self.indices[members[d == d_min]].min())
+                if d_min < best_d or (d_min == best_d and candidate < best):
+                    best, best_d = candidate, d_min
+
+            # Distance minimale aux cases pas encore parcourues
+            bounds = []
+            if x0 > 0:
+                bounds.append(qx - (self.x_min + x0 * self.cell))
+            if x1 < self.nx - 1:
+                bounds.append(self.x_min + (x1 + 1) * self.cell - qx)
+            if y0 > 0:
+                bounds.append(qy - (self.y_min + y0 * self.cell))
+            if y1 < self.ny - 1:
+                bounds.append(self.y_min + (y1 + 1) * self.cell - qy)
+            if not bounds:
+                return best
+            remaining = max(min(bounds), 0.0)
+            if best is not None and best_d <= remaining ** 2:
+                return best
+            if visited > max_cells:
+                return self.nearest_bruteforce(qx, qy, start, end)
+            r += 1
+
+
+# --- Simplification du tracé GPS ---
+TRACK_MIN_TOLERANCE_M = 0.1  # Écart sous lequel un point n'est jamais tracé (arrêts, doublons)
+TRACK_MAX_IMPORTANCE_M = 1e7  # Importance des extrémités (toujours affichées)
+
+def douglas_peucker_importance(latitudes, longitudes, min_tolerance=TRACK_MIN_TOLERANCE_M):
+    """Importance (en mètres) de chaque point du tracé, au sens de Douglas–Peucker.
+
+    Un point est conservé par une simplification de tolérance t si son
+    importance est >= t : il suffit donc de filtrer ce tableau pour obtenir le
+    tracé adapté à un niveau de zoom. Les points invalides et ceux qui ne
+    s'écartent pas de plus de min_tolerance (arrêts, doublons) valent 0.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    importance = np.zeros(len(latitudes))
+    valid = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+    if len(valid) == 0:
+        return importance
+
+    lat0 = math.radians(float(np.mean(latitudes[valid])))
+    x = longitudes[valid] * 111320.0 * math.cos(lat0)
+    y = latitudes[valid] * 110540.0
+    point_importance = np.zeros(len(valid))
+    point_importance[0] = point_importance[-1] = TRACK_MAX_IMPORTANCE_M
+
+    stack = [(0, len(valid) - 1, TRACK_MAX_IMPORTANCE_M)]
+    while stack:
+        a, b, parent = stack.pop()
+        if b - a < 2:
+            continue
+        # Distance des points intermédiaires au segment [a, b]
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        px, py = x[a + 1:b] - x[a], y[a + 1:b] - y[a]
+        length2 = dx * dx + dy * dy
+        if length2 > 0:
+            t = np.clip((px * dx + py * dy) / length2, 0.0, 1.0)
+            px, py = px - t * dx, py - t * dy
+        distances = np.hypot(px, py)
+        i = int(np.argmax(distances))
+        if distances[i] < min_tolerance:
+            continue
+        m = a + 1 + i
+        # Un point n'est jamais plus important que le segment qui l'a fait apparaître
+        point_importance[m] = min(distances[i], parent)
+        stack.append((a, m, point_importance[m]))
+        stack.append((m, b, point_importance[m]))
+
+    importance[valid] = point_importance
+    return importance
+
+
+# --- Cache local de la carte (Leaflet et tuiles) ---
+_tile_cache_lock = threading.Lock()
+_tile_cache_size = None  # Taille totale des tuiles en cache, calculée au premier ajout
+_map_server = None
+
+def download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": MAP_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read()
+
+def cached_download(url, path):
+    """Contenu de url : lu depuis path si présent, sinon téléchargé et enregistré.
+
+    Retourne (données, nouveau). La date de modification sert de date de
+    dernier accès pour l'éviction LRU.
+    """
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+            with open(path, "rb") as f:
+                return f.read(), False
+        except OSError:
+            pass  # Supprimé entre-temps par l'éviction : on retélécharge
+    data = download(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return data, True
+
+def tile_cache_files():
+    """(chemin, taille, dernier accès) de chaque tuile en cache"""
+    files = []
+    for root, _, names in os.walk(os.path.join(MAP_CACHE_FOLDER, "tiles")):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((path, stat.st_size, stat.st_mtime))
+    return files
+
+def evict_tiles():
+    """Supprime les tuiles les moins récemment utilisées jusqu'à 90 % du plafond"""
+    global _tile_cache_size
+    files = sorted(tile_cache_files(), key=lambda f: f[2])
+    total = sum(size for _, size, _ in files)
+    for path, size, _ in files:
+        if total <= TILE_CACHE_MAX_BYTES * 0.9:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    _tile_cache_size = total
+
+def tile_cache_path(z, x, y):
+    return os.path.join(MAP_CACHE_FOLDER, "tiles", str(z), str(x), f"{y}.png")
+
+def get_tile(z, x, y):
+    """Tuile PNG depuis le cache disque, téléchargée au premier besoin"""
+    global _tile_cache_size
+    path = tile_cache_path(z, x, y)
+    data, new = cached_download(TILE_URL.format(z=z, x=x, y=y), path)
+    if new:
+        with _tile_cache_lock:
+            if _tile_cache_size is None:
+                _tile_cache_size = sum(size for _, size, _ in tile_cache_files())
+            else:
+                _tile_cache_size += len(data)
+            if _tile_cache_size > TILE_CACHE_MAX_BYTES:
+                evict_tiles()
+    return data
+
+def get_leaflet_asset(name):
+    """Fichier de la distribution Leaflet, conservé sur disque après le premier téléchargement"""
+    if name not in LEAFLET_ASSETS:
+        raise KeyError(name)
+    data, _ = cached_download(LEAFLET_URL + name, os.path.join(MAP_CACHE_FOLDER, "leaflet", name))
+    return data
+
+def tile_xy(lat, lon, zoom):
+    """Coordonnées de la tuile (Web Mercator) contenant un point"""
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tiles_for_bbox(south, west, north, east, zoom):
+    x0, y0 = tile_xy(north, west, zoom)
+    x1, y1 = tile_xy(south, east, zoom)
+    return [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+def prefetch_leaflet_assets():
+    """Télécharge dans le cache tous les fichiers Leaflet de la page carte.
+
+    Retourne False à la première erreur réseau (hors ligne).
+    """
+    for name in LEAFLET_ASSETS:
+        try:
+            get_leaflet_asset(name)
+        except Exception as e:
+            print(f"Préchargement de Leaflet interrompu: {e}")
+            return False
+    return True
+
+def prefetch_session_tiles(csv_path, zooms=PREFETCH_ZOOMS, max_tiles=PREFETCH_MAX_TILES):
+    """Télécharge dans le cache les tuiles couvrant le trajet, niveau par niveau.
+
+    Les niveaux sont pris dans l'ordre tant que le total reste sous max_tiles.
+    S'arrête à la première erreur réseau (hors ligne). Retourne le nombre de tuiles.
+    """
+    df = load_session_data(csv_path)
+    if "Lat" not in df.columns or "Lon" not in df.columns:
+        return 0
+    lat = df["Lat"].to_numpy(dtype=np.float64)
+    lon = df["Lon"].to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    if not valid.any():
+        return 0
+    south, north = lat[valid].min(), lat[valid].max()
+    west, east = lon[valid].min(), lon[valid].max()
+
+    tiles = []
+    for zoom in zooms:
+        zoom_tiles = tiles_for_bbox(south, west, north, east, zoom)
+        if len(tiles) + len(zoom_tiles) > max_tiles:
+            break
+        tiles.extend(zoom_tiles)
+
+    for count, (z, x, y) in enumerate(tiles):
+        try:
+            get_tile(z, x, y)
+        except Exception as e:
+            print(f"Préchargement des tuiles interrompu: {e}")
+            return count
+    return len(tiles)
+
+
+class MapCacheRequestHandler(BaseHTTPRequestHandler):
+    """Sert /leaflet/<fichier> et /tiles/<z>/<x>/<y>.png depuis le cache local"""
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        try:
+            if len(parts) == 4 and parts[0] == "tiles" and parts[3].endswith(".png"):
+                data = get_tile(int(parts[1]), int(parts[2]), int(parts[3][:-4]))
+                content_type = "image/png"
+            elif parts[0] == "leaflet" and "/".join(parts[1:]) in LEAFLET_ASSETS:
+                name = "/".join(parts[1:])
+                data = get_leaflet_asset(name)
+                content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            else:
+                self.send_error(404)
+                return
+        except Exception as e:
+            # Hors ligne et absent du cache : Leaflet laisse la tuile vide
+            self.send_error(502, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Pas de journal par requête
+
+
+def map_server_url():
+    """URL du serveur local de la carte (démarré au premier appel)"""
+    global _map_server
+    if _map_server is None:
+        _map_server = ThreadingHTTPServer(("127.0.0.1", 0), MapCacheRequestHandler)
+        _map_server.daemon_threads = True
+        threading.Thread(target=_map_server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{_map_server.server_address[1]}"
+
+
+# --- Catalogue des résumés de sessions ---
+def compute_session_summary(df):
+    """Calcule le résumé d'une session (distance, durée, énergie, emprise GPS...)"""
+    if "Distance_GPS" in df.columns:
+        distance = df["Distance_GPS"].iloc[-1]
+    elif "Distance" in df.columns:
+        distance = df["Distance"].iloc[-1]
+    else:
+        distance = 0
+
+    summary = {
+        "distance": float(distance) if len(df) else 0.0,
+        "duration": float(df["Temps"].iloc[-1]) if "Temps" in df.columns and len(df) else 0.0,
+        "energy_charged": float(df["WHCharged"].sum()) if "WHCharged" in df.columns else 0.0,
+        "energy_discharged": float(df["WHDischarged"].sum()) if "WHDischarged" in df.columns else 0.0,
+        "start_time": float(df["Temps"].iloc[0]) if "Temps" in df.columns and len(df) else None,
+        "end_time": float(df["Temps"].iloc[-1]) if "Temps" in df.columns and len(df) else None,
+        "bbox": None,
+        "rows": int(len(df)),
+        "schema": hashlib.sha1(
+            ";".join(f"{col}:{dtype}" for col, dtype in df.dtypes.items()).encode("utf-8")
+        ).hexdigest()[:12],
+    }
+
+    if "Lat" in df.columns and "Lon" in df.columns:
+        lat = df["Lat"].dropna()
+        lon = df["Lon"].dropna()
+        if len(lat) and len(lon):
+            # [lat_min, lon_min, lat_max, lon_max]
+            summary["bbox"] = [float(lat.min()), float(lon.min()), float(lat.max()), float(lon.max())]
+
+    return summary
+
+def merge_session_summaries(first, second):
+    """Résumé de deux blocs consécutifs d'une même session (Distance_GPS déjà cumulée)"""
+    if first is None or not first["rows"]:
+        return second
+    if not second["rows"]:
+        return first
+    merged = dict(first)
+    merged["distance"] = second["distance"]
+    merged["duration"] = second["duration"]
+    merged["end_time"] = second["end_time"]
+    merged["energy_charged"] = first["energy_charged"] + second["energy_charged"]
+    merged["energy_discharged"] = first["energy_discharged"] + second["energy_discharged"]
+    merged["rows"] = first["rows"] + second["rows"]
+    if first["bbox"] is None or second["bbox"] is None:
+        merged["bbox"] = first["bbox"] or second["bbox"]
+    else:
+        merged["bbox"] = [min(first["bbox"][0], second["bbox"][0]), min(first["bbox"][1], second["bbox"][1]),
+                          max(first["bbox"][2], second["bbox"][2]), max(first["bbox"][3], second["bbox"][3])]
+    return merged
+
+# --- Fichiers JSON partagés ---
+# Un seul import à la fois (fenêtre, import groupé, dossier surveillé), et ni
+# recalcul, ni revalidation, ni suppression pendant ce temps : l'attribution des
+# noms et les écritures de catalog.json, global_stats.json et import_index.json
+# ne doivent pas s'entrelacer. Réentrant : un import peut supprimer la session
+# qu'il remplace.
+import_lock = threading.RLock()
+
+def save_json(path, data, **kwargs):
+    """Écrit un fichier JSON via un fichier temporaire : jamais lu à moitié écrit"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
+
+def load_catalog():
+    """Charge le catalogue des résumés de sessions"""
+    if os.path.exists(CATALOG_PATH):
+        try:
+            with open(CATALOG_PATH, "r") as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+def save_catalog(catalog):
+    """Sauvegarde le catalogue des résumés de sessions"""
+    save_json(CATALOG_PATH, catalog, indent=2)
+
+def is_catalog_entry_fresh(filename, entry):
+    """Vérifie qu'une entrée du catalogue correspond encore au fichier sur disque"""
+    file_path = os.path.join(DATA_FOLDER, filename)
+    if entry is None or not os.path.exists(file_path):
+        return False
+    return entry.get("source") == file_fingerprint(file_path)
+
+def summarize_session_file(filename, df=None):
+    """Construit l'entrée de catalogue d'un fichier de session"""
+    file_path = os.path.join(DATA_FOLDER, filename)
+    if df is None:
+        df = load_session_data(file_path)
+    entry = compute_session_summary(df)
+    entry["source"] = file_fingerprint(file_path)
+    return entry
+
+def keep_import_date(entry, previous):
+    """Reporte la date d'import d'une ancienne entrée de catalogue sur la nouvelle"""
+    if previous and "imported_at" in previous:
+        entry.setdefault("imported_at", previous["imported_at"])
+    return entry
+
+def session_import_date(filename, catalog):
+    """Jour d'import d'une session (AAAA-MM-JJ) : catalogue, sinon date d'écriture du fichier"""
+    imported_at = (catalog.get(filename) or {}).get("imported_at")
+    if imported_at:
+        return imported_at[:10]
+    return datetime.fromtimestamp(os.path.getmtime(os.path.join(DATA_FOLDER, filename))).strftime("%Y-%m-%d")
+
+def update_catalog_entry(filename, df=None, entry=None):
+    """Ajoute ou remplace l'entrée de catalogue d'un fichier de session"""
+    if entry is None:
+        entry = summarize_session_file(filename, df)
+    catalog = load_catalog()
+    catalog[filename] = keep_import_date(entry, catalog.get(filename))
+    save_catalog(catalog)
+    return entry
+
+def remove_catalog_entry(filename):
+    """Supprime l'entrée de catalogue d'un fichier de session"""
+    catalog = load_catalog()
+    if catalog.pop(filename, None) is not None:
+        save_catalog(catalog)
+
+
 # --- Fonctions de gestion des statistiques globales ---
+# Les totaux de global_stats.json sont la somme d'un registre ("ledger") des
+# contributions de chaque session, indexé par nom de fichier et hash du contenu.
+LEDGER_METRICS = ["distance", "duration", "energy_charged", "energy_discharged"]
+
+def empty_global_stats():
+    """Statistiques globales vides"""
+    return {
+        "total_distance": 0,
+        "total_duration": 0,
+        "total_trips": 0,
+        "total_energy_charged": 0,
+        "total_energy_discharged": 0,
+        "last_updated": datetime.now().isoformat(),
+        "ledger": {}
+    }
+
 def load_global_stats():
     """Charge les statistiques globales depuis un fichier JSON"""
     stats_file = os.path.join(DATA_FOLDER, "global_stats.json")
@@ -190,58 +1181,65 @@ def load_global_stats():
             pass
     
     # Valeurs par défaut
-    return {
-        "total_distance": 0,
-        "total_duration": 0,
-        "total_trips": 0,
-        "total_energy_charged": 0,
-        "total_energy_discharged": 0,
-        "last_updated": datetime.now().isoformat()
-    }
+    return empty_global_stats()
 
 def save_global_stats(stats):
     """Sauvegarde les statistiques globales"""
     stats_file = os.path.join(DATA_FOLDER, "global_stats.json")
     stats["last_updated"] = datetime.now().isoformat()
-    with open(stats_file, "w") as f:
-        json.dump(stats, f, indent=2)
+    save_json(stats_file, stats, indent=2)
+
+def fold_ledger(stats):
+    """Recalcule les totaux en sommant les contributions du registre"""
+    ledger = stats.get("ledger", {})
+    for metric in LEDGER_METRICS:
+        stats[f"total_{metric}"] = sum(entry[metric] for entry in ledger.values())
+    stats["total_trips"] = len(ledger)
+    return stats
+
+def ledger_entry_from_summary(csv_path, summary):
+    """Construit la contribution d'une session à partir de son résumé"""
+    entry = {metric: summary[metric] for metric in LEDGER_METRICS}
+    entry["source"] = file_fingerprint(csv_path)
+    entry["hash"] = file_content_hash(csv_path)
+    return entry
+
+def ledger_entry_for_file(csv_path):
+    """Calcule la contribution d'un fichier de session aux statistiques globales"""
+    filename = os.path.basename(csv_path)
+    summary = load_catalog().get(filename)
+    if not is_catalog_entry_fresh(filename, summary):
+        summary = update_catalog_entry(filename)
+    return ledger_entry_from_summary(csv_path, summary)
+
+def is_ledger_entry_current(csv_path, entry):
+    """Vérifie qu'une contribution du registre correspond encore au fichier"""
+    if entry is None or "hash" not in entry:
+        return False
+    fingerprint = file_fingerprint(csv_path)
+    if entry.get("source") == fingerprint:
+        return True
+    if entry["hash"] == file_content_hash(csv_path):
+        entry["source"] = fingerprint
+        return True
+    return False
 
 def update_global_stats_from_file(csv_path, operation="add"):
     """Met à jour les statistiques globales à partir d'un fichier"""
     try:
-        df = pd.read_csv(csv_path)
-        df_clean = clean_data(df)
-        df_final = calculate_gps_distance(df_clean)
-        
-        # Calculer les métriques du trajet
-        if "Distance_GPS" in df_final.columns:
-            distance = df_final["Distance_GPS"].iloc[-1]
-        elif "Distance" in df_final.columns:
-            distance = df_final["Distance"].iloc[-1]
-        else:
-            distance = 0
-            
-        duration = df_final["Temps"].iloc[-1] if "Temps" in df_final.columns else 0
-        energy_charged = df_final["WHCharged"].sum() if "WHCharged" in df_final.columns else 0
-        energy_discharged = df_final["WHDischarged"].sum() if "WHDischarged" in df_final.columns else 0
-        
-        # Charger les stats actuelles
         stats = load_global_stats()
-        
-        # Mettre à jour selon l'opération
+        if "ledger" not in stats:
+            # Ancien format sans registre : on le reconstruit une fois
+            return recalculate_all_stats()
+
+        filename = os.path.basename(csv_path)
         if operation == "add":
-            stats["total_distance"] += distance
-            stats["total_duration"] += duration
-            stats["total_trips"] += 1
-            stats["total_energy_charged"] += energy_charged
-            stats["total_energy_discharged"] += energy_discharged
+            stats["ledger"][filename] = ledger_entry_for_file(csv_path)
         elif operation == "remove":
-            stats["total_distance"] = max(0, stats["total_distance"] - distance)
-            stats["total_duration"] = max(0, stats["total_duration"] - duration)
-            stats["total_trips"] = max(0, stats["total_trips"] - 1)
-            stats["total_energy_charged"] = max(0, stats["total_energy_charged"] - energy_charged)
-            stats["total_energy_discharged"] = max(0, stats["total_energy_discharged"] - energy_discharged)
-        
+            # Pas besoin de relire le CSV : on retire simplement sa contribution
+            stats["ledger"].pop(filename, None)
+
+        fold_ledger(stats)
         save_global_stats(stats)
         return stats
         
@@ -249,48 +1247,88 @@ def update_global_stats_from_file(csv_path, operation="add"):
         print(f"Erreur mise à jour stats: {e}")
         return load_global_stats()
 
-def recalculate_all_stats():
-    """Recalcule toutes les statistiques en parcourant tous les fichiers"""
-    stats = {
-        "total_distance": 0,
-        "total_duration": 0,
-        "total_trips": 0,
-        "total_energy_charged": 0,
-        "total_energy_discharged": 0,
-        "last_updated": datetime.now().isoformat()
-    }
-    
-    recent_files = load_recent_files()
-    for filename in recent_files:
-        file_path = os.path.join(DATA_FOLDER, filename)
-        if os.path.exists(file_path):
+def make_process_pool(max_workers=None):
+    """Crée un pool de processus (spawn : sûr même avec des threads Qt actifs)"""
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+def compute_session_entries(file_path):
+    """Tâche d'un processus de calcul : résumé de catalogue + contribution au registre"""
+    filename = os.path.basename(file_path)
+    summary = summarize_session_file(filename)
+    return filename, summary, ledger_entry_from_summary(file_path, summary)
+
+def recalculate_all_stats(progress_callback=None, is_cancelled=None, max_workers=None):
+    """Recalcule les statistiques en ne retraitant que les fichiers modifiés.
+
+    Les fichiers à retraiter sont répartis sur un pool de processus.
+    progress_callback(fait, total, fichier, erreur) est appelé après chaque
+    fichier ; is_cancelled() permet d'interrompre le calcul.
+    """
+    with import_lock:
+        old_ledger = load_global_stats().get("ledger", {})
+        stats = empty_global_stats()
+
+        stale_paths = []
+        # Le dossier, pas les récents : limités à 20, ils perdraient des sessions
+        for filename in list_session_files():
+            file_path = os.path.join(DATA_FOLDER, filename)
+            entry = old_ledger.get(filename)
+            # Date changée mais contenu identique (copie, sauvegarde) : pas de recalcul
+            if is_ledger_entry_current(file_path, entry):
+                stats["ledger"][filename] = entry
+            else:
+                stale_paths.append(file_path)
+                # En cas d'annulation, l'ancienne contribution reste en place
+                if entry is not None:
+                    stats["ledger"][filename] = entry
+
+        catalog = load_catalog()
+        total = len(stale_paths)
+        done = 0
+
+        def collect(file_path, compute):
+            nonlocal done
+            error = None
             try:
-                df = pd.read_csv(file_path)
-                df_clean = clean_data(df)
-                df_final = calculate_gps_distance(df_clean)
-                
-                if "Distance_GPS" in df_final.columns:
-                    distance = df_final["Distance_GPS"].iloc[-1]
-                elif "Distance" in df_final.columns:
-                    distance = df_final["Distance"].iloc[-1]
-                else:
-                    distance = 0
-                    
-                duration = df_final["Temps"].iloc[-1] if "Temps" in df_final.columns else 0
-                energy_charged = df_final["WHCharged"].sum() if "WHCharged" in df_final.columns else 0
-                energy_discharged = df_final["WHDischarged"].sum() if "WHDischarged" in df_final.columns else 0
-                
-                stats["total_distance"] += distance
-                stats["total_duration"] += duration
-                stats["total_trips"] += 1
-                stats["total_energy_charged"] += energy_charged
-                stats["total_energy_discharged"] += energy_discharged
-                
+                filename, summary, entry = compute()
+                catalog[filename] = keep_import_date(summary, catalog.get(filename))
+                stats["ledger"][filename] = entry
             except Exception as e:
-                print(f"Erreur traitement {filename}: {e}")
-    
-    save_global_stats(stats)
-    return stats
+                error = str(e)
+                print(f"Erreur traitement {os.path.basename(file_path)}: {e}")
+            done += 1
+            if progress_callback:
+                progress_callback(done, total, os.path.basename(file_path), error)
+
+        if total <= 1 or max_workers == 1:
+            for file_path in stale_paths:
+                if is_cancelled and is_cancelled():
+                    break
+                collect(file_path, lambda: compute_session_entries(file_path))
+        else:
+            with make_process_pool(min(max_workers or os.cpu_count() or 1, total)) as pool:
+                futures = {pool.submit(compute_session_entries, path): path for path in stale_paths}
+                for future in as_completed(futures):
+                    collect(futures[future], future.result)
+                    if is_cancelled and is_cancelled():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        break
+
+        save_catalog(catalog)
+        fold_ledger(stats)
+        save_global_stats(stats)
+        return stats
+
+def list_session_files():
+    """Toutes les sessions du dossier de données, de la plus récente à la plus ancienne"""
+    if not os.path.isdir(DATA_FOLDER):
+        return []
+    return sorted((f for f in os.listdir(DATA_FOLDER) if f.startswith("session_") and f.endswith(".csv")),
+                  reverse=True)
+
 # --- Fonctions de gestion des fichiers récents ---
 def load_recent_files():
     if os.path.exists(RECENT_FILE_PATH):
@@ -303,39 +1341,134 @@ def save_recent_file(new_file):
     if new_file not in recent:
         recent.insert(0, new_file)
     recent = recent[:20]  # Augmenter à 20 fichiers récents
-    with open(RECENT_FILE_PATH, "w") as f:
-        json.dump(recent, f)
+    save_json(RECENT_FILE_PATH, recent)
 
 def remove_recent_file(filename):
     """Supprime un fichier de la liste des récents"""
     recent = load_recent_files()
     if filename in recent:
         recent.remove(filename)
-        with open(RECENT_FILE_PATH, "w") as f:
-            json.dump(recent, f)
+        save_json(RECENT_FILE_PATH, recent)
+
+# --- Index des imports (déduplication par contenu) ---
+# import_index.json associe le hash des lignes de données de chaque fichier
+# importé (source et session nettoyée) au nom de la session créée.
+def import_content_hash(path):
+    """Hash SHA-1 des lignes de données, sans l'en-tête, les espaces ni les lignes vides"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        f.readline()  # En-tête : peut varier d'un export à l'autre
+        for line in f:
+            line = b"".join(line.split())
+            if line:
+                h.update(line + b"\n")
+    return h.hexdigest()
+
+def load_import_index():
+    """Charge l'index hash de contenu -> fichier de session"""
+    if os.path.exists(IMPORT_INDEX_PATH):
+        try:
+            with open(IMPORT_INDEX_PATH, "r") as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+def save_import_index(index):
+    """Sauvegarde l'index des imports"""
+    save_json(IMPORT_INDEX_PATH, index, indent=2)
+
+def find_imported_session(content_hash):
+    """Session déjà importée avec ce contenu, ou None"""
+    filename = load_import_index().get(content_hash)
+    if filename and os.path.exists(os.path.join(DATA_FOLDER, filename)):
+        return filename
+    return None
+
+def unregister_import(filename):
+    """Retire de l'index les hash d'une session supprimée"""
+    index = load_import_index()
+    remaining = {h: name for h, name in index.items() if name != filename}
+    if len(remaining) != len(index):
+        save_import_index(remaining)
+
+# --- Dossier de dépôt surveillé ---
+# inbox.json : dossier choisi et, pour chaque CSV déjà traité, son empreinte
+# (taille, date) et la session qu'il a produite.
+def load_inbox_settings():
+    """Charge la configuration du dossier surveillé"""
+    if os.path.exists(INBOX_SETTINGS_PATH):
+        try:
+            with open(INBOX_SETTINGS_PATH, "r") as f:
+                return json.load(f)
+        except:
+            pass
+    return {"folder": None, "files": {}}
+
+def save_inbox_settings(settings):
+    """Sauvegarde la configuration du dossier surveillé"""
+    save_json(INBOX_SETTINGS_PATH, settings, indent=2)
 
 def delete_session_file(filename):
     """Supprime définitivement un fichier de session"""
-    file_path = os.path.join(DATA_FOLDER, filename)
-    if os.path.exists(file_path):
-        # Mettre à jour les stats avant suppression
-        update_global_stats_from_file(file_path, operation="remove")
-        # Supprimer le fichier
-        os.remove(file_path)
-        # Supprimer de la liste des récents
-        remove_recent_file(filename)
-        return True
-    return False
-
-def handle_new_csv(path, parent=None):
-    import pandas as pd
+    with import_lock:
+        file_path = os.path.join(DATA_FOLDER, filename)
+        if os.path.exists(file_path):
+            # Supprimer le fichier et son cache
+            os.remove(file_path)
+            delete_session_cache(file_path)
+            remove_catalog_entry(filename)
+            unregister_import(filename)
+            # Supprimer de la liste des récents
+            remove_recent_file(filename)
+            # Retirer sa contribution des stats (sans relire le fichier)
+            update_global_stats_from_file(file_path, operation="remove")
+            return True
+        return False
+
+def write_cleaned_chunks(path, output_path, chunk_rows, dtype):
+    """Nettoie path bloc par bloc vers output_path et retourne le résumé de la session"""
+    state = ImportState()
+    summary = None
+    with open(output_path, "w", newline="") as f:
+        for i, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows, dtype=dtype)):
+            chunk = calculate_gps_distance(clean_data(chunk, state), state)
+            chunk.to_csv(f, header=(i == 0), index=False)
+            summary = merge_session_summaries(summary, compute_session_summary(chunk))
+    return summary
+
+def import_csv_streaming(path, destination, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Importe un CSV bloc par bloc : nettoyage, distance GPS et écriture incrémentale.
+
+    La mémoire utilisée dépend de chunk_rows et non de la taille du fichier.
+    Les médianes de nettoyage sont estimées sur les blocs déjà lus. Le cache
+    binaire n'est pas écrit ici (il faudrait tout le DataFrame) : il sera créé
+    à la première ouverture. Retourne le résumé de catalogue de la session.
+    """
+    tmp_path = f"{destination}.{os.getpid()}.tmp"
+    try:
+        for dtype in STYX_DTYPE_FALLBACKS:
+            try:
+                summary = write_cleaned_chunks(path, tmp_path, chunk_rows, dtype)
+                break
+            except pd.errors.ParserError:
+                raise
+            except (ValueError, OverflowError) as e:
+                if dtype is None:
+                    raise
+                print(f"Schéma compact non applicable à {path}: {e}")
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    summary["source"] = file_fingerprint(destination)
+    return summary
+
+def session_start_datetime(df):
+    """Date de début d'une session (heure de Paris), d'après les premières lignes Date/Heure"""
     import datetime
     import pytz
     from dateutil import parser
-    import os
-    from PyQt6.QtWidgets import QMessageBox
-
-    df = pd.read_csv(path)
 
     # Trouver colonnes Date et Heure
     date_col = None
@@ -371,49 +1504,552 @@ def handle_new_csv(path, parent=None):
 
     if not dt:
         dt = datetime.datetime.now(pytz.timezone("Europe/Paris"))
+    return dt
 
-    filename = dt.strftime("session_%Y-%m-%d_%H-%M-%S.csv")
-    destination = os.path.join(DATA_FOLDER, filename)
+def allocate_session_filename(dt, reserved=()):
+    """Nom de session pour un trajet commençant à dt.
 
-    # Test si le fichier existe déjà
-    if os.path.exists(destination):
-        QMessageBox.information(
-            QApplication.activeWindow(),
-            "Fichier déjà importé",
-            f"Le fichier '{format_session_name(filename)}' a déjà été importé."
-        )
-        return destination
+    Un nom déjà pris par une session indexée (contenu différent, puisque le hash
+    est inconnu) ou réservé par le lot en cours est décalé d'une seconde. Un nom
+    pris par une session importée avant l'index est retourné tel quel : on ne
+    peut pas comparer les contenus, l'appelant la considère comme déjà importée.
+    """
+    import datetime
+    indexed_sessions = set(load_import_index().values())
+    while True:
+        filename = dt.strftime("session_%Y-%m-%d_%H-%M-%S.csv")
+        exists = os.path.exists(os.path.join(DATA_FOLDER, filename))
+        if filename not in reserved and not (exists and filename in indexed_sessions):
+            return filename
+        dt += datetime.timedelta(seconds=1)
+
+def inspect_import(path):
+    """Tâche d'un processus d'import : hash du contenu et date de début, sans lire tout le fichier"""
+    return import_content_hash(path), session_start_datetime(read_styx_csv(path, nrows=10))
+
+def build_session_file(path, destination):
+    """Tâche d'un processus d'import : nettoyage, distance GPS, écriture de la session.
+
+    Retourne (résumé de catalogue, contribution au registre, hash de la session) ;
+    les fichiers JSON partagés sont mis à jour par record_imports.
+    """
+    try:
+        if os.path.getsize(path) >= STREAMING_IMPORT_MIN_BYTES:
+            summary = import_csv_streaming(path, destination)
+        else:
+            df_final = calculate_gps_distance(clean_data(read_styx_csv(path)))
+            df_final.to_csv(destination, index=False)
+            write_session_cache(destination, df_final)
+            summary = compute_session_summary(df_final)
+            summary["source"] = file_fingerprint(destination)
+        return summary, ledger_entry_from_summary(destination, summary), import_content_hash(destination)
+    except Exception:
+        # Pas de session à moitié écrite, qui passerait ensuite pour déjà importée
+        if os.path.exists(destination):
+            os.remove(destination)
+            delete_session_cache(destination)
+        raise
+
+def record_imports(imports):
+    """Enregistre des sessions importées : catalogue, index, récents et statistiques.
+
+    imports : liste de (nom de session, hash source, résultat de build_session_file).
+    Chaque fichier JSON n'est écrit qu'une fois, quel que soit le nombre de sessions.
+    """
+    catalog = load_catalog()
+    index = load_import_index()
+    stats = load_global_stats()
+    imported_at = datetime.now().isoformat(timespec="seconds")
+    for filename, source_hash, (summary, ledger_entry, session_hash) in sorted(imports):
+        summary["imported_at"] = imported_at
+        catalog[filename] = summary
+        index[source_hash] = filename
+        index[session_hash] = filename
+        if "ledger" in stats:
+            stats["ledger"][filename] = ledger_entry
+        save_recent_file(filename)
+    save_catalog(catalog)
+    save_import_index(index)
 
-    # Nettoyer les données et calculer la distance GPS
-    df_clean = clean_data(df)
-    df_final = calculate_gps_distance(df_clean)
-    
-    df_final.to_csv(destination, index=False)
-    save_recent_file(os.path.basename(destination))
-    
     # Mettre à jour les statistiques globales
-    update_global_stats_from_file(destination, operation="add")
-    
-    return destination
+    if "ledger" in stats:
+        fold_ledger(stats)
+        save_global_stats(stats)
+    else:
+        # Ancien format sans registre : on le reconstruit une fois
+        recalculate_all_stats()
 
+def handle_new_csv(path):
+    """Importe un CSV du boîtier ; retourne le chemin de la session et s'il était déjà importé.
 
-# --- Page d'accueil avec interface moderne ---
-class HomePage(QWidget):
-    def __init__(self, switch_to_analysis):
-        super().__init__()
-        self.switch_to_analysis = switch_to_analysis
-        self.init_ui()
-        self.refresh_stats()
+    Attend la fin d'un éventuel import en cours (import_lock) : à appeler hors du thread GUI.
+    """
+    # Contenu déjà importé (même sous un autre nom ou avec un autre en-tête) : rien à faire
+    content_hash = import_content_hash(path)
+    with import_lock:
+        filename = find_imported_session(content_hash)
+        if filename is None:
+            filename = allocate_session_filename(session_start_datetime(read_styx_csv(path, nrows=10)))
+        destination = os.path.join(DATA_FOLDER, filename)
+        already_imported = os.path.exists(destination)
+        if not already_imported:
+            record_imports([(filename, content_hash, build_session_file(path, destination))])
+    return destination, already_imported
+
+def import_files(paths, progress_callback=None, is_cancelled=None, max_workers=None, replacing=None):
+    """Importe plusieurs CSV en parallèle et retourne les chemins des sessions créées.
+
+    Hash et dates de début sont calculés dans un pool de processus, puis les
+    noms de session sont attribués ici, doublons du lot compris ; le nettoyage
+    et l'écriture des sessions repartent dans le pool. Catalogue, index,
+    récents et statistiques sont enregistrés une seule fois, à la fin.
+    progress_callback(chemin, statut, détail) est appelé pour chaque fichier,
+    statut valant "importé", "déjà importé" ou "erreur".
+    replacing associe à un chemin la session qu'il avait produite : si son
+    contenu a changé, cette session est supprimée avant l'attribution du nom,
+    qui reste donc le même tant que la date de début ne change pas.
+    """
+    replacing = replacing or {}
 
+    def notify(path, status, detail=""):
+        if progress_callback:
+            progress_callback(path, status, detail)
 
+    def run_all(pool, task, jobs):
+        # Produit (clé, résultat, erreur) au fil des fins de tâche
+        if pool is None:
+            for key, args in jobs.items():
+                if is_cancelled and is_cancelled():
+                    return
+                try:
+                    yield key, task(*args), None
+                except Exception as e:
+                    yield key, None, e
+            return
+        futures = {pool.submit(task, *args): key for key, args in jobs.items()}
+        cancelling = False
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+            if is_cancelled and is_cancelled() and not cancelling:
+                # Les tâches pas encore commencées sont abandonnées ; celles déjà
+                # lancées vont au bout et sont récupérées (leur session est écrite)
+                cancelling = True
+                for pending in futures:
+                    pending.cancel()
+
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    pool = make_process_pool(workers) if workers > 1 else None
+    imported = []
+    try:
+        inspected = {}
+        for path, result, error in run_all(pool, inspect_import, {path: (path,) for path in paths}):
+            if error is not None:
+                print(f"Erreur import {path}: {error}")
+                notify(path, "erreur", str(error))
+            else:
+                inspected[path] = result
 
-    class BackgroundWidget(QWidget):
-        def __init__(self, image_path, parent=None):
-            super().__init__(parent)
-            self.pixmap = QPixmap(image_path)
+        if is_cancelled and is_cancelled():
+            return []
 
-        def paintEvent(self, event):
-            painter = QPainter(self)
+        # Attribution des noms, dans l'ordre de la sélection
+        jobs = {}
+        batch_hashes = {}
+        reserved = set()
+        for path in paths:
+            if path not in inspected:
+                continue
+            content_hash, dt = inspected[path]
+            known = batch_hashes.get(content_hash) or find_imported_session(content_hash)
+            if not known and replacing.get(path):
+                delete_session_file(replacing[path])
+            filename = known or allocate_session_filename(dt, reserved)
+            if known or os.path.exists(os.path.join(DATA_FOLDER, filename)):
+                notify(path, "déjà importé", filename)
+                continue
+            batch_hashes[content_hash] = filename
+            reserved.add(filename)
+            jobs[path] = (path, os.path.join(DATA_FOLDER, filename))
+
+        for path, result, error in run_all(pool, build_session_file, jobs):
+            filename = os.path.basename(jobs[path][1])
+            if error is not None:
+                print(f"Erreur import {path}: {error}")
+                notify(path, "erreur", str(error))
+            else:
+                imported.append((filename, inspected[path][0], result))
+                notify(path, "importé", filename)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if imported:
+        record_imports(imported)
+    return [os.path.join(DATA_FOLDER, filename) for filename, _, _ in imported]
+
+
+# --- Tâches de fond ---
+class CatalogRevalidationThread(QThread):
+    """Recalcule et enregistre hors du thread GUI les résumés de sessions périmés"""
+
+    entry_updated = pyqtSignal(str, dict)
+
+    def __init__(self, filenames, parent=None):
+        super().__init__(parent)
+        self.filenames = list(filenames)
+
+    def run(self):
+        for filename in self.filenames:
+            try:
+                entry = summarize_session_file(filename)
+                with import_lock:
+                    # Supprimée pendant le calcul : pas d'entrée fantôme au catalogue
+                    if not os.path.exists(os.path.join(DATA_FOLDER, filename)):
+                        continue
+                    entry = update_catalog_entry(filename, entry=entry)
+                self.entry_updated.emit(filename, entry)
+            except Exception as e:
+                print(f"Erreur revalidation {filename}: {e}")
+
+
+class TilePrefetchThread(QThread):
+    """Précharge Leaflet puis, une session après l'autre, les tuiles de carte de sessions importées"""
+
+    def __init__(self, csv_paths, parent=None):
+        super().__init__(parent)
+        self.csv_paths = list(csv_paths)
+
+    def run(self):
+        # Sans leaflet.js/css en cache, la carte reste vide hors ligne même avec les tuiles
+        if not prefetch_leaflet_assets():
+            return
+        for csv_path in self.csv_paths:
+            try:
+                prefetch_session_tiles(csv_path)
+            except Exception as e:
+                print(f"Erreur préchargement des tuiles {csv_path}: {e}")
+
+
+class ImportThread(QThread):
+    """Importe un seul CSV hors du thread GUI (l'attente d'import_lock comprise)"""
+
+    completed = pyqtSignal(str, bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+
+    def run(self):
+        try:
+            self.completed.emit(*handle_new_csv(self.path))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class BulkImportThread(QThread):
+    """Lance import_files hors du thread GUI, avec l'état de chaque fichier et annulation"""
+
+    file_status = pyqtSignal(str, str, str)
+    completed = pyqtSignal(list)
+
+    def __init__(self, paths, parent=None, replacing=None):
+        super().__init__(parent)
+        self.paths = list(paths)
+        self.replacing = replacing
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        with import_lock:
+            imported = import_files(
+                self.paths,
+                progress_callback=self.file_status.emit,
+                is_cancelled=lambda: self.cancelled,
+                replacing=self.replacing
+            )
+        self.completed.emit(imported)
+
+
+class ReportGraphsThread(QThread):
+    """Rend les graphiques d'un rapport dans des processus, puis sa carte, hors du thread GUI"""
+
+    progress = pyqtSignal(int, int, str)
+    map_started = pyqtSignal()
+    completed = pyqtSignal(list, bool)  # Erreurs, annulé
+
+    def __init__(self, jobs, parent=None, map_job=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.map_job = map_job  # Arguments de render_static_map, ou None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        errors = render_report_graphs(
+            self.jobs,
+            progress_callback=lambda done, total, filename, error: self.progress.emit(done, total, filename),
+            is_cancelled=lambda: self.cancelled
+        )
+        # Les tuiles manquantes sont téléchargées : jamais dans le thread GUI
+        if self.map_job is not None and not self.cancelled:
+            self.map_started.emit()
+            try:
+                if render_static_map(**self.map_job):
+                    print("✅ Carte GPS générée")
+            except Exception as e:
+                errors.append(("carte_gps.png", str(e)))
+                print(f"❌ Erreur lors de la génération de la carte: {e}")
+        self.completed.emit(errors, self.cancelled)
+
+
+class RecalculateStatsThread(QThread):
+    """Lance recalculate_all_stats hors du thread GUI, avec progression et annulation"""
+
+    progress = pyqtSignal(int, int, str)
+    completed = pyqtSignal(dict, list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancelled = False
+        self.errors = []
+
+    def cancel(self):
+        self.cancelled = True
+
+    def on_progress(self, done, total, filename, error):
+        if error:
+            self.errors.append((filename, error))
+        self.progress.emit(done, total, filename)
+
+    def run(self):
+        stats = recalculate_all_stats(
+            progress_callback=self.on_progress,
+            is_cancelled=lambda: self.cancelled
+        )
+        self.completed.emit(stats, self.errors)
+
+
+class BulkImportDialog(QDialog):
+    """Suivi d'un import groupé : état de chaque fichier, annulation"""
+
+    cancel_requested = pyqtSignal()
+
+    STATUS_ICONS = {"en attente": "⏳", "importé": "✅", "déjà importé": "↩️", "erreur": "❌"}
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import de trajets")
+        self.resize(560, 420)
+        self.total = len(paths)
+        self.done_count = 0
+        self.running = True
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.files_list = QListWidget()
+        self.items = {}
+        for path in paths:
+            item = QListWidgetItem()
+            self.items[path] = item
+            self.files_list.addItem(item)
+            self.set_item_text(path, "en attente")
+        layout.addWidget(self.files_list)
+
+        self.close_button = QPushButton("Annuler")
+        self.close_button.clicked.connect(self.reject)
+        layout.addWidget(self.close_button, alignment=Qt.AlignmentFlag.AlignRight)
+        self.update_summary()
+
+    def set_item_text(self, path, status, detail=""):
+        text = f"{self.STATUS_ICONS[status]} {os.path.basename(path)} — {status}"
+        if status == "erreur":
+            text += f" : {detail}"
+        elif detail:
+            text += f" ({format_session_name(detail)})"
+        self.items[path].setText(text)
+
+    def update_summary(self):
+        self.summary_label.setText(f"{self.done_count}/{self.total} fichiers traités")
+
+    def set_status(self, path, status, detail):
+        self.set_item_text(path, status, detail)
+        self.done_count += 1
+        self.update_summary()
+
+    def set_finished(self, cancelled):
+        self.running = False
+        if cancelled:
+            self.summary_label.setText(f"Import annulé : {self.done_count}/{self.total} fichiers traités")
+        self.close_button.setText("Fermer")
+        self.close_button.setEnabled(True)
+
+    def reject(self):
+        # Fermer la fenêtre pendant l'import revient à l'annuler
+        if self.running:
+            self.close_button.setEnabled(False)
+            self.summary_label.setText("Annulation en cours...")
+            self.cancel_requested.emit()
+            return
+        super().reject()
+
+
+class InboxWatcher(QObject):
+    """Importe en arrière-plan les CSV déposés (ou modifiés) dans un dossier surveillé.
+
+    Un fichier n'est importé que lorsque son empreinte (taille, date) n'a pas
+    changé pendant INBOX_SETTLE_MS, et seulement si elle
+    diffère de celle enregistrée lors de son dernier import. Un fichier
+    modifié après import (export complété) remplace la session qu'il avait
+    produite.
+    """
+
+    file_status = pyqtSignal(str, str, str)
+    sessions_imported = pyqtSignal(list)
+
+    def __init__(self, folder, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+        self.pending = {}  # Chemin -> (empreinte, instant où elle a été vue pour la première fois)
+        self.importing = {}  # Chemin -> empreinte au lancement de l'import
+        self.results = {}
+        self.import_thread = None
+
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setSingleShot(True)
+        self.scan_timer.setInterval(INBOX_SETTLE_MS)
+        self.scan_timer.timeout.connect(self.scan)
+
+        # Le dossier signale les ajouts et suppressions ; chaque CSV est aussi
+        # surveillé, pour voir les écritures dans un fichier existant
+        self.watcher = QFileSystemWatcher([folder], self)
+        self.watcher.directoryChanged.connect(lambda _: self.scan_timer.start())
+        self.watcher.fileChanged.connect(lambda _: self.scan_timer.start())
+
+        # Fichiers déposés pendant que l'application était fermée
+        self.scan()
+
+    def scan(self):
+        """Repère les CSV nouveaux ou modifiés et importe ceux dont la copie est terminée"""
+        known = load_inbox_settings()["files"]
+        now = time.monotonic()
+        watched_files = set(self.watcher.files())
+        ready = {}
+        pending = {}
+        try:
+            names = sorted(os.listdir(self.folder))
+        except OSError as e:
+            print(f"Dossier surveillé inaccessible {self.folder}: {e}")
+            names = []
+        for name in names:
+            # Fichiers cachés : métadonnées macOS, fichiers temporaires de copie
+            if name.startswith(".") or not name.lower().endswith(".csv"):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                fingerprint = file_fingerprint(path)
+            except OSError:
+                continue
+            if path not in watched_files:
+                self.watcher.addPath(path)
+            if known.get(path, {}).get("source") == fingerprint or self.importing.get(path) == fingerprint:
+                continue
+            seen, since = self.pending.get(path, (None, now))
+            if seen != fingerprint:
+                since = now
+            if now - since >= INBOX_SETTLE_MS / 1000 and self.import_thread is None:
+                ready[path] = fingerprint
+            else:
+                pending[path] = (fingerprint, since)
+        self.pending = pending
+
+        if ready:
+            self.start_import(ready)
+        # Copie en cours : on repasse jusqu'à ce que la taille se stabilise
+        if self.pending:
+            self.scan_timer.start()
+
+    def start_import(self, ready):
+        self.importing = ready
+        self.results = {}
+        known = load_inbox_settings()["files"]
+        replacing = {path: known[path]["session"] for path in ready if known.get(path, {}).get("session")}
+        self.import_thread = BulkImportThread(list(ready), self, replacing=replacing)
+        self.import_thread.file_status.connect(self.on_file_status)
+        self.import_thread.completed.connect(self.on_import_finished)
+        self.import_thread.start()
+
+    def on_file_status(self, path, status, detail):
+        self.results[path] = (status, detail)
+        self.file_status.emit(path, status, detail)
+
+    def on_import_finished(self, imported):
+        settings = load_inbox_settings()
+        for path, (status, session) in self.results.items():
+            previous = settings["files"].get(path, {}).get("session")
+            if status == "erreur" and previous and not os.path.exists(os.path.join(DATA_FOLDER, previous)):
+                previous = None  # Supprimée pour être remplacée, mais la reconstruction a échoué
+            # Une erreur n'est retentée que si le fichier change
+            settings["files"][path] = {
+                "source": self.importing[path],
+                "session": session if status != "erreur" else previous
+            }
+        save_inbox_settings(settings)
+
+        self.import_thread.wait()
+        self.import_thread = None
+        self.importing = {}
+        if imported:
+            self.sessions_imported.emit(imported)
+        self.scan()
+
+    def stop(self):
+        """Arrête la surveillance en laissant se terminer l'import en cours"""
+        self.scan_timer.stop()
+        self.watcher.removePaths([self.folder] + self.watcher.files())
+        if self.import_thread is not None:
+            self.import_thread.cancel()
+            self.import_thread.wait()
+
+
+# --- Page d'accueil avec interface moderne ---
+class HomePage(QWidget):
+    def __init__(self, switch_to_analysis):
+        super().__init__()
+        self.switch_to_analysis = switch_to_analysis
+        self.revalidation_thread = None
+        self.revalidation_pending = False
+        self.recalc_thread = None
+        self.recalc_progress = None
+        self.prefetch_threads = []
+        self.import_thread = None
+        self.import_dialog = None
+        self.single_import_thread = None
+        self.inbox_watcher = None
+        self.init_ui()
+        self.start_inbox_watcher(load_inbox_settings()["folder"])
+        self.refresh_stats()
+
+
+
+    class BackgroundWidget(QWidget):
+        def __init__(self, image_path, parent=None):
+            super().__init__(parent)
+            self.pixmap = QPixmap(image_path)
+
+        def paintEvent(self, event):
+            painter = QPainter(self)
             painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
 
             # Calculer le ratio pour "cover"
@@ -635,9 +2271,21 @@ class HomePage(QWidget):
             }
         """)
         open_button.clicked.connect(self.open_new_file)
+        self.open_button = open_button
+
+        import_button = QPushButton("📁 IMPORTER PLUSIEURS")
+        import_button.setStyleSheet(open_button.styleSheet())
+        import_menu = QMenu(import_button)
+        import_menu.addAction("Fichiers...", lambda: self.import_multiple_files(folder=False))
+        import_menu.addAction("Dossier...", lambda: self.import_multiple_files(folder=True))
+        import_menu.addSeparator()
+        import_menu.addAction("Surveiller un dossier de dépôt...", self.choose_inbox_folder)
+        self.stop_inbox_action = import_menu.addAction("Arrêter la surveillance", lambda: self.set_inbox_folder(None))
+        import_button.setMenu(import_menu)
         
         trips_header.addWidget(trips_title)
         trips_header.addStretch()
+        trips_header.addWidget(import_button)
         trips_header.addWidget(open_button)
         trips_layout.addLayout(trips_header)
         
@@ -807,56 +2455,206 @@ class HomePage(QWidget):
         self.stats_widgets['energy_charged'].value_label.setText(f"{stats['total_energy_charged']:.0f} Wh")
 
     def recalculate_stats(self):
-        """Recalcule toutes les statistiques"""
-        recalculate_all_stats()
+        """Recalcule toutes les statistiques en arrière-plan"""
+        if self.recalc_thread is not None and self.recalc_thread.isRunning():
+            return
+
+        self.recalc_progress = QProgressDialog("Recalcul des statistiques...", "Annuler", 0, 0, self)
+        self.recalc_progress.setWindowTitle("Statistiques")
+        self.recalc_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.recalc_progress.setMinimumDuration(300)
+        self.recalc_progress.setAutoClose(False)
+        self.recalc_progress.setAutoReset(False)
+
+        self.recalc_thread = RecalculateStatsThread(self)
+        self.recalc_thread.progress.connect(self.on_recalculate_progress)
+        self.recalc_thread.completed.connect(self.on_recalculate_finished)
+        self.recalc_progress.canceled.connect(self.recalc_thread.cancel)
+        self.recalc_thread.start()
+
+    def on_recalculate_progress(self, done, total, filename):
+        self.recalc_progress.setMaximum(total)
+        self.recalc_progress.setValue(done)
+        self.recalc_progress.setLabelText(f"Recalcul des statistiques...\n{done}/{total} • {format_session_name(filename)}")
+
+    def on_recalculate_finished(self, stats, errors):
+        cancelled = self.recalc_thread.cancelled
+        self.recalc_progress.close()
         self.refresh_stats()
-        QMessageBox.information(self, "Statistiques", "Les statistiques ont été recalculées avec succès !")
+        self.refresh_list()
+
+        if cancelled:
+            QMessageBox.information(self, "Statistiques", "Recalcul annulé : seuls les fichiers déjà traités ont été mis à jour.")
+        elif errors:
+            details = "\n".join(f"• {format_session_name(name)} : {error}" for name, error in errors)
+            QMessageBox.warning(self, "Statistiques", f"Statistiques recalculées, mais certains fichiers n'ont pas pu être traités :\n\n{details}")
+        else:
+            QMessageBox.information(self, "Statistiques", "Les statistiques ont été recalculées avec succès !")
 
     def refresh_list(self):
-        """Met à jour la liste des trajets"""
+        """Met à jour la liste des trajets à partir du catalogue (sans relire les CSV)"""
         self.trips_list.clear()
-        for filename in load_recent_files():
-            display_name = format_session_name(filename)
-            
-            # Créer un widget personnalisé pour chaque trajet
+        catalog = load_catalog()
+        stale_files = []
+        # Les récents d'abord, puis toutes les autres sessions du dossier
+        recent_files = [f for f in load_recent_files() if os.path.exists(os.path.join(DATA_FOLDER, f))]
+        other_files = [f for f in list_session_files() if f not in recent_files]
+        for filename in recent_files + other_files:
             item = QListWidgetItem()
-            item.setText(display_name)
             item.setData(Qt.ItemDataRole.UserRole, filename)
-            
-            # Ajouter des infos supplémentaires si possible
-            try:
-                file_path = os.path.join(DATA_FOLDER, filename)
-                if os.path.exists(file_path):
-                    df = pd.read_csv(file_path)
-                    df_clean = clean_data(df)
-                    df_final = calculate_gps_distance(df_clean)
-                    
-                    if "Distance_GPS" in df_final.columns:
-                        distance = df_final["Distance_GPS"].iloc[-1] / 1000  # en km
-                    elif "Distance" in df_final.columns:
-                        distance = df_final["Distance"].iloc[-1] / 1000
-                    else:
-                        distance = 0
-                    
-                    duration = df_final["Temps"].iloc[-1] / 60 if "Temps" in df_final.columns else 0  # en minutes
-                    
-                    item.setText(f"{display_name}\n📏 {distance:.1f} km • ⏱️ {duration:.0f} min")
-            except:
-                pass
-            
+            entry = catalog.get(filename)
+            self.set_trip_item_text(item, filename, entry)
             self.trips_list.addItem(item)
 
+            # Entrée absente ou fichier modifié : à revalider en arrière-plan
+            if not is_catalog_entry_fresh(filename, entry):
+                stale_files.append(filename)
+
+        if stale_files:
+            self.start_catalog_revalidation(stale_files)
+
+    def set_trip_item_text(self, item, filename, entry):
+        """Affiche le nom du trajet et, si disponible, son résumé"""
+        display_name = format_session_name(filename)
+        if entry:
+            distance = entry["distance"] / 1000  # en km
+            duration = entry["duration"] / 60  # en minutes
+            item.setText(f"{display_name}\n📏 {distance:.1f} km • ⏱️ {duration:.0f} min")
+        else:
+            item.setText(display_name)
+
+    def start_catalog_revalidation(self, filenames):
+        """Recalcule en arrière-plan les résumés des fichiers modifiés"""
+        if self.revalidation_thread is not None and self.revalidation_thread.isRunning():
+            self.revalidation_pending = True
+            return
+        self.revalidation_pending = False
+        self.revalidation_thread = CatalogRevalidationThread(filenames, self)
+        self.revalidation_thread.entry_updated.connect(self.on_catalog_entry_updated)
+        self.revalidation_thread.finished.connect(self.on_catalog_revalidation_finished)
+        self.revalidation_thread.start()
+
+    def on_catalog_entry_updated(self, filename, entry):
+        """Met à jour l'élément de la liste d'un résumé revalidé"""
+        for row in range(self.trips_list.count()):
+            item = self.trips_list.item(row)
+            if item.data(Qt.ItemDataRole.UserRole) == filename:
+                self.set_trip_item_text(item, filename, entry)
+
+    def on_catalog_revalidation_finished(self):
+        if self.revalidation_pending:
+            self.refresh_list()
+
     def open_new_file(self):
         """Ouvre un nouveau fichier CSV"""
+        if self.single_import_thread is not None and self.single_import_thread.isRunning():
+            return
         path, _ = QFileDialog.getOpenFileName(self, "Choisir un fichier CSV", "", "Fichiers CSV (*.csv)")
         if path:
-            try:
-                copied_path = handle_new_csv(path)
-                self.refresh_list()
-                self.refresh_stats()
-                self.switch_to_analysis(copied_path)
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Impossible de charger le fichier : {e}")
+            # Un import groupé ou du dossier surveillé peut tenir import_lock : on attend hors du GUI
+            self.open_button.setEnabled(False)
+            self.open_button.setText("⏳ IMPORT EN COURS...")
+            self.single_import_thread = ImportThread(path, self)
+            self.single_import_thread.completed.connect(self.on_single_import_finished)
+            self.single_import_thread.failed.connect(self.on_single_import_failed)
+            self.single_import_thread.finished.connect(self.on_single_import_done)
+            self.single_import_thread.start()
+
+    def on_single_import_finished(self, copied_path, already_imported):
+        if already_imported:
+            QMessageBox.information(
+                self,
+                "Fichier déjà importé",
+                f"Le fichier '{format_session_name(os.path.basename(copied_path))}' a déjà été importé."
+            )
+        self.refresh_list()
+        self.refresh_stats()
+        self.start_tile_prefetch([copied_path])
+        self.switch_to_analysis(copied_path)
+
+    def on_single_import_failed(self, error):
+        QMessageBox.critical(self, "Erreur", f"Impossible de charger le fichier : {error}")
+
+    def on_single_import_done(self):
+        self.open_button.setEnabled(True)
+        self.open_button.setText("📂 NOUVEAU TRAJET")
+
+    def import_multiple_files(self, folder=False):
+        """Importe plusieurs fichiers CSV (ou tout un dossier) en arrière-plan"""
+        if self.import_thread is not None and self.import_thread.isRunning():
+            return
+
+        if folder:
+            directory = QFileDialog.getExistingDirectory(self, "Choisir un dossier de trajets")
+            if not directory:
+                return
+            paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                           if name.lower().endswith(".csv"))
+            if not paths:
+                QMessageBox.information(self, "Import", "Aucun fichier CSV dans ce dossier.")
+                return
+        else:
+            paths, _ = QFileDialog.getOpenFileNames(self, "Choisir des fichiers CSV", "", "Fichiers CSV (*.csv)")
+            if not paths:
+                return
+
+        self.import_dialog = BulkImportDialog(paths, self)
+        self.import_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.import_thread = BulkImportThread(paths, self)
+        self.import_thread.file_status.connect(self.import_dialog.set_status)
+        self.import_thread.completed.connect(self.on_bulk_import_finished)
+        self.import_dialog.cancel_requested.connect(self.import_thread.cancel)
+        self.import_dialog.show()
+        self.import_thread.start()
+
+    def on_bulk_import_finished(self, imported):
+        """Fin d'un import groupé : liste et statistiques rafraîchies une seule fois"""
+        self.import_dialog.set_finished(self.import_thread.cancelled)
+        self.refresh_list()
+        self.refresh_stats()
+        if imported:
+            self.start_tile_prefetch(imported)
+
+    def choose_inbox_folder(self):
+        """Choisit le dossier dont les nouveaux CSV sont importés automatiquement"""
+        folder = QFileDialog.getExistingDirectory(self, "Dossier de dépôt à surveiller")
+        if folder:
+            self.set_inbox_folder(folder)
+
+    def set_inbox_folder(self, folder):
+        settings = load_inbox_settings()
+        if folder != settings["folder"]:
+            settings = {"folder": folder, "files": {}}
+            save_inbox_settings(settings)
+        self.start_inbox_watcher(folder)
+
+    def start_inbox_watcher(self, folder):
+        """(Re)démarre la surveillance du dossier de dépôt, ou l'arrête si folder est None"""
+        if self.inbox_watcher is not None:
+            self.inbox_watcher.stop()
+            self.inbox_watcher.deleteLater()
+            self.inbox_watcher = None
+        self.stop_inbox_action.setEnabled(bool(folder))
+        if not folder:
+            return
+        if not os.path.isdir(folder):
+            print(f"Dossier surveillé introuvable: {folder}")
+            return
+        self.inbox_watcher = InboxWatcher(folder, self)
+        self.inbox_watcher.sessions_imported.connect(self.on_inbox_sessions_imported)
+
+    def on_inbox_sessions_imported(self, imported):
+        """Nouvelles sessions arrivées par le dossier surveillé"""
+        self.refresh_list()
+        self.refresh_stats()
+        self.start_tile_prefetch(imported)
+
+    def start_tile_prefetch(self, csv_paths):
+        """Télécharge en arrière-plan les tuiles des trajets pour la consultation hors ligne"""
+        thread = TilePrefetchThread(csv_paths, self)
+        thread.finished.connect(lambda: self.prefetch_threads.remove(thread))
+        self.prefetch_threads.append(thread)
+        thread.start()
 
     def open_trip(self, item):
         """Ouvre un trajet en double-cliquant"""
@@ -896,7 +2694,16 @@ class HomePage(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            if delete_session_file(filename):
+            # Pas d'attente dans le thread GUI si un import ou un recalcul est en cours
+            if not import_lock.acquire(blocking=False):
+                QMessageBox.information(self, "Import en cours",
+                                        "Un import ou un recalcul est en cours : réessayez quand il sera terminé.")
+                return
+            try:
+                deleted = delete_session_file(filename)
+            finally:
+                import_lock.release()
+            if deleted:
                 QMessageBox.information(self, "Suppression", "Le trajet a été supprimé avec succès.")
                 self.refresh_list()
                 self.refresh_stats()
@@ -904,304 +2711,1061 @@ class HomePage(QWidget):
                 QMessageBox.warning(self, "Erreur", "Impossible de supprimer le fichier.")
 
 
-# --- Widget graphique individuel ---
-class GraphWidget(QWidget):
-    def __init__(self, graph_id, on_cursor_change, on_zoom_change=None, advanced_mode_callback=None):
-        super().__init__()
-        self.graph_id = graph_id
-        self.on_cursor_change = on_cursor_change
-        self.on_zoom_change = on_zoom_change
-        self.advanced_mode_callback = advanced_mode_callback
-        self.df = None
-        self.cursor_line = None
-        self.locked = False
-        self.zoom_active = False
-        self.toolbar = None
-        self.init_ui()
-
-    def init_ui(self):
-        layout = QVBoxLayout()
-        layout.setSpacing(2)
-        
-        # Sélecteur de graphique
-        self.graph_selector = QComboBox()
-        self.graph_selector.currentTextChanged.connect(self.update_graph)
-        layout.addWidget(self.graph_selector)
-        
-        # Zone de graphique
-        self.figure = plt.figure(figsize=(5, 3))
-        self.ax = self.figure.add_subplot(111)
-        self.figure_canvas = FigureCanvas(self.figure)
-        
-        # Créer la toolbar mais masquée par défaut
-        from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
-        self.toolbar = NavigationToolbar2QT(self.figure_canvas, self)
-        self.toolbar.setMaximumHeight(25)
-        self.toolbar.hide()
-        
-        layout.addWidget(self.toolbar)
-        layout.addWidget(self.figure_canvas)
-        
-        self.setLayout(layout)
-
-    def set_advanced_mode(self, advanced_mode):
-        """Affiche/masque la toolbar selon le mode"""
-        if advanced_mode:
-            self.toolbar.show()
-        else:
-            self.toolbar.hide()
-            if self.df is not None:
-                self.reset_zoom()
-
-    def reset_zoom(self):
-        """Remet le graphique à l'échelle par défaut"""
-        if self.df is not None and len(self.df) > 0:
-            self.ax.set_xlim(self.df["Temps"].min(), self.df["Temps"].max())
-            self.figure_canvas.draw()
-
-    def set_data(self, df):
-        self.df = df
-
-    def get_available_options(self, advanced_mode=False):
-        """Retourne les options disponibles selon le mode"""
-        if self.df is None:
-            return ["Aucun"]
-            
-        options = ["Aucun"]
-        
-        # Mode normal
-        if "Tension" in self.df.columns:
-            options.append("Tension")
-        if "Vitesse" in self.df.columns:
-            options.append("Vitesse")
-        if "GazFrein" in self.df.columns:
-            options.append("GazFrein")
-        if "WHCharged" in self.df.columns and "WHDischarged" in self.df.columns:
-            options.append("Énergie (bilan)")
-        if "Tension" in self.df.columns and "CurrentIn" in self.df.columns:
-            options.append("Puissance électrique")
-        if "Alt" in self.df.columns:
-            options.append("Altitude")
-        
-        # Mode avancé
-        if advanced_mode:
-            if "WHCharged" in self.df.columns:
-                options.append("Énergie chargée")
-            if "WHDischarged" in self.df.columns:
-                options.append("Énergie déchargée")
-            if "Distance" in self.df.columns:
-                options.append("Distance (capteur)")
-            if "Distance_GPS" in self.df.columns:
-                options.append("Distance (GPS)")
-            if "CurrentIn" in self.df.columns:
-                options.append("Courant entrant")
-            if "MotorCurrent" in self.df.columns:
-                options.append("Courant moteur")
-            if "Lat" in self.df.columns:
-                options.append("Latitude")
-            if "Lon" in self.df.columns:
-                options.append("Longitude")
-            if "Vsat" in self.df.columns:
-                options.append("Vitesse satellite")
-            if "Cap" in self.df.columns:
-                options.append("Cap")
-            if "Sat" in self.df.columns:
-                options.append("Satellites")
-            if "HDOP" in self.df.columns:
-                options.append("HDOP")
-        
-        return options
-
-    def update_options(self, advanced_mode=False):
-        """Met à jour les options de la liste déroulante"""
-        if self.df is None:
-            return
-            
-        current_selection = self.graph_selector.currentText()
-        options = self.get_available_options(advanced_mode)
-        
-        self.graph_selector.clear()
-        self.graph_selector.addItems(options)
-        
-        if current_selection in options:
-            self.graph_selector.setCurrentText(current_selection)
-        elif current_selection != "Aucun" and not advanced_mode:
-            self.graph_selector.setCurrentText("Aucun")
-        
-        self.set_advanced_mode(advanced_mode)
+# --- Séries tracées par les graphiques ---
+# Style de chaque type de graphique : format matplotlib, libellé de l'axe Y,
+# colonne tracée directement (sinon série calculée) et remplissage éventuel.
+GRAPH_STYLES = {
+    "Vitesse": {"fmt": 'b-', "ylabel": "Vitesse (km/h)", "column": "Vitesse", "fill": "under"},
+    "Altitude": {"fmt": 'g-', "ylabel": "Altitude (m)", "column": "Alt", "fill": "under"},
+    "Tension": {"fmt": 'orange', "ylabel": "Tension (V)", "column": "Tension"},
+    "GazFrein": {"fmt": 'purple', "ylabel": "Gaz/Frein", "column": "GazFrein"},
+    "Énergie (bilan)": {"fmt": 'blue', "ylabel": "Bilan énergétique (Wh)", "fill": "balance"},
+    "Puissance électrique": {"fmt": 'orange', "ylabel": "Puissance électrique (W)"},
+    # Mode avancé uniquement
+    "Énergie chargée": {"fmt": 'g-', "ylabel": "Énergie chargée (Wh)", "fill": "under", "fill_color": 'green', "energy_ylim": True},
+    "Énergie déchargée": {"fmt": 'r-', "ylabel": "Énergie déchargée (Wh)", "fill": "under", "fill_color": 'red', "energy_ylim": True},
+    "Distance (capteur)": {"fmt": 'brown', "ylabel": "Distance capteur (m)", "column": "Distance"},
+    "Distance (GPS)": {"fmt": 'darkred', "ylabel": "Distance GPS (m)", "column": "Distance_GPS"},
+    "Courant entrant": {"fmt": 'g-', "ylabel": "Courant entrant (A)", "column": "CurrentIn"},
+    "Courant moteur": {"fmt": 'r-', "ylabel": "Courant moteur (A)", "column": "MotorCurrent"},
+    "Latitude": {"fmt": 'navy', "ylabel": "Latitude", "column": "Lat"},
+    "Longitude": {"fmt": 'teal', "ylabel": "Longitude", "column": "Lon"},
+    "Vitesse satellite": {"fmt": 'cyan', "ylabel": "Vitesse satellite", "column": "Vsat"},
+    "Cap": {"fmt": 'magenta', "ylabel": "Cap", "column": "Cap"},
+    "Satellites": {"fmt": 'lime', "ylabel": "Nombre de satellites", "column": "Sat"},
+    "HDOP": {"fmt": 'coral', "ylabel": "HDOP", "column": "HDOP"},
+}
+
+def compute_graph_series(data, graph_type):
+    """Calcule la série Y d'un type de graphique (data : SessionView ou colonnes)"""
+    style = GRAPH_STYLES[graph_type]
+    if "column" in style:
+        return np.asarray(data[style["column"]], dtype=np.float64)
+
+    if graph_type == "Énergie (bilan)":
+        # Bilan énergétique : énergie chargée - énergie déchargée
+        return cumulative_energy(data["WHCharged"]) - cumulative_energy(data["WHDischarged"])
+    if graph_type == "Puissance électrique":
+        return np.asarray(data["Tension"], dtype=np.float64) * np.asarray(data["CurrentIn"], dtype=np.float64)
+    if graph_type == "Énergie chargée":
+        return cumulative_energy(data["WHCharged"]).astype(np.float64)
+    if graph_type == "Énergie déchargée":
+        return cumulative_energy(data["WHDischarged"]).astype(np.float64)
+    raise KeyError(graph_type)
+
+def add_graph_fills(ax, graph_type, x, y):
+    """Ajoute les zones remplies d'un graphique et retourne les artistes créés"""
+    style = GRAPH_STYLES[graph_type]
+    if style.get("fill") == "under":
+        return [ax.fill_between(x, y, alpha=0.3, color=style.get("fill_color", 'C0'))]
+    if style.get("fill") == "balance":
+        return [
+            ax.fill_between(x, y, 0, where=(y >= 0), color='green', alpha=0.3, label='Excédent'),
+            ax.fill_between(x, y, 0, where=(y < 0), color='red', alpha=0.3, label='Déficit'),
+        ]
+    return []
 
-    def update_graph(self, graph_type):
-        if self.df is None or graph_type == "Aucun":
-            self.ax.clear()
-            self.ax.set_title("Aucun graphique sélectionné")
-            self.figure.tight_layout()
-            self.figure_canvas.draw()
-            return
-            
-        self.ax.clear()
-        
-        if graph_type == "Vitesse":
-            self.ax.plot(self.df["Temps"], self.df["Vitesse"], 'b-', linewidth=2)
-            self.ax.set_ylabel("Vitesse (km/h)")
-            self.ax.fill_between(self.df["Temps"], self.df["Vitesse"], alpha=0.3)
-            
-        elif graph_type == "Altitude":
-            self.ax.plot(self.df["Temps"], self.df["Alt"], 'g-', linewidth=2)
-            self.ax.set_ylabel("Altitude (m)")
-            self.ax.fill_between(self.df["Temps"], self.df["Alt"], alpha=0.3)
-            
-        elif graph_type == "Tension":
-            self.ax.plot(self.df["Temps"], self.df["Tension"], 'orange', linewidth=2)
-            self.ax.set_ylabel("Tension (V)")
-            
-        elif graph_type == "GazFrein":
-            self.ax.plot(self.df["Temps"], self.df["GazFrein"], 'purple', linewidth=2)
-            self.ax.set_ylabel("Gaz/Frein")
-            
-        elif graph_type == "Énergie (bilan)":
-            # Calculer le bilan énergétique : énergie chargée - énergie déchargée
-            wh_charged = self.df["WHCharged"]
-            wh_discharged = self.df["WHDischarged"]
-            
-            # Déterminer si les données sont déjà cumulatives
-            if wh_charged.is_monotonic_increasing and wh_charged.iloc[-1] > wh_charged.iloc[0]:
-                charged_data = wh_charged
-            else:
-                charged_data = wh_charged.cumsum()
-                
-            if wh_discharged.is_monotonic_increasing and wh_discharged.iloc[-1] > wh_discharged.iloc[0]:
-                discharged_data = wh_discharged
-            else:
-                discharged_data = wh_discharged.cumsum()
-            
-            # Calcul du bilan
-            energy_balance = charged_data - discharged_data
-            
-            # Graphique
-            colors = ['green' if x >= 0 else 'red' for x in energy_balance]
-            self.ax.plot(self.df["Temps"], energy_balance, 'blue', linewidth=2)
-            self.ax.axhline(y=0, color='gray', linestyle='--', alpha=0.7)
-            self.ax.fill_between(self.df["Temps"], energy_balance, 0, 
-                               where=(energy_balance >= 0), color='green', alpha=0.3, label='Excédent')
-            self.ax.fill_between(self.df["Temps"], energy_balance, 0, 
-                               where=(energy_balance < 0), color='red', alpha=0.3, label='Déficit')
-            self.ax.set_ylabel("Bilan énergétique (Wh)")
-            self.ax.legend()
-            
-        elif graph_type == "Puissance électrique":
-            power = self.df["Tension"] * self.df["CurrentIn"]
-            self.ax.plot(self.df["Temps"], power, 'orange', linewidth=2)
-            self.ax.set_ylabel("Puissance électrique (W)")
-            
-        # Mode avancé uniquement
-        elif graph_type == "Énergie chargée":
-            # Vérifier si les données sont déjà cumulatives ou instantanées
-            wh_data = self.df["WHCharged"]
-            
-            # Si les valeurs augmentent de façon monotone, c'est déjà cumulatif
-            if wh_data.is_monotonic_increasing and wh_data.iloc[-1] > wh_data.iloc[0]:
-                energy_data = wh_data  # Déjà cumulatif
-            else:
-                energy_data = wh_data.cumsum()  # Calculer le cumulatif
-            
-            self.ax.plot(self.df["Temps"], energy_data, 'g-', linewidth=2)
-            self.ax.set_ylabel("Énergie chargée (Wh)")
-            self.ax.fill_between(self.df["Temps"], energy_data, alpha=0.3, color='green')
-            
-            # Améliorer l'échelle Y
-            y_min = energy_data.min()
-            y_max = energy_data.max()
-            if y_max > y_min:
-                margin = (y_max - y_min) * 0.05  # 5% de marge
-                self.ax.set_ylim(max(0, y_min - margin), y_max + margin)
-            else:
-                self.ax.set_ylim(bottom=0)
-            
-        elif graph_type == "Énergie déchargée":
-            # Vérifier si les données sont déjà cumulatives ou instantanées
-            wh_data = self.df["WHDischarged"]
-            
-            # Si les valeurs augmentent de façon monotone, c'est déjà cumulatif
-            if wh_data.is_monotonic_increasing and wh_data.iloc[-1] > wh_data.iloc[0]:
-                energy_data = wh_data  # Déjà cumulatif
-            else:
-                energy_data = wh_data.cumsum()  # Calculer le cumulatif
-            
-            self.ax.plot(self.df["Temps"], energy_data, 'r-', linewidth=2)
-            self.ax.set_ylabel("Énergie déchargée (Wh)")
-            self.ax.fill_between(self.df["Temps"], energy_data, alpha=0.3, color='red')
-            
-            # Améliorer l'échelle Y
-            y_min = energy_data.min()
-            y_max = energy_data.max()
-            if y_max > y_min:
-                margin = (y_max - y_min) * 0.05  # 5% de marge
-                self.ax.set_ylim(max(0, y_min - margin), y_max + margin)
-            else:
-                self.ax.set_ylim(bottom=0)
-            
-        elif graph_type == "Distance (capteur)":
-            self.ax.plot(self.df["Temps"], self.df["Distance"], 'brown', linewidth=2)
-            self.ax.set_ylabel("Distance capteur (m)")
-            
-        elif graph_type == "Distance (GPS)":
-            self.ax.plot(self.df["Temps"], self.df["Distance_GPS"], 'darkred', linewidth=2)
-            self.ax.set_ylabel("Distance GPS (m)")
-            
-        elif graph_type == "Courant entrant":
-            self.ax.plot(self.df["Temps"], self.df["CurrentIn"], 'g-', linewidth=2)
-            self.ax.set_ylabel("Courant entrant (A)")
-            
-        elif graph_type == "Courant moteur":
-            self.ax.plot(self.df["Temps"], self.df["MotorCurrent"], 'r-', linewidth=2)
-            self.ax.set_ylabel("Courant moteur (A)")
-            
-        elif graph_type == "Latitude":
-            self.ax.plot(self.df["Temps"], self.df["Lat"], 'navy', linewidth=2)
-            self.ax.set_ylabel("Latitude")
-            
-        elif graph_type == "Longitude":
-            self.ax.plot(self.df["Temps"], self.df["Lon"], 'teal', linewidth=2)
-            self.ax.set_ylabel("Longitude")
-            
-        elif graph_type == "Vitesse satellite":
-            self.ax.plot(self.df["Temps"], self.df["Vsat"], 'cyan', linewidth=2)
-            self.ax.set_ylabel("Vitesse satellite")
-            
-        elif graph_type == "Cap":
-            self.ax.plot(self.df["Temps"], self.df["Cap"], 'magenta', linewidth=2)
-            self.ax.set_ylabel("Cap")
-            
-        elif graph_type == "Satellites":
-            self.ax.plot(self.df["Temps"], self.df["Sat"], 'lime', linewidth=2)
-            self.ax.set_ylabel("Nombre de satellites")
-            
-        elif graph_type == "HDOP":
-            self.ax.plot(self.df["Temps"], self.df["HDOP"], 'coral', linewidth=2)
-            self.ax.set_ylabel("HDOP")
+def draw_graph(ax, graph_type, x, y):
+    """Trace un type de graphique sur ax (ligne, remplissages, libellés) ; retourne (ligne, remplissages)"""
+    style = GRAPH_STYLES[graph_type]
+    (line,) = ax.plot(x, y, style["fmt"], linewidth=2)
+    fills = add_graph_fills(ax, graph_type, x, y)
+    if style.get("fill") == "balance":
+        ax.axhline(y=0, color='gray', linestyle='--', alpha=0.7)
+        ax.legend()
+    ax.set_ylabel(style["ylabel"])
+    ax.set_xlabel("Temps (s)")
+    ax.grid(True, alpha=0.3)
+    ax.set_title(graph_type)
+    return line, fills
+
+def minmax_decimate(x, y, x_min, x_max, n_buckets):
+    """Indices des points à tracer : min et max de y par colonne de pixels.
+
+    Seule la fenêtre [x_min, x_max] visible est parcourue (x trié), découpée
+    en n_buckets paquets ; le min et le max de chaque paquet sont gardés pour
+    que les pics restent visibles. Coût O(points visibles), vectorisé.
+    """
+    n = len(x)
+    if n == 0:
+        return np.arange(0)
+    i0 = max(0, int(np.searchsorted(x, x_min, side="left")) - 1)
+    i1 = min(n, int(np.searchsorted(x, x_max, side="right")) + 1)
+    m = i1 - i0
+    if m <= 2 * n_buckets:
+        return np.arange(i0, i1)
+
+    k = -(-m // n_buckets)  # taille d'un paquet
+    n_full = m // k
+    window = y[i0:i0 + n_full * k]
+    nan = np.isnan(window)
+    for_min = np.where(nan, np.inf, window).reshape(n_full, k)
+    for_max = np.where(nan, -np.inf, window).reshape(n_full, k)
+    offsets = i0 + np.arange(n_full) * k
+    i_min = offsets + np.argmin(for_min, axis=1)
+    i_max = offsets + np.argmax(for_max, axis=1)
+    parts = [[i0], np.minimum(i_min, i_max), np.maximum(i_min, i_max)]
+
+    rest = y[i0 + n_full * k:i1]
+    if len(rest):
+        base = i0 + n_full * k
+        parts.append([base + int(np.argmin(np.where(np.isnan(rest), np.inf, rest))),
+                      base + int(np.argmax(np.where(np.isnan(rest), -np.inf, rest)))])
+    parts.append([i1 - 1])
+
+    # Paires (min, max) dans l'ordre du temps
+    pairs = np.column_stack((parts[1], parts[2])).ravel()
+    indices = np.concatenate((parts[0], pairs, *parts[3:]))
+    return np.unique(indices)
+
+def energy_ylim(y):
+    """Échelle Y des graphiques d'énergie cumulée (5% de marge, jamais sous 0)"""
+    y_min = np.nanmin(y)
+    y_max = np.nanmax(y)
+    if y_max > y_min:
+        margin = (y_max - y_min) * 0.05  # 5% de marge
+        return max(0, y_min - margin), y_max + margin
+    return 0, None
+
+
+# --- Rapports ---
+def build_report_html(report_name, stats, n_points, graph_files, comments, include_base_file, source_name):
+    """Contenu HTML du rapport (partagé par l'interface et la génération en ligne de commande)
+
+    graph_files : noms des images du sous-dossier graphiques/, dans l'ordre d'affichage.
+    """
+    # Section fichiers de données
+    files_section = f"""
+        <div class="section">
+            <h2>📁 Fichiers de Données</h2>
+            <div class="files-info">
+                <div class="file-item selection">
+                    <h4>📊 Données de la sélection</h4>
+                    <p><strong>Fichier:</strong> {report_name}_donnees_selection.csv</p>
+                    <p><strong>Contenu:</strong> Données filtrées selon la plage sélectionnée ({stats['temps_debut']:.1f}s à {stats['temps_fin']:.1f}s)</p>
+                    <p><strong>Points de données:</strong> {n_points:,}</p>
+                    <p><strong>🔒 Confidentialité:</strong> Contient uniquement la portion sélectionnée</p>
+                </div>"""
+    
+    if include_base_file:
+        files_section += f"""
+                <div class="file-item complete">
+                    <h4>🗂️ Fichier de base complet</h4>
+                    <p><strong>Fichier:</strong> {report_name}_donnees_completes.csv</p>
+                    <p><strong>Contenu:</strong> Toutes les données du trajet original, y compris les positions GPS complètes</p>
+                    <p><strong>⚠️ Attention:</strong> Ce fichier contient l'intégralité du parcours avec les positions de départ et d'arrivée exactes</p>
+                </div>"""
+    
+    files_section += """
+            </div>
+        </div>"""
+    
+    # Générer le HTML complet
+    html_content = f"""
+    <!DOCTYPE html>
+    <html lang="fr">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Rapport d'Analyse - {report_name}</title>
+        <style>
+            body {{
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                margin: 40px;
+                background-color: #f8fafc;
+                color: #334155;
+                line-height: 1.6;
+            }}
+            .header {{
+                text-align: center;
+                margin-bottom: 40px;
+                padding: 30px;
+                background: linear-gradient(135deg, #3b82f6, #1e40af);
+                color: white;
+                border-radius: 12px;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            }}
+            .header h1 {{
+                margin: 0 0 10px 0;
+                font-size: 2.5em;
+            }}
+            .header h2 {{
+                margin: 0 0 15px 0;
+                font-weight: 300;
+                opacity: 0.9;
+            }}
+            .section {{
+                background: white;
+                margin: 30px 0;
+                padding: 30px;
+                border-radius: 12px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+                border: 1px solid #e2e8f0;
+            }}
+            .section h2 {{
+                margin-top: 0;
+                color: #1e40af;
+                border-bottom: 2px solid #e2e8f0;
+                padding-bottom: 10px;
+            }}
+            .stats-grid {{
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+                gap: 20px;
+                margin: 25px 0;
+            }}
+            .stat-item {{
+                background: linear-gradient(135deg, #f1f5f9, #e2e8f0);
+                padding: 20px;
+                border-radius: 8px;
+                text-align: center;
+                border: 1px solid #cbd5e1;
+            }}
+            .stat-value {{
+                font-size: 28px;
+                font-weight: bold;
+                color: #1e40af;
+                margin-bottom: 5px;
+            }}
+            .stat-label {{
+                color: #64748b;
+                font-size: 13px;
+                font-weight: 500;
+            }}
+            .graphs-container {{
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(450px, 1fr));
+                gap: 25px;
+                margin: 25px 0;
+            }}
+            .graph-item {{
+                text-align: center;
+                background: #f8fafc;
+                padding: 15px;
+                border-radius: 8px;
+                border: 1px solid #e2e8f0;
+            }}
+            .graph-item h3 {{
+                margin: 0 0 15px 0;
+                color: #475569;
+            }}
+            .graph-item img {{
+                max-width: 100%;
+                height: auto;
+                border: 1px solid #cbd5e1;
+                border-radius: 6px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            }}
+            .map-container {{
+                text-align: center;
+                margin: 25px 0;
+                background: #f8fafc;
+                padding: 20px;
+                border-radius: 8px;
+                border: 1px solid #e2e8f0;
+            }}
+            .map-container img {{
+                max-width: 100%;
+                height: auto;
+                border: 2px solid #cbd5e1;
+                border-radius: 8px;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            }}
+            .files-info {{
+                display: grid;
+                gap: 20px;
+            }}
+            .file-item {{
+                padding: 20px;
+                border-radius: 8px;
+                border: 1px solid #e2e8f0;
+            }}
+            .file-item.selection {{
+                background: #f0f9ff;
+                border-left: 4px solid #3b82f6;
+            }}
+            .file-item.complete {{
+                background: #fef3c7;
+                border-left: 4px solid #f59e0b;
+            }}
+            .file-item h4 {{
+                margin: 0 0 12px 0;
+                color: #1f2937;
+            }}
+            .file-item p {{
+                margin: 6px 0;
+                font-size: 14px;
+            }}
+            .comments {{
+                background: #fffbeb;
+                padding: 20px;
+                border-left: 4px solid #f59e0b;
+                border-radius: 8px;
+                white-space: pre-wrap;
+                font-family: 'Courier New', monospace;
+            }}
+            .info-box {{
+                background: #f0fdf4;
+                padding: 15px;
+                border-left: 4px solid #22c55e;
+                border-radius: 8px;
+                margin: 15px 0;
+                font-size: 13px;
+                font-weight: 500;
+            }}
+            .tech-info {{
+                background: #f8fafc;
+                padding: 20px;
+                border-radius: 8px;
+                border: 1px solid #e2e8f0;
+            }}
+            .tech-info p {{
+                margin: 8px 0;
+            }}
+            .footer {{
+                text-align: center;
+                margin-top: 50px;
+                color: #64748b;
+                font-size: 13px;
+            }}
+            @media print {{
+                body {{ margin: 20px; }}
+                .section {{ break-inside: avoid; }}
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>📊 Rapport d'Analyse</h1>
+            <h2>{report_name}</h2>
+            <p>Généré le {datetime.now().strftime('%d %B %Y à %H:%M:%S')}</p>
+        </div>
+
+        <div class="section">
+            <h2>📈 Statistiques du Trajet Analysé</h2>
+            <div class="stats-grid">
+                <div class="stat-item">
+                    <div class="stat-value">{stats['distance']:.0f} m</div>
+                    <div class="stat-label">Distance ({stats['distance_type']})</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">{stats['duree']:.1f} min</div>
+                    <div class="stat-label">Durée</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">{stats['vitesse_moy']:.1f} km/h</div>
+                    <div class="stat-label">Vitesse Moyenne</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">{stats['vitesse_max']:.1f} km/h</div>
+                    <div class="stat-label">Vitesse Maximum</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">{stats['denivele']:.0f} m</div>
+                    <div class="stat-label">Dénivelé</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">{stats['wh_discharged']:.1f} Wh</div>
+                    <div class="stat-label">Énergie Consommée</div>
+                </div>
+            </div>
+        </div>
+
+        <div class="section">
+            <h2>🗺️ Carte GPS</h2>
+            <div class="map-container">
+                <img src="carte_gps.png" alt="Carte GPS du trajet analysé">
+            </div>
+            <div class="info-box">
+                📍 Carte générée avec marqueurs de départ (🟢) et d'arrivée (🔴)
+            </div>
+        </div>
+
+        <div class="section">
+            <h2>📊 Graphiques d'Analyse</h2>
+            <div class="graphs-container">
+    """
+    
+    # Ajouter les graphiques
+    for i, graph_file in enumerate(graph_files):
+        html_content += f'''
+                <div class="graph-item">
+                    <h3>Graphique {i+1}</h3>
+                    <img src="graphiques/{graph_file}" alt="Graphique {i+1}">
+                </div>'''
+    
+    html_content += f"""
+            </div>
+        </div>
+
+        {files_section}
+
+        <div class="section">
+            <h2>💬 Commentaires</h2>
+            <div class="comments">{comments}</div>
+        </div>
+
+        <div class="section">
+            <h2>📋 Informations Techniques</h2>
+            <div class="tech-info">
+                <p><strong>Période analysée:</strong> {stats['temps_debut']:.1f}s à {stats['temps_fin']:.1f}s</p>
+                <p><strong>Nombre de points analysés:</strong> {n_points:,}</p>
+                <p><strong>Fichier source:</strong> {source_name or 'N/A'}</p>
+            </div>
+        </div>
+
+        <div class="footer">
+            <p>Rapport généré par STYX Analyse • {datetime.now().year}</p>
+        </div>
+    </body>
+    </html>"""
+    
+    return html_content
+
+
+REPORTS_FOLDER = "rapports"
+# Graphiques des rapports générés sans interface (ceux dont les colonnes existent)
+REPORT_GRAPH_TYPES = ["Vitesse", "Altitude", "Énergie (bilan)", "Puissance électrique", "Tension", "GazFrein"]
+REPORT_GRAPH_DPI = 300
+
+def save_report_figure(figure, path):
+    figure.savefig(
+        path,
+        dpi=REPORT_GRAPH_DPI,  # Haute résolution
+        bbox_inches='tight',
+        facecolor='white',
+        edgecolor='none',
+        format='png',
+        pad_inches=0.1
+    )
+
+def render_report_graph(data, graph_type, path, xlim=None):
+    """Enregistre un graphique du rapport en PNG 300 DPI, sans interface (Agg).
+
+    xlim reprend le zoom d'un graphique de l'interface (sinon toute la plage).
+    """
+    x = np.asarray(data["Temps"], dtype=np.float64)
+    y = compute_graph_series(data, graph_type)
+    if len(x) > 1 and np.all(x[1:] >= x[:-1]):
+        # Au plus deux points par pixel de l'image finale
+        x_min, x_max = xlim if xlim is not None else (x[0], x[-1])
+        indices = minmax_decimate(x, y, x_min, x_max, 5 * REPORT_GRAPH_DPI)
+        x, y = x[indices], y[indices]
+
+    figure = Figure(figsize=(5, 3))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    draw_graph(ax, graph_type, x, y)
+    if xlim is not None:
+        ax.set_xlim(xlim)
+    elif len(x) > 1 and np.nanmax(x) > np.nanmin(x):
+        ax.set_xlim(np.nanmin(x), np.nanmax(x))
+    if GRAPH_STYLES[graph_type].get("energy_ylim"):
+        bottom, top = energy_ylim(y)
+        ax.set_ylim(bottom, top)
+    figure.tight_layout()
+    save_report_figure(figure, path)
+
+def render_report_graph_file(csv_path, start, end, graph_type, path, xlim=None):
+    """Tâche d'un processus de rendu : recharge la plage de session et enregistre un graphique"""
+    selection = SessionView(load_session_data(csv_path)).with_range(start, end)
+    render_report_graph(selection, graph_type, path, xlim)
+    return path
+
+def render_report_graphs(jobs, progress_callback=None, is_cancelled=None, max_workers=None):
+    """Rend des graphiques de rapport (arguments de render_report_graph_file) en parallèle.
+
+    progress_callback(fait, total, fichier, erreur) est appelé après chaque
+    image ; is_cancelled() permet d'interrompre. Retourne la liste des erreurs.
+    """
+    errors = []
+    total = len(jobs)
+    if total == 0:
+        return errors
+    with make_process_pool(min(max_workers or os.cpu_count() or 1, total)) as pool:
+        futures = {pool.submit(render_report_graph_file, **job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            filename = os.path.basename(futures[future]["path"])
+            error = None
+            try:
+                future.result()
+            except Exception as e:
+                error = str(e)
+                errors.append((filename, error))
+                print(f"Erreur lors du rendu de {filename}: {e}")
+            if progress_callback:
+                progress_callback(done, total, filename, error)
+            if is_cancelled and is_cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+    return errors
+
+def mercator_pixels(lat, lon, zoom):
+    """Coordonnées en pixels Web Mercator (tuiles de 256 px) au niveau de zoom donné"""
+    scale = 256 * 2 ** zoom
+    x = (np.asarray(lon) + 180.0) / 360.0 * scale
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2.0 * scale
+    return x, y
+
+def render_static_map(latitudes, longitudes, path, width=1200, height=800, speeds=None,
+                      padding=60, max_zoom=18):
+    """Carte PNG du trajet à la résolution finale : tuiles du cache, tracé, départ/arrivée.
+
+    Le zoom est le plus fort qui fait tenir le trajet dans l'image. Les tuiles
+    absentes du cache sont téléchargées ; après un premier échec (hors ligne),
+    seules les tuiles en cache sont utilisées et les autres restent grises.
+    speeds colore le tracé selon la vitesse. Retourne False sans point GPS valide.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    if not valid.any():
+        return False
+    lat, lon = latitudes[valid], longitudes[valid]
+
+    zoom = 1
+    for candidate in range(max_zoom, 0, -1):
+        x, y = mercator_pixels(lat, lon, candidate)
+        if x.max() - x.min() <= width - 2 * padding and y.max() - y.min() <= height - 2 * padding:
+            zoom = candidate
+            break
+    x, y = mercator_pixels(lat, lon, zoom)
+    origin_x = int((x.max() + x.min()) / 2 - width / 2)
+    origin_y = int((y.max() + y.min()) / 2 - height / 2)
+
+    # Fond de carte : assemblage des tuiles
+    canvas = np.full((height, width, 3), 0.9, dtype=np.float32)
+    n_tiles = 2 ** zoom
+    offline = False
+    for tx in range(origin_x // 256, (origin_x + width - 1) // 256 + 1):
+        for ty in range(max(origin_y // 256, 0), min((origin_y + height - 1) // 256, n_tiles - 1) + 1):
+            if offline and not os.path.exists(tile_cache_path(zoom, tx % n_tiles, ty)):
+                continue
+            try:
+                data = get_tile(zoom, tx % n_tiles, ty)
+            except Exception as e:
+                print(f"Tuiles indisponibles, carte avec le cache seul: {e}")
+                offline = True
+                continue
+            try:
+                tile = plt.imread(io.BytesIO(data), format="png")
+            except Exception:
+                continue
+            if tile.dtype == np.uint8:
+                tile = tile / 255.0
+            if tile.ndim == 2:
+                tile = np.stack([tile] * 3, axis=-1)
+            left, top = tx * 256 - origin_x, ty * 256 - origin_y
+            x0, y0 = max(left, 0), max(top, 0)
+            x1, y1 = min(left + 256, width), min(top + 256, height)
+            canvas[y0:y1, x0:x1] = tile[y0 - top:y1 - top, x0 - left:x1 - left, :3]
+
+    figure = Figure(figsize=(width / 100, height / 100), dpi=100)
+    FigureCanvasAgg(figure)
+    ax = figure.add_axes([0, 0, 1, 1])
+    ax.imshow(canvas, extent=(0, width, height, 0), interpolation="nearest")
+    px, py = x - origin_x, y - origin_y
+
+    # Tracé GPS (bleu, ou coloré selon la vitesse)
+    if speeds is not None and len(px) > 1:
+        speed = np.asarray(speeds, dtype=np.float64)[valid]
+        points = np.column_stack((px, py))
+        segments = np.stack((points[:-1], points[1:]), axis=1)
+        route = LineCollection(segments, cmap="RdYlGn_r", linewidths=5, capstyle="round")
+        route.set_array((speed[:-1] + speed[1:]) / 2)
+        ax.add_collection(route)
+        colorbar_ax = figure.add_axes([0.03, 0.09, 0.25, 0.02])
+        figure.colorbar(route, cax=colorbar_ax, orientation="horizontal").set_label("Vitesse (km/h)")
+    else:
+        ax.plot(px, py, color="blue", linewidth=5, alpha=0.7)
+
+    # Marqueurs départ (vert) et arrivée (rouge)
+    ax.plot(px[0], py[0], "o", markersize=20, markerfacecolor="green", markeredgecolor="white", markeredgewidth=2)
+    ax.plot(px[-1], py[-1], "o", markersize=20, markerfacecolor="red", markeredgecolor="white", markeredgewidth=2)
+
+    ax.text(width - 4, height - 4, "© OpenStreetMap contributors", ha="right", va="bottom", fontsize=8,
+            bbox=dict(facecolor="white", alpha=0.7, edgecolor="none", pad=2))
+    ax.set_xlim(0, width)
+    ax.set_ylim(height, 0)
+    ax.set_axis_off()
+    figure.savefig(path, dpi=100)
+    return True
+
+def load_session_comment(csv_path, comments_file="comments.json"):
+    """Commentaire enregistré pour une session (clé : chemin utilisé par l'interface)"""
+    if not os.path.exists(comments_file):
+        return ""
+    try:
+        with open(comments_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return ""
+    return data.get(csv_path) or data.get(os.path.join(DATA_FOLDER, os.path.basename(csv_path)), "")
+
+def generate_session_report(csv_path, report_name=None, start_time=None, end_time=None,
+                            include_base=True, output_dir=REPORTS_FOLDER, graph_types=None,
+                            speed_colours=False):
+    """Génère le rapport d'une session (CSV, graphiques, carte, HTML) sans interface.
+
+    start_time/end_time (en secondes, colonne Temps) limitent la plage analysée.
+    Même organisation que le rapport de l'interface. Retourne le dossier du rapport.
+    """
+    df = load_session_data(csv_path)
+    session = SessionView(df)
+    if len(session) == 0:
+        raise ValueError("session vide")
+    start, end = 0, len(session) - 1
+    if session.time_index is not None and (start_time is not None or end_time is not None):
+        # Plage ramenée aux échantillons qui y tombent vraiment (pas d'accrochage au plus proche)
+        times = session.time_index.times
+        low = -np.inf if start_time is None else start_time
+        high = np.inf if end_time is None else end_time
+        if session.time_index.monotonic:
+            start = int(np.searchsorted(times, low, side="left"))
+            end = int(np.searchsorted(times, high, side="right")) - 1
+        else:
+            inside = np.flatnonzero((times >= low) & (times <= high))
+            start, end = (int(inside[0]), int(inside[-1])) if len(inside) else (1, 0)
+        if high < np.nanmin(times) or low > np.nanmax(times) or high < low:
+            raise ValueError(f"plage {start_time}s - {end_time}s hors de la session "
+                             f"({np.nanmin(times):.0f}s - {np.nanmax(times):.0f}s)")
+    if end - start + 1 < 2:
+        raise ValueError(f"plage {start_time}s - {end_time}s : moins de 2 échantillons")
+    selection = session.with_range(start, end)
+
+    if report_name is None:
+        report_name = f"Rapport_{os.path.splitext(os.path.basename(csv_path))[0]}"
+        if start_time is not None or end_time is not None:
+            report_name += f"_{selection['Temps'][0]:.0f}-{selection['Temps'][-1]:.0f}s"
+    report_dir = os.path.join(output_dir, report_name)
+    graphs_dir = os.path.join(report_dir, "graphiques")
+    shutil.rmtree(graphs_dir, ignore_errors=True)  # Rapport regénéré : pas d'anciens graphiques
+    os.makedirs(graphs_dir)
+
+    # Données CSV
+    if include_base:
+        shutil.copy2(csv_path, os.path.join(report_dir, f"{report_name}_donnees_completes.csv"))
+    selection.to_frame().to_csv(os.path.join(report_dir, f"{report_name}_donnees_selection.csv"), index=False)
+
+    # Graphiques
+    graph_files = []
+    for graph_type in graph_types or REPORT_GRAPH_TYPES:
+        graph_file = f"graphique_{len(graph_files) + 1}.png"
+        try:
+            render_report_graph(selection, graph_type, os.path.join(graphs_dir, graph_file))
+        except KeyError:
+            continue  # Colonnes absentes de cette session
+        graph_files.append(graph_file)
+
+    # Carte
+    if "Lat" in selection.columns and "Lon" in selection.columns:
+        speeds = selection["Vitesse"] if speed_colours and "Vitesse" in selection.columns else None
+        render_static_map(selection["Lat"], selection["Lon"], os.path.join(report_dir, "carte_gps.png"),
+                          speeds=speeds)
+
+    stats = SessionStatsIndex(session).summary(start, end)
+    comments = load_session_comment(csv_path) or "Aucun commentaire"
+    html_content = build_report_html(report_name, stats, len(selection), graph_files, comments,
+                                     include_base, os.path.basename(csv_path))
+    with open(os.path.join(report_dir, f"{report_name}.html"), "w", encoding="utf-8") as f:
+        f.write(html_content)
+    return report_dir
+
+def generate_reports(jobs, max_workers=None, progress_callback=None):
+    """Génère plusieurs rapports (dictionnaires d'arguments de generate_session_report).
+
+    Chaque rapport est produit dans un processus du pool. Retourne
+    (dossiers générés, erreurs) ; progress_callback(fait, total, job, erreur).
+    """
+    reports, errors = [], []
+    total = len(jobs)
+
+    def collect(done, job, compute):
+        error = None
+        try:
+            reports.append(compute())
+        except Exception as e:
+            error = str(e)
+            errors.append((job["csv_path"], error))
+            print(f"Erreur rapport {os.path.basename(job['csv_path'])}: {e}")
+        if progress_callback:
+            progress_callback(done, total, job, error)
+
+    if total <= 1 or max_workers == 1:
+        for done, job in enumerate(jobs, 1):
+            collect(done, job, lambda: generate_session_report(**job))
+    else:
+        with make_process_pool(min(max_workers or os.cpu_count() or 1, total)) as pool:
+            futures = {pool.submit(generate_session_report, **job): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                collect(done, futures[future], future.result)
+    return reports, errors
+
+def parse_report_target(target, start_time=None, end_time=None):
+    """'fichier.csv' ou 'fichier.csv@debut-fin' (secondes) → arguments de generate_session_report"""
+    csv_path, _, time_range = target.partition("@")
+    if time_range:
+        start_text, _, end_text = time_range.partition("-")
+        start_time = float(start_text) if start_text else None
+        end_time = float(end_text) if end_text else None
+    if not os.path.exists(csv_path) and os.path.exists(os.path.join(DATA_FOLDER, csv_path)):
+        csv_path = os.path.join(DATA_FOLDER, csv_path)
+    return {"csv_path": csv_path, "start_time": start_time, "end_time": end_time}
+
+def run_report_cli(argv):
+    """Point d'entrée en ligne de commande : rapports sans affichage"""
+    parser = argparse.ArgumentParser(
+        prog="styx_analyse_pyqt6.py --rapport",
+        description="Génère des rapports de sessions sans interface graphique."
+    )
+    parser.add_argument("sessions", nargs="*",
+                        help="fichiers CSV de session, éventuellement suivis de @debut-fin (secondes)")
+    parser.add_argument("--date", help="toutes les sessions importées de ce jour (AAAA-MM-JJ)")
+    parser.add_argument("--debut", type=float, help="début de plage (s) pour toutes les sessions")
+    parser.add_argument("--fin", type=float, help="fin de plage (s) pour toutes les sessions")
+    parser.add_argument("--sortie", default=REPORTS_FOLDER, help="dossier des rapports")
+    parser.add_argument("--sans-base", action="store_true", help="ne pas copier le CSV complet")
+    parser.add_argument("--vitesse-carte", action="store_true", help="colorer le tracé de la carte selon la vitesse")
+    parser.add_argument("--processus", type=int, default=None, help="nombre de processus")
+    args = parser.parse_args(argv)
+
+    targets = list(args.sessions)
+    if args.date:
+        # Jour d'import, pas jour du trajet : un trajet du dimanche importé lundi part lundi
+        catalog = load_catalog()
+        targets += sorted(f for f in list_session_files() if session_import_date(f, catalog) == args.date)
+    if not targets:
+        parser.error("aucune session à traiter")
+
+    jobs = []
+    for target in targets:
+        job = parse_report_target(target, args.debut, args.fin)
+        job["include_base"] = not args.sans_base
+        job["output_dir"] = args.sortie
+        job["speed_colours"] = args.vitesse_carte
+        jobs.append(job)
+
+    def progress(done, total, job, error):
+        status = f"❌ {error}" if error else "✅"
+        print(f"[{done}/{total}] {os.path.basename(job['csv_path'])} {status}")
+
+    reports, errors = generate_reports(jobs, args.processus, progress)
+    print(f"{len(reports)} rapport(s) généré(s) dans {os.path.abspath(args.sortie)}")
+    return 1 if errors else 0
+
+
+def run_inbox_cli(argv):
+    """Point d'entrée en ligne de commande : import automatique d'un dossier surveillé"""
+    parser = argparse.ArgumentParser(
+        prog="styx_analyse_pyqt6.py --surveiller",
+        description="Importe les CSV déposés dans un dossier, sans interface graphique."
+    )
+    parser.add_argument("dossier", nargs="?",
+                        help="dossier à surveiller (par défaut celui choisi dans l'application)")
+    args = parser.parse_args(argv)
+
+    folder = args.dossier or load_inbox_settings()["folder"]
+    if not folder or not os.path.isdir(folder):
+        parser.error("aucun dossier à surveiller")
+    if os.path.abspath(folder) != os.path.abspath(load_inbox_settings()["folder"] or ""):
+        save_inbox_settings({"folder": os.path.abspath(folder), "files": {}})
+
+    app = QCoreApplication(sys.argv[:1])
+    watcher = InboxWatcher(os.path.abspath(folder))
+    watcher.file_status.connect(
+        lambda path, status, detail: print(f"{os.path.basename(path)} : {status} {detail}".rstrip())
+    )
+
+    # Ctrl+C : arrêt propre (la boucle Qt doit rendre la main à Python pour voir le signal)
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    wake_timer = QTimer()
+    wake_timer.timeout.connect(lambda: None)
+    wake_timer.start(200)
+
+    print(f"Surveillance de {os.path.abspath(folder)} (Ctrl+C pour arrêter)")
+    code = app.exec()
+    watcher.stop()
+    return code
+
+
+# --- Widget graphique individuel ---
+class GraphWidget(QWidget):
+    def __init__(self, graph_id, on_cursor_change, on_zoom_change=None, advanced_mode_callback=None):
+        super().__init__()
+        self.graph_id = graph_id
+        self.on_cursor_change = on_cursor_change
+        self.on_zoom_change = on_zoom_change
+        self.advanced_mode_callback = advanced_mode_callback
+        self.data = None
+        self.current_type = "Aucun"
+        self.line = None
+        self.fills = []
+        self.x_full = None
+        self.y_full = None
+        self.x_sorted = True
+        self.decimating = False
+        self.cursor_line = None
+        self.range_span = None
+        self.background = None
+        self.locked = False
+        self.zoom_active = False
+        self.advanced_mode = False
+        self.toolbar = None
+
+        # Survol : seul le dernier mouvement de souris est traité à chaque image
+        self.pending_hover_time = None
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.setInterval(HOVER_INTERVAL_MS)
+        self.hover_timer.timeout.connect(self.flush_hover)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(2)
         
-        # Ligne de curseur
-        self.cursor_line = self.ax.axvline(x=0, color='red', linestyle='--', linewidth=3, alpha=0.8)
+        # Sélecteur de graphique
+        self.graph_selector = QComboBox()
+        self.graph_selector.currentTextChanged.connect(self.update_graph)
+        layout.addWidget(self.graph_selector)
+        
+        # Zone de graphique
+        self.figure = plt.figure(figsize=(5, 3))
+        self.ax = self.figure.add_subplot(111)
+        self.figure_canvas = FigureCanvas(self.figure)
         
-        self.ax.set_xlabel("Temps (s)")
-        self.ax.grid(True, alpha=0.3)
-        self.ax.set_title(graph_type)
+        # Créer la toolbar mais masquée par défaut
+        from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
+        self.toolbar = NavigationToolbar2QT(self.figure_canvas, self)
+        self.toolbar.setMaximumHeight(25)
+        self.toolbar.hide()
         
-        # Événements souris
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.figure_canvas)
+
+        # Événements souris (connectés une seule fois)
         self.figure_canvas.mpl_connect('motion_notify_event', self.on_graph_hover)
         self.figure_canvas.mpl_connect('button_press_event', self.on_graph_click)
+
+        # Calque du curseur : fond mémorisé à chaque dessin, invalidé au redimensionnement
+        self.figure_canvas.mpl_connect('draw_event', self.on_canvas_draw)
+        self.figure_canvas.mpl_connect('resize_event', self.invalidate_background)
+        self.figure_canvas.mpl_connect('resize_event', self.on_view_changed)
         
-        # Zoom synchronisé en mode avancé
-        is_advanced = self.advanced_mode_callback() if self.advanced_mode_callback else False
-        if is_advanced:
-            self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+        self.setLayout(layout)
+
+    def set_advanced_mode(self, advanced_mode):
+        """Affiche/masque la toolbar selon le mode"""
+        was_advanced = self.advanced_mode
+        self.advanced_mode = advanced_mode
+        if advanced_mode:
+            self.toolbar.show()
+        else:
+            self.toolbar.hide()
+            if was_advanced and self.data is not None:
+                self.reset_zoom()
+
+    def reset_zoom(self):
+        """Remet le graphique à l'échelle par défaut"""
+        if self.data is not None and len(self.data) > 0:
+            self.zoom_active = True
+            self.ax.set_xlim(np.nanmin(self.data["Temps"]), np.nanmax(self.data["Temps"]))
+            self.zoom_active = False
+            self.request_redraw()
+
+    def set_data(self, data):
+        """Associe une SessionView (plage courante) au graphique"""
+        self.data = data
+
+    def get_available_options(self, advanced_mode=False):
+        """Retourne les options disponibles selon le mode"""
+        if self.data is None:
+            return ["Aucun"]
+            
+        options = ["Aucun"]
+        
+        # Mode normal
+        if "Tension" in self.data.columns:
+            options.append("Tension")
+        if "Vitesse" in self.data.columns:
+            options.append("Vitesse")
+        if "GazFrein" in self.data.columns:
+            options.append("GazFrein")
+        if "WHCharged" in self.data.columns and "WHDischarged" in self.data.columns:
+            options.append("Énergie (bilan)")
+        if "Tension" in self.data.columns and "CurrentIn" in self.data.columns:
+            options.append("Puissance électrique")
+        if "Alt" in self.data.columns:
+            options.append("Altitude")
+        
+        # Mode avancé
+        if advanced_mode:
+            if "WHCharged" in self.data.columns:
+                options.append("Énergie chargée")
+            if "WHDischarged" in self.data.columns:
+                options.append("Énergie déchargée")
+            if "Distance" in self.data.columns:
+                options.append("Distance (capteur)")
+            if "Distance_GPS" in self.data.columns:
+                options.append("Distance (GPS)")
+            if "CurrentIn" in self.data.columns:
+                options.append("Courant entrant")
+            if "MotorCurrent" in self.data.columns:
+                options.append("Courant moteur")
+            if "Lat" in self.data.columns:
+                options.append("Latitude")
+            if "Lon" in self.data.columns:
+                options.append("Longitude")
+            if "Vsat" in self.data.columns:
+                options.append("Vitesse satellite")
+            if "Cap" in self.data.columns:
+                options.append("Cap")
+            if "Sat" in self.data.columns:
+                options.append("Satellites")
+            if "HDOP" in self.data.columns:
+                options.append("HDOP")
         
+        return options
+
+    def update_options(self, advanced_mode=False):
+        """Met à jour les options de la liste déroulante et les données tracées"""
+        if self.data is None:
+            return
+            
+        current_selection = self.graph_selector.currentText()
+        options = self.get_available_options(advanced_mode)
+        existing = [self.graph_selector.itemText(i) for i in range(self.graph_selector.count())]
+        
+        if options != existing:
+            # Remplir sans déclencher un redessin à chaque ajout
+            self.graph_selector.blockSignals(True)
+            self.graph_selector.clear()
+            self.graph_selector.addItems(options)
+            if current_selection in options:
+                self.graph_selector.setCurrentText(current_selection)
+            else:
+                self.graph_selector.setCurrentText("Aucun")
+            self.graph_selector.blockSignals(False)
+        
+        self.set_advanced_mode(advanced_mode)
+
+        graph_type = self.graph_selector.currentText()
+        if graph_type == self.current_type and graph_type != "Aucun":
+            self.refresh_data()
+        else:
+            self.update_graph(graph_type)
+
+    def update_graph(self, graph_type):
+        """Reconstruit le graphique (changement de type de graphique uniquement)"""
+        # Oublier les artistes avant ax.clear(), qui peut encore notifier xlim_changed
+        self.line = None
+        self.fills = []
+        self.cursor_line = None
+        self.range_span = None
+        self.ax.clear()
+        self.current_type = graph_type
+
+        if self.data is None or graph_type not in GRAPH_STYLES or len(self.data) == 0:
+            self.current_type = "Aucun"
+            self.ax.set_title("Aucun graphique sélectionné")
+            self.figure.tight_layout()
+            self.request_redraw()
+            return
+
+        self.set_full_series(np.asarray(self.data["Temps"], dtype=np.float64),
+                             compute_graph_series(self.data, graph_type))
+        x, y = self.decimated_series(self.x_full[0], self.x_full[-1])
+
+        self.line, self.fills = draw_graph(self.ax, graph_type, x, y)
+
+        # Ligne de curseur
+        self.cursor_line = self.ax.axvline(x=0, color='red', linestyle='--', linewidth=3, alpha=0.8, animated=True)
+
+        # ax.clear() réinitialise les callbacks de l'axe : zoom synchronisé
+        # et invalidation du fond du curseur
+        self.ax.callbacks.connect('xlim_changed', self.invalidate_background)
+        self.ax.callbacks.connect('ylim_changed', self.invalidate_background)
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+        self.ax.callbacks.connect('xlim_changed', self.on_view_changed)
+
+        self.apply_limits()
         self.figure.tight_layout()
-        self.figure_canvas.draw()
+        self.request_redraw()
+
+    def refresh_data(self):
+        """Met à jour les artistes existants avec les nouvelles données, sans reconstruire"""
+        if self.line is None or self.data is None or len(self.data) == 0:
+            self.update_graph(self.graph_selector.currentText())
+            return
+
+        # La plage est appliquée (ou réinitialisée) : son aperçu n'a plus lieu d'être
+        if self.range_span is not None:
+            self.range_span.remove()
+            self.range_span = None
+        self.set_full_series(np.asarray(self.data["Temps"], dtype=np.float64),
+                             compute_graph_series(self.data, self.current_type))
+        self.apply_limits()
+        self.request_redraw()
+
+    def set_full_series(self, x, y):
+        """Mémorise la série complète ; seuls des points décimés sont tracés"""
+        self.x_full = x
+        self.y_full = y
+        self.x_sorted = len(x) < 2 or bool(np.all(np.diff(x) >= 0))
+
+    def decimated_series(self, x_min, x_max):
+        """Points de la série à tracer pour la fenêtre visible et la largeur du canevas"""
+        n_buckets = max(int(self.ax.bbox.width), 100)
+        if self.x_sorted:
+            indices = minmax_decimate(self.x_full, self.y_full, x_min, x_max, n_buckets)
+        else:
+            # Temps non trié : décimation sur toute la série, par paquets d'indices
+            positions = np.arange(len(self.x_full), dtype=np.float64)
+            indices = minmax_decimate(positions, self.y_full, 0, len(positions), n_buckets)
+        return self.x_full[indices], self.y_full[indices]
+
+    def apply_decimation(self):
+        """Remplace les données tracées par la décimation de la vue courante"""
+        # fill_between peut réajuster les axes et renotifier xlim_changed
+        if self.line is None or self.decimating:
+            return
+        self.decimating = True
+        try:
+            x_min, x_max = self.ax.get_xlim()
+            x, y = self.decimated_series(x_min, x_max)
+            self.line.set_data(x, y)
+
+            # Les zones remplies sont des polygones : on remplace seulement ceux-ci
+            for fill in self.fills:
+                fill.remove()
+            self.fills = add_graph_fills(self.ax, self.current_type, x, y)
+        finally:
+            self.decimating = False
+
+    def on_view_changed(self, *args):
+        """Zoom, déplacement ou redimensionnement : nouvelle décimation"""
+        self.apply_decimation()
+
+    def apply_limits(self):
+        """Ajuste les axes aux données (X serré sur la plage, Y automatique) puis décime"""
+        x, y = self.x_full, self.y_full
+        self.zoom_active = True
+        if len(x) > 1 and np.nanmax(x) > np.nanmin(x):
+            self.ax.set_xlim(np.nanmin(x), np.nanmax(x))  # décime via xlim_changed
+        else:
+            self.apply_decimation()
+        # Le min et le max de chaque paquet sont conservés : l'échelle Y est exacte
+        self.ax.relim()
+        self.ax.autoscale_view(scalex=False)
+        if GRAPH_STYLES[self.current_type].get("energy_ylim"):
+            bottom, top = energy_ylim(y)
+            self.ax.set_ylim(bottom, top)
+        self.zoom_active = False
 
     def on_xlim_changed(self, ax):
-        """Callback zoom"""
-        if self.on_zoom_change and not self.zoom_active:
+        """Callback zoom (synchronisé en mode avancé uniquement)"""
+        is_advanced = self.advanced_mode_callback() if self.advanced_mode_callback else False
+        if self.on_zoom_change and not self.zoom_active and is_advanced:
             xlims = ax.get_xlim()
             self.on_zoom_change(self.graph_id, xlims)
 
@@ -1209,56 +3773,112 @@ class GraphWidget(QWidget):
         """Applique le zoom"""
         self.zoom_active = True
         self.ax.set_xlim(xlims)
-        self.figure_canvas.draw_idle()
+        self.request_redraw()
         self.zoom_active = False
 
     def on_graph_hover(self, event):
-        if self.locked or event.inaxes != self.ax or self.df is None:
+        if self.locked or event.inaxes != self.ax or self.data is None:
             return
         time_value = event.xdata
         if time_value is None:
             return
+        self.pending_hover_time = time_value
+        if not self.hover_timer.isActive():
+            self.hover_timer.start()
+
+    def flush_hover(self):
+        """Déplace le curseur vers la dernière position de souris reçue"""
+        time_value = self.pending_hover_time
+        self.pending_hover_time = None
+        if time_value is None or self.locked or self.data is None or len(self.data) == 0:
+            return
         closest_index = self.find_closest_index(time_value)
         self.on_cursor_change(closest_index, lock=False)
 
     def on_graph_click(self, event):
-        if event.inaxes != self.ax or self.df is None:
+        if event.inaxes != self.ax or self.data is None:
             return
         time_value = event.xdata
         if time_value is None:
             return
+        self.hover_timer.stop()
+        self.pending_hover_time = None
         closest_index = self.find_closest_index(time_value)
         self.locked = not self.locked
         self.on_cursor_change(closest_index, lock=self.locked)
 
     def find_closest_index(self, time_value):
-        time_diff = abs(self.df["Temps"] - time_value)
-        return time_diff.idxmin()
+        return self.data.nearest_index(time_value)
 
     def update_cursor_position(self, index):
-        if self.df is None or index >= len(self.df) or self.cursor_line is None:
+        if self.data is None or index >= len(self.data) or self.cursor_line is None:
             return
-        row = self.df.iloc[index]
-        self.cursor_line.set_xdata([row["Temps"], row["Temps"]])
+        time_value = self.data["Temps"][index]
+        self.cursor_line.set_xdata([time_value, time_value])
         color = 'orange' if self.locked else 'red'
         self.cursor_line.set_color(color)
-        self.figure_canvas.draw_idle()
+        self.draw_overlay()
+
+    def set_range_preview(self, start_time, end_time):
+        """Ombre la plage en cours de sélection (None pour l'effacer)"""
+        if self.range_span is not None:
+            self.range_span.remove()
+            self.range_span = None
+        if start_time is not None and self.data is not None and self.cursor_line is not None:
+            self.range_span = self.ax.axvspan(start_time, end_time, color='#3498db', alpha=0.15, animated=True)
+        self.draw_overlay()
 
     def unlock(self):
         self.locked = False
         if self.cursor_line:
             self.cursor_line.set_color('red')
+            self.draw_overlay()
+
+    # --- Calque du curseur (blitting) ---
+    # Le curseur et la zone de plage sont des artistes "animated" : ils ne sont
+    # pas dessinés avec le reste de la figure. Après chaque dessin complet on
+    # garde une copie du fond, puis on ne repeint que ces artistes par-dessus.
+
+    def request_redraw(self):
+        """Demande un dessin complet ; le fond mémorisé n'est plus valable"""
+        self.background = None
+        self.figure_canvas.draw_idle()
+
+    def invalidate_background(self, *args):
+        self.background = None
+
+    def on_canvas_draw(self, event):
+        """Après un dessin complet : mémorise le fond et dessine le calque"""
+        self.background = self.figure_canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_overlay_artists()
+
+    def draw_overlay_artists(self):
+        if self.range_span is not None:
+            self.ax.draw_artist(self.range_span)
+        if self.cursor_line is not None:
+            self.ax.draw_artist(self.cursor_line)
+
+    def draw_overlay(self):
+        """Repeint uniquement le curseur et la zone de plage sur le fond mémorisé"""
+        if self.background is None:
+            # Un dessin complet est en attente (ou nécessaire) : il peindra le calque
             self.figure_canvas.draw_idle()
+            return
+        self.figure_canvas.restore_region(self.background)
+        self.draw_overlay_artists()
+        self.figure_canvas.blit(self.figure.bbox)
 
 
-from PyQt6.QtWidgets import *
-from PyQt6.QtCore import *
-from PyQt6.QtGui import *
+if QT_AVAILABLE:
+    from PyQt6.QtWidgets import *
+    from PyQt6.QtCore import *
+    from PyQt6.QtGui import *
 
 class DualHandleSlider(QWidget):
     """Curseur personnalisé avec deux poignées pour sélectionner une plage"""
     
-    rangeChanged = pyqtSignal(int, int)  # Signal émis quand la plage change
+    rangeChanging = pyqtSignal(int, int)  # Émis à chaque mouvement pendant un glissement
+    rangeChanged = pyqtSignal(int, int)  # Émis quand la plage est validée (relâchement)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -1385,7 +4005,7 @@ class DualHandleSlider(QWidget):
                         self.right_value = self.left_value + 1
                 
                 self.update()
-                self.rangeChanged.emit(self.left_value, self.right_value)
+                self.rangeChanging.emit(self.left_value, self.right_value)
                 
     def mouseMoveEvent(self, event):
         if self.dragging:
@@ -1397,18 +4017,245 @@ class DualHandleSlider(QWidget):
                 self.right_value = max(self.left_value + 1, min(new_value, self.maximum))
                 
             self.update()
-            self.rangeChanged.emit(self.left_value, self.right_value)
+            self.rangeChanging.emit(self.left_value, self.right_value)
             
     def mouseReleaseEvent(self, event):
+        if self.dragging:
+            self.rangeChanged.emit(self.left_value, self.right_value)
         self.dragging = None
 
 
+# --- Page de carte (chargée une seule fois par AnalysisPage) ---
+# Le trajet complet est transmis une fois par session (setTrack) ; un changement
+# de plage n'envoie ensuite que les indices de début et de fin (showRange).
+# MAP_SERVER_URL est remplacé par l'adresse du serveur local (map_server_url).
+MAP_PAGE_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    <title>Carte GPS</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="stylesheet" href="MAP_SERVER_URL/leaflet/leaflet.css" />
+    <script src="MAP_SERVER_URL/leaflet/leaflet.js"></script>
+    <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+    <style>
+        #mapid { height: 100%; width: 100%; }
+        html, body { height: 100%; margin: 0; }
+        #message { display: none; }
+        .custom-marker {
+            background: transparent;
+            border: none;
+            font-size: 16px;
+        }
+    </style>
+</head>
+<body>
+    <div id="message"></div>
+    <div id="mapid"></div>
+    <script>
+        var map = L.map('mapid');
+        L.tileLayer('MAP_SERVER_URL/tiles/{z}/{x}/{y}.png', {
+            maxZoom: 19,
+            attribution: '© OpenStreetMap contributors'
+        }).addTo(map);
+
+        // Trajet complet de la session : [lat, lon] par échantillon, null si invalide,
+        // et importance Douglas–Peucker (m) de chaque point
+        var track = [];
+        var importance = [];
+        var rangeStart = 0;
+        var rangeEnd = -1;
+        var firstValid = -1;
+        var lastValid = -1;
+
+        var routeLayer = L.polyline([], { color: '#3388ff', weight: 4, opacity: 0.8 });
+
+        // Marqueur de départ (vert avec icône play) - taille uniforme
+        var startIcon = L.divIcon({
+            className: 'custom-marker',
+            html: '<div style="background-color: #27ae60; color: white; width: 24px; height: 24px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.3); font-weight: bold; font-size: 12px;">▶</div>',
+            iconSize: [24, 24],
+            iconAnchor: [12, 12]
+        });
+        var startMarker = L.marker([0, 0], { icon: startIcon, title: 'Départ' });
+        startMarker.bindPopup('<b>🏁 Départ</b><br>Début de la sélection');
+
+        // Marqueur d'arrivée (rouge avec icône stop) - taille uniforme
+        var endIcon = L.divIcon({
+            className: 'custom-marker',
+            html: '<div style="background-color: #e74c3c; color: white; width: 24px; height: 24px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.3); font-weight: bold; font-size: 12px;">⏹</div>',
+            iconSize: [24, 24],
+            iconAnchor: [12, 12]
+        });
+        var endMarker = L.marker([0, 0], { icon: endIcon, title: 'Arrivée' });
+        endMarker.bindPopup('<b>🏁 Arrivée</b><br>Fin de la sélection');
+
+        // Curseur de position actuelle (orange) - même taille que les autres
+        var cursorMarker = L.circleMarker([0, 0], {
+            radius: 10,
+            fillColor: '#f39c12',
+            color: '#ffffff',
+            weight: 2,
+            opacity: 1,
+            fillOpacity: 0.8
+        });
+        cursorMarker.bindPopup('<b>📍 Position actuelle</b>');
+
+        function showLayer(layer) {
+            if (!map.hasLayer(layer)) {
+                layer.addTo(map);
+            }
+        }
+
+        window.showMessage = function(html) {
+            document.getElementById('mapid').style.display = 'none';
+            var message = document.getElementById('message');
+            message.innerHTML = html;
+            message.style.display = 'block';
+        };
+
+        window.setTrack = function(coords, weights) {
+            track = coords;
+            importance = weights;
+        };
+
+        function segmentVisible(a, b, bounds) {
+            return L.latLngBounds([a, b]).intersects(bounds);
+        }
+
+        // Tracé adapté au zoom (points d'importance >= 1 pixel) et limité à la vue
+        function refreshTrace() {
+            if (firstValid < 0) {
+                return;
+            }
+            var center = map.getCenter();
+            var tolerance = 40075016.686 * Math.cos(center.lat * Math.PI / 180) / Math.pow(2, map.getZoom() + 8);
+            var kept = [];
+            for (var i = firstValid; i <= lastValid; i++) {
+                if (track[i] && importance[i] >= tolerance) {
+                    kept.push(track[i]);
+                }
+            }
+            if (lastValid !== firstValid && importance[lastValid] < tolerance) {
+                kept.push(track[lastValid]);
+            }
+            if (importance[firstValid] < tolerance) {
+                kept.unshift(track[firstValid]);
+            }
+
+            // Segments hors de la vue (avec marge) retirés : le tracé est coupé en morceaux
+            var bounds = map.getBounds().pad(0.5);
+            var runs = [];
+            var run = [];
+            for (var k = 0; k < kept.length; k++) {
+                var visible = bounds.contains(kept[k]) ||
+                    (k > 0 && segmentVisible(kept[k - 1], kept[k], bounds)) ||
+                    (k + 1 < kept.length && segmentVisible(kept[k], kept[k + 1], bounds));
+                if (visible) {
+                    run.push(kept[k]);
+                } else if (run.length) {
+                    runs.push(run);
+                    run = [];
+                }
+            }
+            if (run.length) {
+                runs.push(run);
+            }
+            routeLayer.setLatLngs(runs);
+        }
+
+        map.on('moveend', refreshTrace);
+
+        window.showRange = function(start, end) {
+            rangeStart = start;
+            rangeEnd = Math.min(end, track.length - 1);
+            firstValid = -1;
+            lastValid = -1;
+            var south = Infinity, west = Infinity, north = -Infinity, east = -Infinity;
+            for (var i = rangeStart; i <= rangeEnd; i++) {
+                var p = track[i];
+                if (p) {
+                    if (firstValid < 0) {
+                        firstValid = i;
+                    }
+                    lastValid = i;
+                    south = Math.min(south, p[0]);
+                    north = Math.max(north, p[0]);
+                    west = Math.min(west, p[1]);
+                    east = Math.max(east, p[1]);
+                }
+            }
+            if (firstValid < 0) {
+                window.showMessage('<h3>Aucune donnée GPS valide.</h3>');
+                return;
+            }
+
+            document.getElementById('message').style.display = 'none';
+            document.getElementById('mapid').style.display = 'block';
+            map.invalidateSize();
+
+            startMarker.setLatLng(track[firstValid]);
+            endMarker.setLatLng(track[lastValid]);
+            map.fitBounds([[south, west], [north, east]]);
+            refreshTrace();
+            showLayer(routeLayer);
+            showLayer(startMarker);
+            showLayer(endMarker);
+        };
+
+        // Objet Python (MapBridge) : les événements de la carte lui sont poussés
+        var bridge = null;
+        if (typeof qt !== 'undefined') {
+            new QWebChannel(qt.webChannelTransport, function(channel) {
+                bridge = channel.objects.bridge;
+            });
+        }
+
+        // Clic : la position est envoyée à Python, qui cherche le point le plus proche
+        map.on('click', function(e) {
+            if (bridge) {
+                bridge.mapClicked(e.latlng.lat, e.latlng.lng);
+            }
+        });
+
+        window.updateCursor = function(lat, lon) {
+            if (lat != null && lon != null && !isNaN(lat) && !isNaN(lon)) {
+                cursorMarker.setLatLng([lat, lon]);
+                showLayer(cursorMarker);
+            } else if (map.hasLayer(cursorMarker)) {
+                map.removeLayer(cursorMarker);
+            }
+        };
+    </script>
+</body>
+</html>
+"""
+
+
+class MapBridge(QObject):
+    """Objet exposé à la page de carte par QWebChannel (événements JS → Python)"""
+    positionClicked = pyqtSignal(float, float)  # Latitude, longitude du clic
+
+    @pyqtSlot(float, float)
+    def mapClicked(self, lat, lon):
+        self.positionClicked.emit(lat, lon)
+
+
 class AnalysisPage(QWidget):
     def __init__(self, go_back_callback):
         super().__init__()
         self.go_back_callback = go_back_callback
         self.df = None
-        self.df_filtered = None  # DataFrame filtré selon la sélection
+        self.session = None  # Vue sur la session complète
+        self.selection = None  # Vue (SessionView) sur la plage sélectionnée
+        self.stats_index = None  # SessionStatsIndex de la session chargée
+        self.report_thread = None  # ReportGraphsThread du rapport en cours
+        self.spatial_index = None  # SpatialGridIndex des points GPS de la session
+        self.track_importance = None  # Importance Douglas–Peucker de chaque point GPS
+        self.map_ready = False  # Page de carte chargée (MAP_PAGE_HTML)
+        self.map_pending_js = []  # Appels reçus avant la fin du chargement
+        self.map_track_session = None  # Session dont le trajet est déjà dans la page
         self.comments_file = "comments.json"
         self.current_file = None
         self.current_index = 0
@@ -1420,6 +4267,18 @@ class AnalysisPage(QWidget):
         # Variables pour la sélection de plage
         self.range_start = 0
         self.range_end = 0
+
+        # Pendant un glissement, on regroupe les changements de plage :
+        # aperçu léger à la cadence d'affichage, recalcul complet une fois au repos
+        self.pending_range = None
+        self.range_preview_timer = QTimer(self)
+        self.range_preview_timer.setSingleShot(True)
+        self.range_preview_timer.setInterval(RANGE_PREVIEW_INTERVAL_MS)
+        self.range_preview_timer.timeout.connect(self.flush_range_preview)
+        self.range_settle_timer = QTimer(self)
+        self.range_settle_timer.setSingleShot(True)
+        self.range_settle_timer.setInterval(RANGE_SETTLE_DELAY_MS)
+        self.range_settle_timer.timeout.connect(self.flush_range_update)
         
         self.init_ui()
 
@@ -1464,6 +4323,7 @@ class AnalysisPage(QWidget):
         
         # Curseur à double poignée
         self.dual_slider = DualHandleSlider()
+        self.dual_slider.rangeChanging.connect(self.on_range_preview)
         self.dual_slider.rangeChanged.connect(self.on_range_change)
         range_layout.addWidget(self.dual_slider)
         
@@ -1571,6 +4431,15 @@ class AnalysisPage(QWidget):
         # Carte
         self.map_view = QWebEngineView()
         self.map_view.setMinimumSize(400, 250)
+        self.map_view.loadFinished.connect(self.on_map_loaded)
+
+        # Les clics sur la carte sont poussés par la page, sans interrogation périodique
+        self.map_bridge = MapBridge(self)
+        self.map_bridge.positionClicked.connect(self.on_map_clicked)
+        self.map_channel = QWebChannel(self)
+        self.map_channel.registerObject("bridge", self.map_bridge)
+        self.map_view.page().setWebChannel(self.map_channel)
+        self.map_view.setHtml(MAP_PAGE_HTML.replace("MAP_SERVER_URL", map_server_url()))
 
         # Commentaires
         comment_container = QWidget()
@@ -1666,33 +4535,80 @@ class AnalysisPage(QWidget):
         # Créer le premier graphique
         self.add_graph()
 
-    def on_range_change(self, start_value, end_value):
-        """Callback pour le changement de plage du curseur double"""
-        if self.df is None:
-            return
-            
-        # Calculer les indices correspondants
+    def slider_to_indices(self, start_value, end_value):
+        """Convertit les positions du curseur double (0-100) en indices de données"""
         max_index = len(self.df) - 1
-        self.range_start = int((start_value / 100.0) * max_index)
-        self.range_end = int((end_value / 100.0) * max_index)
+        range_start = int((start_value / 100.0) * max_index)
+        range_end = int((end_value / 100.0) * max_index)
         
         # S'assurer que les indices sont valides
-        self.range_start = max(0, min(self.range_start, max_index))
-        self.range_end = max(self.range_start + 1, min(self.range_end, max_index))
-        
-        # Mettre à jour l'affichage des labels
+        range_start = max(0, min(range_start, max_index))
+        range_end = max(range_start + 1, min(range_end, max_index))
+        return range_start, range_end
+
+    def update_range_labels(self, range_start, range_end):
+        """Met à jour l'affichage des labels de début et de fin"""
         if "Temps" in self.df.columns:
-            start_time = self.df.iloc[self.range_start]["Temps"]
-            end_time = self.df.iloc[self.range_end]["Temps"]
+            start_time = self.session["Temps"][range_start]
+            end_time = self.session["Temps"][range_end]
             self.start_label.setText(f"Début: {start_time:.1f}s")
             self.end_label.setText(f"Fin: {end_time:.1f}s")
+
+    def on_range_preview(self, start_value, end_value):
+        """Callback pendant le glissement : aperçu seulement, recalcul différé"""
+        if self.df is None:
+            return
+        self.pending_range = self.slider_to_indices(start_value, end_value)
+        if not self.range_preview_timer.isActive():
+            self.range_preview_timer.start()
+        self.range_settle_timer.start()
+
+    def flush_range_preview(self):
+        """Aperçu léger de la plage en cours : labels et zone ombrée sur les graphiques"""
+        if self.df is None or self.pending_range is None:
+            return
+        range_start, range_end = self.pending_range
+        self.update_range_labels(range_start, range_end)
+        if "Temps" in self.df.columns:
+            start_time = self.session["Temps"][range_start]
+            end_time = self.session["Temps"][range_end]
+            for graph in self.graphs:
+                graph.set_range_preview(start_time, end_time)
+
+    def flush_range_update(self):
+        """Applique la dernière plage demandée (un seul recalcul complet)"""
+        self.range_preview_timer.stop()
+        self.range_settle_timer.stop()
+        if self.df is None or self.pending_range is None:
+            return
+        range_start, range_end = self.pending_range
+        self.pending_range = None
+        if (range_start, range_end) == (self.range_start, self.range_end):
+            for graph in self.graphs:
+                graph.set_range_preview(None, None)
+            return
+
+        self.range_start, self.range_end = range_start, range_end
+        self.update_range_labels(range_start, range_end)
         
         # Appliquer le filtre
         self.apply_range_filter()
 
+    def on_range_change(self, start_value, end_value):
+        """Callback pour le changement de plage validé du curseur double"""
+        if self.df is None:
+            return
+        self.pending_range = self.slider_to_indices(start_value, end_value)
+        self.flush_range_update()
+
     def reset_range(self):
         """Remet le curseur aux positions initiales et met à jour tout"""
         if self.df is not None:
+            # Annuler une plage en attente
+            self.pending_range = None
+            self.range_preview_timer.stop()
+            self.range_settle_timer.stop()
+
             # Réinitialiser les valeurs du slider
             self.dual_slider.set_values(0, 100)
             
@@ -1700,14 +4616,13 @@ class AnalysisPage(QWidget):
             self.range_start = 0
             self.range_end = len(self.df) - 1
             
-            # Réappliquer le filtre complet
-            self.df_filtered = self.df.copy()
-            self.df_filtered = self.df_filtered.reset_index(drop=True)
+            # Réappliquer la vue complète (sans copie)
+            self.selection = self.session.with_range(self.range_start, self.range_end)
             
             # Mettre à jour les labels
             if "Temps" in self.df.columns:
-                start_time = self.df.iloc[0]["Temps"]
-                end_time = self.df.iloc[-1]["Temps"]
+                start_time = self.session["Temps"][0]
+                end_time = self.session["Temps"][-1]
                 self.start_label.setText(f"Début: {start_time:.1f}s")
                 self.end_label.setText(f"Fin: {end_time:.1f}s")
             
@@ -1717,7 +4632,7 @@ class AnalysisPage(QWidget):
             self.display_map()
             
             # Réinitialiser le curseur au début
-            if len(self.df_filtered) > 0:
+            if len(self.selection) > 0:
                 self.on_cursor_change(0)
                 
             print("Plage réinitialisée : vue complète du trajet")
@@ -1727,11 +4642,8 @@ class AnalysisPage(QWidget):
         if self.df is None:
             return
             
-        # Filtrer le DataFrame
-        self.df_filtered = self.df.iloc[self.range_start:self.range_end + 1].copy()
-        
-        # IMPORTANT: Réinitialiser l'index pour éviter les décalages
-        self.df_filtered = self.df_filtered.reset_index(drop=True)
+        # Nouvelle vue sur la plage : aucune copie, indices locaux à la sélection
+        self.selection = self.session.with_range(self.range_start, self.range_end)
         
         # Mettre à jour tous les composants
         self.update_general_stats()
@@ -1739,52 +4651,15 @@ class AnalysisPage(QWidget):
         self.display_map()
         
         # Réinitialiser la position du curseur au début de la sélection
-        if len(self.df_filtered) > 0:
+        if len(self.selection) > 0:
             self.on_cursor_change(0)
 
     def update_graphs_data(self):
-        """Met à jour les données des graphiques avec auto-scale et forçage du redessin"""
+        """Met à jour les données des graphiques (mise à jour des tracés existants)"""
         for graph in self.graphs:
-            # Mettre à jour les données
-            graph.set_data(self.df_filtered)
-            
-            # Forcer la mise à jour des options (inclut souvent le redessin)
-            graph.update_options(self.advanced_mode)
-            
-            # Essayer différentes méthodes pour forcer le redessin
             try:
-                # Méthode 1: méthode auto_scale personnalisée
-                if hasattr(graph, 'auto_scale'):
-                    graph.auto_scale()
-                
-                # Méthode 2: forcer le redessin avec repaint
-                if hasattr(graph, 'repaint'):
-                    graph.repaint()
-                
-                # Méthode 3: matplotlib avec canvas
-                elif hasattr(graph, 'canvas'):
-                    if hasattr(graph, 'ax'):
-                        graph.ax.relim()
-                        graph.ax.autoscale()
-                    graph.canvas.draw()
-                    graph.canvas.flush_events()
-                
-                # Méthode 4: matplotlib avec figure
-                elif hasattr(graph, 'figure'):
-                    for ax in graph.figure.get_axes():
-                        ax.relim()
-                        ax.autoscale()
-                    graph.figure.canvas.draw()
-                    graph.figure.canvas.flush_events()
-                
-                # Méthode 5: Widget Qt générique
-                elif hasattr(graph, 'update'):
-                    graph.update()
-                
-                # Méthode 6: Si c'est un QWidget, forcer la mise à jour
-                if hasattr(graph, 'updateGeometry'):
-                    graph.updateGeometry()
-                    
+                graph.set_data(self.selection)
+                graph.update_options(self.advanced_mode)
             except Exception as e:
                 print(f"Erreur lors de la mise à jour du graphique: {e}")
                 continue
@@ -1826,8 +4701,8 @@ class AnalysisPage(QWidget):
         self.graphs_grid.addWidget(graph_widget, row, col)
         self.graphs.append(graph_widget)
         
-        if self.df_filtered is not None:
-            graph_widget.set_data(self.df_filtered)
+        if self.selection is not None:
+            graph_widget.set_data(self.selection)
             graph_widget.update_options(self.advanced_mode)
             
                         
@@ -1873,7 +4748,7 @@ class AnalysisPage(QWidget):
 
     def on_cursor_change(self, index, lock=False):
         """Callback curseur - maintenant basé sur df_filtered"""
-        if self.df_filtered is None:
+        if self.selection is None:
             return
             
         self.current_index = index
@@ -1885,8 +4760,8 @@ class AnalysisPage(QWidget):
         for graph in self.graphs:
             graph.update_cursor_position(index)
         
-        if "Lat" in self.df_filtered.columns and "Lon" in self.df_filtered.columns and index < len(self.df_filtered):
-            row = self.df_filtered.iloc[index]
+        if "Lat" in self.selection.columns and "Lon" in self.selection.columns and index < len(self.selection):
+            row = self.selection.row(index)
             self.update_map_marker(row["Lat"], row["Lon"])
         
         self.update_instant_info(index)
@@ -1899,31 +4774,31 @@ class AnalysisPage(QWidget):
 
     def update_instant_info(self, index):
         """Met à jour les informations instantanées - maintenant basé sur df_filtered"""
-        if self.df_filtered is None or index >= len(self.df_filtered):
+        if self.selection is None or index >= len(self.selection):
             self.instant_info.setText("Index invalide")
             return
             
-        row = self.df_filtered.iloc[index]
+        row = self.selection.row(index)
         
         try:
             info_text = f"""<b>⏱️ Instant t = {row['Temps']:.1f}s</b><br><br>"""
             info_text += f"<b>Vitesse:</b> {row['Vitesse']:.1f} km/h<br>"
             
-            if 'Alt' in self.df_filtered.columns:
+            if 'Alt' in self.selection.columns:
                 info_text += f"<b>Altitude:</b> {row['Alt']:.1f} m<br>"
-            if 'Tension' in self.df_filtered.columns:
+            if 'Tension' in self.selection.columns:
                 info_text += f"<b>Tension:</b> {row['Tension']:.1f} V<br>"
-            if 'CurrentIn' in self.df_filtered.columns:
+            if 'CurrentIn' in self.selection.columns:
                 info_text += f"<b>Courant In:</b> {row['CurrentIn']:.2f} A<br>"
-            if 'MotorCurrent' in self.df_filtered.columns:
+            if 'MotorCurrent' in self.selection.columns:
                 info_text += f"<b>Courant Motor:</b> {row['MotorCurrent']:.2f} A<br>"
-            if 'Distance' in self.df_filtered.columns:
+            if 'Distance' in self.selection.columns:
                 info_text += f"<b>Distance (capteur):</b> {row['Distance']:.0f} m<br>"
-            if 'Distance_GPS' in self.df_filtered.columns:
+            if 'Distance_GPS' in self.selection.columns:
                 info_text += f"<b>Distance (GPS):</b> {row['Distance_GPS']:.0f} m<br>"
-            if 'WHCharged' in self.df_filtered.columns:
+            if 'WHCharged' in self.selection.columns:
                 info_text += f"<b>Wh Charged:</b> {row['WHCharged']:.2f}<br>"
-            if 'WHDischarged' in self.df_filtered.columns:
+            if 'WHDischarged' in self.selection.columns:
                 info_text += f"<b>Wh Discharged:</b> {row['WHDischarged']:.2f}<br>"
             
             self.instant_info.setText(info_text)
@@ -1932,9 +4807,7 @@ class AnalysisPage(QWidget):
 
     def load_file(self, csv_path):
             try:
-                df_raw = pd.read_csv(csv_path)
-                df_clean = clean_data(df_raw)
-                self.df = calculate_gps_distance(df_clean)
+                self.df = load_session_data(csv_path)
 
                 try:
                     filename = os.path.basename(csv_path).split('.')[0]
@@ -1953,21 +4826,31 @@ class AnalysisPage(QWidget):
                 self.dual_slider.set_range(0, 100)
                 self.dual_slider.set_values(0, 100)
                 
+                self.pending_range = None
+                self.range_preview_timer.stop()
+                self.range_settle_timer.stop()
                 self.range_start = 0
                 self.range_end = max_index
-                self.df_filtered = self.df.copy()
+                self.session = SessionView(self.df)
+                self.selection = self.session
+                self.stats_index = SessionStatsIndex(self.session)
+                self.spatial_index = None
+                self.track_importance = None
+                if "Lat" in self.df.columns and "Lon" in self.df.columns:
+                    self.spatial_index = SpatialGridIndex(self.session["Lat"], self.session["Lon"])
+                    self.track_importance = douglas_peucker_importance(self.session["Lat"], self.session["Lon"])
                 
                 # Mettre à jour les labels des curseurs
                 if "Temps" in self.df.columns:
-                    start_time = self.df.iloc[0]["Temps"]
-                    end_time = self.df.iloc[-1]["Temps"]
+                    start_time = self.session["Temps"][0]
+                    end_time = self.session["Temps"][-1]
                     self.start_label.setText(f"Début: {start_time:.1f}s")
                     self.end_label.setText(f"Fin: {end_time:.1f}s")
                 
                 self.update_general_stats()
                 
                 for i, graph in enumerate(self.graphs):
-                    graph.set_data(self.df_filtered)
+                    graph.set_data(self.selection)
                     graph.update_options(self.advanced_mode)
                     
                     # Sélection automatique pour le premier graphique
@@ -1975,63 +4858,35 @@ class AnalysisPage(QWidget):
                         available_options = graph.get_available_options(self.advanced_mode)
                         if "Vitesse" in available_options:
                             graph.graph_selector.setCurrentText("Vitesse")
-                            graph.update_graph("Vitesse")
                         elif len(available_options) > 1:
-                            selected_option = available_options[1]
-                            graph.graph_selector.setCurrentText(selected_option)
-                            graph.update_graph(selected_option)
-                    
-                    # Forcer l'auto-scale
-                    if hasattr(graph, 'auto_scale'):
-                        graph.auto_scale()
+                            graph.graph_selector.setCurrentText(available_options[1])
                 
                 self.display_map()
                 
-                if len(self.df_filtered) > 0:
+                if len(self.selection) > 0:
                     self.on_cursor_change(0)
 
             except Exception as e:
                 QMessageBox.critical(self, "Erreur", f"Erreur de chargement : {e}")
     
     def update_general_stats(self):
-        """Met à jour les statistiques générales - maintenant basé sur df_filtered"""
-        if self.df_filtered is None or len(self.df_filtered) == 0:
+        """Met à jour les statistiques générales de la sélection (via l'index de statistiques)"""
+        if self.selection is None or len(self.selection) == 0:
             self.general_stats.setText("Aucune donnée")
             return
             
         try:
-            if "Distance_GPS" in self.df_filtered.columns:
-                # Pour la distance, prendre la différence entre fin et début
-                dist_start = self.df_filtered["Distance_GPS"].iloc[0]
-                dist_end = self.df_filtered["Distance_GPS"].iloc[-1]
-                dist = dist_end - dist_start
-                dist_type = "GPS"
-            elif "Distance" in self.df_filtered.columns:
-                dist_start = self.df_filtered["Distance"].iloc[0]
-                dist_end = self.df_filtered["Distance"].iloc[-1]
-                dist = dist_end - dist_start
-                dist_type = "capteur"
-            else:
-                dist = 0
-                dist_type = "N/A"
-            
-            temps_start = self.df_filtered["Temps"].iloc[0] if "Temps" in self.df_filtered.columns else 0
-            temps_end = self.df_filtered["Temps"].iloc[-1] if "Temps" in self.df_filtered.columns else 0
-            temps_sec = temps_end - temps_start
-            temps_min = temps_sec / 60
-            
-            vitesse_moy = self.df_filtered["Vitesse"].mean() if "Vitesse" in self.df_filtered.columns else 0
-            vitesse_max = self.df_filtered["Vitesse"].max() if "Vitesse" in self.df_filtered.columns else 0
-            
-            alt_max = self.df_filtered["Alt"].max() if "Alt" in self.df_filtered.columns else 0
-            alt_min = self.df_filtered["Alt"].min() if "Alt" in self.df_filtered.columns else 0
-            denivele = alt_max - alt_min
-            
-            wh_charged = self.df_filtered["WHCharged"].sum() if "WHCharged" in self.df_filtered.columns else 0
-            wh_discharged = self.df_filtered["WHDischarged"].sum() if "WHDischarged" in self.df_filtered.columns else 0
-            
-            tension_moy = self.df_filtered["Tension"].mean() if "Tension" in self.df_filtered.columns else 0
-            current_max = self.df_filtered["CurrentIn"].max() if "CurrentIn" in self.df_filtered.columns else 0
+            stats = self.stats_index.summary(self.selection.start, self.selection.end)
+            dist = stats['distance']
+            dist_type = stats['distance_type']
+            temps_min = stats['duree']
+            vitesse_moy = stats['vitesse_moy']
+            vitesse_max = stats['vitesse_max']
+            alt_min = stats['alt_min']
+            alt_max = stats['alt_max']
+            denivele = stats['denivele']
+            wh_charged = stats['wh_charged']
+            wh_discharged = stats['wh_discharged']
 
             info_text = f"""
             <h3>📊 Résumé du trajet (sélection)</h3>
@@ -2043,905 +4898,340 @@ class AnalysisPage(QWidget):
             <b>Chargée :</b> {wh_charged:.1f} Wh<br>
             <b>Déchargée :</b> {wh_discharged:.1f} Wh
             <h3>🏔️ Altitude</h3>
-            <b>Min/Max :</b> {alt_min:.0f}/{alt_max:.0f} m<br>
-            <b>Dénivelé :</b> {denivele:.0f} m<br>
-            """
-            
-            self.general_stats.setText(info_text)
-        except Exception as e:
-            self.general_stats.setText(f"Erreur: {e}")
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        w = self.width()
-        h = self.header_height
-        self.logo_label.setGeometry(0, 0, w, h)
-        if not self.original_logo_pixmap.isNull():
-            scaled_pixmap = self.original_logo_pixmap.scaled(
-                w, h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
-            )
-            self.logo_label.setPixmap(scaled_pixmap)
-        self.title_label.setGeometry(w // 5, 0, w - w // 5, h)
-
-    def display_map(self):
-        """Affiche la carte - maintenant basé sur df_filtered avec indicateurs départ/arrivée"""
-        if self.df_filtered is None or "Lat" not in self.df_filtered.columns or "Lon" not in self.df_filtered.columns:
-            self.map_view.setHtml("<h3>Colonnes GPS 'Lat' et 'Lon' non trouvées.</h3>")
-            return
-
-        latitudes = self.df_filtered["Lat"].tolist()
-        longitudes = self.df_filtered["Lon"].tolist()
-
-        valid_coords = [(lat, lon, i) for i, (lat, lon) in enumerate(zip(latitudes, longitudes)) 
-                       if not (pd.isna(lat) or pd.isna(lon))]
-        
-        if not valid_coords:
-            self.map_view.setHtml("<h3>Aucune donnée GPS valide.</h3>")
-            return
-
-        coordinates = [[lon, lat] for lat, lon, _ in valid_coords]
-        geojson = {
-            "type": "FeatureCollection",
-            "features": [{
-                "type": "Feature",
-                "geometry": {"type": "LineString", "coordinates": coordinates},
-                "properties": {}
-            }]
-        }
-        
-        geojson_str = json.dumps(geojson)
-        center_lat = valid_coords[0][0]
-        center_lon = valid_coords[0][1]
-        
-        # Coordonnées de départ et d'arrivée
-        start_lat, start_lon = valid_coords[0][0], valid_coords[0][1]
-        end_lat, end_lon = valid_coords[-1][0], valid_coords[-1][1]
-
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8" />
-            <title>Carte GPS</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-            <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-            <style>
-                #mapid {{ height: 100%; width: 100%; }}
-                html, body {{ height: 100%; margin: 0; }}
-                .custom-marker {{
-                    background: transparent;
-                    border: none;
-                    font-size: 16px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div id="mapid"></div>
-            <script>
-                var map = L.map('mapid');
-                L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
-                    maxZoom: 19,
-                    attribution: '© OpenStreetMap contributors'
-                }}).addTo(map);
-
-                var geojson = {geojson_str};
-                var routeLayer = L.geoJSON(geojson, {{
-                    style: {{ color: '#3388ff', weight: 4, opacity: 0.8 }}
-                }}).addTo(map);
-
-                // Marqueur de départ (vert avec icône play) - taille uniforme
-                var startIcon = L.divIcon({{
-                    className: 'custom-marker',
-                    html: '<div style="background-color: #27ae60; color: white; width: 24px; height: 24px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.3); font-weight: bold; font-size: 12px;">▶</div>',
-                    iconSize: [24, 24],
-                    iconAnchor: [12, 12]
-                }});
-                
-                var startMarker = L.marker([{start_lat}, {start_lon}], {{
-                    icon: startIcon,
-                    title: 'Départ'
-                }}).addTo(map);
-
-                map.fitBounds(routeLayer.getBounds());
-                startMarker.bindPopup('<b>🏁 Départ</b><br>Début de la sélection');
-
-                // Marqueur d'arrivée (rouge avec icône stop) - taille uniforme
-                var endIcon = L.divIcon({{
-                    className: 'custom-marker',
-                    html: '<div style="background-color: #e74c3c; color: white; width: 24px; height: 24px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.3); font-weight: bold; font-size: 12px;">⏹</div>',
-                    iconSize: [24, 24],
-                    iconAnchor: [12, 12]
-                }});
-                
-                var endMarker = L.marker([{end_lat}, {end_lon}], {{
-                    icon: endIcon,
-                    title: 'Arrivée'
-                }}).addTo(map);
-                
-                endMarker.bindPopup('<b>🏁 Arrivée</b><br>Fin de la sélection');
-
-                // Curseur de position actuelle - taille uniforme
-                var cursorMarker = null;
-                window.clickedIndex = null;
-                
-                map.on('click', function(e) {{
-                    var clickedLat = e.latlng.lat;
-                    var clickedLon = e.latlng.lng;
-                    var coordinates = geojson.features[0].geometry.coordinates;
-                    var minDistance = Infinity;
-                    var closestIndex = 0;
-                    
-                    coordinates.forEach(function(coord, index) {{
-                        var lon = coord[0];
-                        var lat = coord[1];
-                        var distance = Math.sqrt(
-                            Math.pow((lat - clickedLat) * 111000, 2) + 
-                            Math.pow((lon - clickedLon) * 111000 * Math.cos(clickedLat * Math.PI / 180), 2)
-                        );
-                        if (distance < minDistance) {{
-                            minDistance = distance;
-                            closestIndex = index;
-                        }}
-                    }});
-                    
-                    window.clickedIndex = closestIndex;
-                }});
-
-                window.updateCursor = function(lat, lon) {{
-                    if (cursorMarker) {{
-                        map.removeLayer(cursorMarker);
-                    }}
-                    
-                    if (lat != null && lon != null && !isNaN(lat) && !isNaN(lon)) {{
-                        // Curseur de position actuelle (orange) - même taille que les autres
-                        cursorMarker = L.circleMarker([lat, lon], {{
-                            radius: 10,
-                            fillColor: '#f39c12',
-                            color: '#ffffff',
-                            weight: 2,
-                            opacity: 1,
-                            fillOpacity: 0.8
-                        }}).addTo(map);
-                        
-                        cursorMarker.bindPopup('<b>📍 Position actuelle</b>');
-                    }}
-                }};
-                
-                window.getClickedIndex = function() {{
-                    var index = window.clickedIndex;
-                    window.clickedIndex = null;
-                    return index;
-                }};
-                
-                // Pas de rezoom automatique - garder la vue actuelle
-                // Commenté : map.fitBounds(group.getBounds().pad(0.1));
-            </script>
-        </body>
-        </html>
-        """
-        
-        self.map_view.setHtml(html)
-        self.start_map_click_timer()
-
-    def start_map_click_timer(self):
-        """Timer pour détecter les clics carte"""
-        self.map_timer = QTimer()
-        self.map_timer.timeout.connect(self.check_map_clicks)
-        self.map_timer.start(100)
-
-    def check_map_clicks(self):
-        """Vérifie les clics sur la carte - maintenant basé sur df_filtered"""
-        js_code = "window.getClickedIndex ? window.getClickedIndex() : null;"
-        
-        def handle_result(result):
-            if result is not None and isinstance(result, (int, float)):
-                try:
-                    index = int(result)
-                    if 0 <= index < len(self.df_filtered):
-                        self.on_cursor_change(index, lock=True)
-                except (ValueError, TypeError):
-                    pass
-        
-        self.map_view.page().runJavaScript(js_code, handle_result)
-
-    def update_map_marker(self, lat, lon):
-        """Met à jour le marqueur sur la carte"""
-        if lat is None or lon is None or pd.isna(lat) or pd.isna(lon):
-            return
-        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
-            return
-            
-        js_code = f"""
-        if (typeof window.updateCursor === 'function') {{
-            window.updateCursor({lat}, {lon});
-        }}
-        """
-        self.map_view.page().runJavaScript(js_code)
-
-    def save_comments(self):
-        comments = self.comment_text.toPlainText()
-        data = {}
-        if os.path.exists(self.comments_file):
-            try:
-                with open(self.comments_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except:
-                data = {}
-        if self.current_file:
-            data[self.current_file] = comments
-            with open(self.comments_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-            self.save_comment_button.setText("Commentaires enregistrés ✓")
-
-    
-    #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-
-
-    def generate_report(self):
-        """Génère un rapport complet du trajet sélectionné avec haute résolution"""
-        if self.df_filtered is None or len(self.df_filtered) == 0:
-            QMessageBox.warning(self, "Attention", "Aucune donnée à inclure dans le rapport.")
-            return
-        
-        # Dialog personnalisé pour les options de rapport
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Génération du Rapport")
-        dialog.setFixedSize(450, 250)
-        
-        layout = QVBoxLayout()
-        
-        # Nom du rapport
-        layout.addWidget(QLabel("Nom du rapport:"))
-        name_input = QLineEdit(f"Rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-        layout.addWidget(name_input)
-        
-        # Option fichier de base
-        layout.addWidget(QLabel(""))  # Espacement
-        include_base_file = QCheckBox("Inclure le fichier CSV de base complet")
-        include_base_file.setChecked(True)
-        layout.addWidget(include_base_file)
-        
-        info_label = QLabel("⚠️ Le fichier de base contient TOUTES les données y compris\nles positions GPS de départ/arrivée complètes du trajet entier.\nSi vous ne voulez pas partager ces informations, décochez cette option.")
-        info_label.setStyleSheet("color: #e67e22; font-size: 11px; background-color: #fef9e7; padding: 4px; border-radius: 4px;")
-        info_label.setWordWrap(True)
-        layout.addWidget(info_label)
-        
-        
-        
-        # Boutons
-        buttons_layout = QHBoxLayout()
-        ok_button = QPushButton("Générer le Rapport")
-        ok_button.setStyleSheet("""
-            QPushButton {
-                background-color: #27ae60;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-                padding: 8px;
-            }
-            QPushButton:hover {
-                background-color: #229954;
-            }
-        """)
-        cancel_button = QPushButton("Annuler")
-        
-        ok_button.clicked.connect(dialog.accept)
-        cancel_button.clicked.connect(dialog.reject)
-        
-        buttons_layout.addWidget(cancel_button)
-        buttons_layout.addWidget(ok_button)
-        layout.addLayout(buttons_layout)
-        
-        dialog.setLayout(layout)
-        
-        if dialog.exec() != QDialog.DialogCode.Accepted:
-            return
-            
-        report_name = name_input.text().strip()
-        include_base = include_base_file.isChecked()
-        
-        if not report_name:
-            QMessageBox.warning(self, "Attention", "Veuillez saisir un nom de rapport.")
-            return
-        
-        try:
-            # Créer le dossier du rapport
-            reports_dir = "rapports"
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
-                
-            report_dir = os.path.join(reports_dir, report_name)
-            if not os.path.exists(report_dir):
-                os.makedirs(report_dir)
-            else:
-                reply = QMessageBox.question(
-                    self, 'Dossier existant', 
-                    f'Le dossier "{report_name}" existe déjà. Écraser le contenu?',
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-            
-            # Dialogue de progression
-            progress = QProgressDialog("Génération du rapport haute résolution...", "Annuler", 0, 6, self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            progress.setAutoClose(True)
-            progress.setAutoReset(True)
-            progress.show()
-            
-            # Étape 1: Sauvegarder les données CSV
-            progress.setLabelText("💾 Sauvegarde des données CSV...")
-            progress.setValue(1)
-            QApplication.processEvents()
-            
-            if include_base and self.current_file:
-                # Copier le fichier original complet
-                base_filename = os.path.join(report_dir, f"{report_name}_donnees_completes.csv")
-                shutil.copy2(self.current_file, base_filename)
-            
-            # Sauvegarder les données filtrées
-            filtered_filename = os.path.join(report_dir, f"{report_name}_donnees_selection.csv")
-            self.df_filtered.to_csv(filtered_filename, index=False)
-            
-            # Étape 2: Générer les graphiques haute résolution
-            progress.setLabelText("📊 Génération des graphiques 300 DPI...")
-            progress.setValue(2)
-            QApplication.processEvents()
-            
-            self.generate_high_res_graphs(report_dir)
-            
-            # Étape 3: Générer la carte GPS haute résolution
-            progress.setLabelText("🗺️ Génération de la carte GPS 1200x800px...")
-            progress.setValue(3)
-            QApplication.processEvents()
-            
-            self.generate_high_res_map(report_dir)
-            
-            # Attendre la génération de la carte
-            QTimer.singleShot(1000, lambda: self.finalize_report(progress, report_dir, report_name, include_base))
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du rapport:\n{e}")
-            print(f"Erreur détaillée: {e}")
-            import traceback
-            traceback.print_exc()
-
-    def finalize_report(self, progress, report_dir, report_name, include_base):
-        """Finalise la génération du rapport"""
-        try:
-            # Étape 4: Générer le rapport HTML
-            progress.setLabelText("📝 Génération du rapport HTML...")
-            progress.setValue(4)
-            QApplication.processEvents()
-            
-            self.generate_html_report_hd(report_dir, report_name, include_base)
-            
-            # Étape 5: Finalisation
-            progress.setLabelText("✅ Finalisation...")
-            progress.setValue(5)
-            QApplication.processEvents()
-            
-            progress.setValue(6)
-            
-            # Compter les fichiers générés
-            files_generated = []
-            files_generated.append(f"• {report_name}.html (rapport principal HD)")
-            files_generated.append(f"• {report_name}_donnees_selection.csv")
-            if include_base:
-                files_generated.append(f"• {report_name}_donnees_completes.csv")
-            files_generated.append("• carte_gps.png (1200x800px)")
-            files_generated.append(f"• {len(self.graphs)} graphiques (300 DPI)")
-            
-            QMessageBox.information(
-                self, 
-                "✅ Rapport Haute Résolution Généré", 
-                f"Rapport sauvegardé dans:\n{os.path.abspath(report_dir)}\n\n" +
-                f"Fichiers générés:\n" + "\n".join(files_generated)
-            )
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur lors de la finalisation:\n{e}")
-
-    def generate_high_res_graphs(self, report_dir):
-        """Génère les graphiques en haute résolution 300 DPI"""
-        graphs_dir = os.path.join(report_dir, "graphiques")
-        if not os.path.exists(graphs_dir):
-            os.makedirs(graphs_dir)
-            
-        for i, graph in enumerate(self.graphs):
-            try:
-                screenshot_path = os.path.join(graphs_dir, f"graphique_{i+1}.png")
-                
-                # Méthode 1: Matplotlib avec haute résolution
-                if hasattr(graph, 'figure'):
-                    graph.figure.savefig(
-                        screenshot_path, 
-                        dpi=300,  # Haute résolution
-                        bbox_inches='tight',
-                        facecolor='white',
-                        edgecolor='none',
-                        format='png',
-                        pad_inches=0.1
-                    )
-                    print(f"Graphique {i+1} sauvegardé en 300 DPI (matplotlib)")
-                
-                # Méthode 2: Canvas matplotlib
-                elif hasattr(graph, 'canvas') and hasattr(graph.canvas, 'figure'):
-                    graph.canvas.figure.savefig(
-                        screenshot_path, 
-                        dpi=300,
-                        bbox_inches='tight',
-                        facecolor='white',
-                        edgecolor='none',
-                        format='png',
-                        pad_inches=0.1
-                    )
-                    print(f"Graphique {i+1} sauvegardé en 300 DPI (canvas)")
-                
-                # Méthode 3: Widget Qt avec scaling
-                elif hasattr(graph, 'grab'):
-                    # Capturer à une résolution plus élevée
-                    original_size = graph.size()
-                    scale_factor = 3  # Tripler la résolution pour 300 DPI
-                    
-                    pixmap = graph.grab()
-                    # Redimensionner pour une meilleure qualité
-                    scaled_pixmap = pixmap.scaled(
-                        original_size * scale_factor,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    scaled_pixmap.save(screenshot_path, 'PNG', 98)  # Qualité maximale
-                    print(f"Graphique {i+1} sauvegardé en haute résolution (Qt)")
-                else:
-                    print(f"Impossible de générer le graphique haute résolution {i+1}")
-                    
-            except Exception as e:
-                print(f"Erreur lors de la génération haute résolution du graphique {i+1}: {e}")
-
-    def generate_high_res_map(self, report_dir):
-        """Génère la carte GPS en haute résolution 1200x800"""
-        try:
-            # Créer une carte temporaire plus grande pour la haute résolution
-            self.create_high_res_map_html(report_dir)
-            print("Carte HTML haute résolution créée")
+            <b>Min/Max :</b> {alt_min:.0f}/{alt_max:.0f} m<br>
+            <b>Dénivelé :</b> {denivele:.0f} m<br>
+            """
             
+            self.general_stats.setText(info_text)
         except Exception as e:
-            print(f"Erreur lors de la génération de la carte haute résolution: {e}")
+            self.general_stats.setText(f"Erreur: {e}")
 
-    def create_high_res_map_html(self, report_dir):
-        import os, json, pandas as pd
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        w = self.width()
+        h = self.header_height
+        self.logo_label.setGeometry(0, 0, w, h)
+        if not self.original_logo_pixmap.isNull():
+            scaled_pixmap = self.original_logo_pixmap.scaled(
+                w, h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            self.logo_label.setPixmap(scaled_pixmap)
+        self.title_label.setGeometry(w // 5, 0, w - w // 5, h)
 
-        if self.df_filtered is None or "Lat" not in self.df_filtered.columns or "Lon" not in self.df_filtered.columns:
+    def display_map(self):
+        """Met à jour la carte pour la plage sélectionnée, avec indicateurs départ/arrivée"""
+        if self.selection is None or "Lat" not in self.selection.columns or "Lon" not in self.selection.columns:
+            self.run_map_js("window.showMessage(\"<h3>Colonnes GPS 'Lat' et 'Lon' non trouvées.</h3>\");")
             return
 
-        latitudes = self.df_filtered["Lat"].tolist()
-        longitudes = self.df_filtered["Lon"].tolist()
-
-        valid_coords = [(lat, lon) for lat, lon in zip(latitudes, longitudes) if not (pd.isna(lat) or pd.isna(lon))]
+        # Trajet complet transmis une seule fois par session
+        if self.map_track_session is not self.session:
+            latitudes = np.asarray(self.session["Lat"], dtype=np.float64)
+            longitudes = np.asarray(self.session["Lon"], dtype=np.float64)
+            valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+            track = [[lat, lon] if ok else None
+                     for lat, lon, ok in zip(latitudes.tolist(), longitudes.tolist(), valid.tolist())]
+            importance = np.round(self.track_importance, 1).tolist()
+            self.run_map_js(f"window.setTrack({json.dumps(track)}, {json.dumps(importance)});")
+            self.map_track_session = self.session
+
+        # Changement de plage : seuls les indices sont envoyés
+        self.run_map_js(f"window.showRange({self.selection.start}, {self.selection.end});")
+
+    def run_map_js(self, js_code):
+        """Exécute du JavaScript dans la page de carte (mis en attente pendant le chargement)"""
+        if self.map_ready:
+            self.map_view.page().runJavaScript(js_code)
+        else:
+            self.map_pending_js.append(js_code)
 
-        if not valid_coords:
+    def on_map_loaded(self, ok):
+        """La page de carte est prête : envoi des appels en attente"""
+        if not ok:
+            print("Erreur lors du chargement de la carte")
             return
+        self.map_ready = True
+        pending, self.map_pending_js = self.map_pending_js, []
+        for js_code in pending:
+            self.map_view.page().runJavaScript(js_code)
+
+    def on_map_clicked(self, lat, lon):
+        """Clic sur la carte : verrouille le curseur sur le point le plus proche de la plage"""
+        if self.selection is None or self.spatial_index is None:
+            return
+        index = self.spatial_index.nearest(lat, lon, self.selection.start, self.selection.end)
+        if index is not None:
+            self.on_cursor_change(self.selection.to_local(index), lock=True)
 
-        # Coordonnées pour Leaflet : [lon, lat]
-        coordinates = [[lon, lat] for lat, lon in valid_coords]
-
-        geojson = {
-            "type": "FeatureCollection",
-            "features": [{
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": coordinates
-                },
-                "properties": {}
-            }]
-        }
-
-        geojson_str = json.dumps(geojson)
-
-        start_lat, start_lon = valid_coords[0]
-        end_lat, end_lon = valid_coords[-1]
-
-        # Centre de la carte au milieu de la trace
-        center_lat = sum(lat for lat, _ in valid_coords) / len(valid_coords)
-        center_lon = sum(lon for _, lon in valid_coords) / len(valid_coords)
-
-        html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8" />
-        <title>Carte GPS Haute Résolution</title>
-        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-        <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-        <style>
-            #mapid {{ height: 800px; width: 1200px; }}
-            html, body {{ margin: 0; padding: 0; background: white; }}
-        </style>
-    </head>
-    <body>
-        <div id="mapid"></div>
-        <script>
-            var map = L.map('mapid').setView([{center_lat}, {center_lon}], 13);
-
-            L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
-                maxZoom: 19,
-                attribution: '© OpenStreetMap contributors'
-            }}).addTo(map);
-
-            var geojson = {geojson_str};
-
-            // Trace GPS (ligne bleue)
-            L.geoJSON(geojson, {{
-                style: function(feature) {{
-                    return {{color: 'blue', weight: 5, opacity: 0.7}};
-                }}
-            }}).addTo(map);
-
-            // Marqueur départ vert
-            L.circleMarker([{start_lat}, {start_lon}], {{
-                radius: 10,
-                fillColor: 'green',
-                color: 'white',
-                weight: 2,
-                opacity: 1,
-                fillOpacity: 0.9
-            }}).addTo(map).bindPopup("Départ");
-
-            // Marqueur arrivée rouge
-            L.circleMarker([{end_lat}, {end_lon}], {{
-                radius: 10,
-                fillColor: 'red',
-                color: 'white',
-                weight: 2,
-                opacity: 1,
-                fillOpacity: 0.9
-            }}).addTo(map).bindPopup("Arrivée");
-        </script>
-    </body>
-    </html>"""
-
-        temp_map_path = os.path.join(report_dir, "temp_map.html")
-        with open(temp_map_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        
-        # Lancer la capture avec un délai pour laisser le temps au fichier d'être créé
-        QTimer.singleShot(1000, lambda: self._capture_high_res_map(report_dir))
-
-    def generate_high_res_map(self, report_dir):
-        """Méthode simple: capture la carte existante en HD"""
-        try:
-            print("📸 Capture simple de la carte existante...")
-            screenshot_path = os.path.join(report_dir, "carte_gps.png")
-            
-            # Capturer la carte actuelle
-            pixmap = self.map_view.grab()
-            
-            if not pixmap.isNull():
-                # Redimensionner en haute résolution
-                hd_pixmap = pixmap.scaled(
-                    1200, 800,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                
-                success = hd_pixmap.save(screenshot_path, 'PNG', 98)
-                if success:
-                    file_size = os.path.getsize(screenshot_path)
-                    print(f"✅ Carte simple sauvegardée: {file_size} bytes")
-                    return True
-                else:
-                    print("❌ Échec sauvegarde")
-            else:
-                print("❌ Capture impossible")
-            
-            return False
-        except Exception as e:
-            print(f"❌ Erreur capture simple: {e}")
-            return False
-
-    def generate_html_report_hd(self, report_dir, report_name, include_base_file):
-        """Génère le rapport HTML"""
-        try:
-            # Récupérer les statistiques
-            stats = self.get_report_statistics()
-            
-            # Récupérer les commentaires
-            comments = self.comment_text.toPlainText() or "Aucun commentaire"
-            
-            # Section fichiers de données
-            files_section = f"""
-        <div class="section">
-            <h2>📁 Fichiers de Données</h2>
-            <div class="files-info">
-                <div class="file-item selection">
-                    <h4>📊 Données de la sélection</h4>
-                    <p><strong>Fichier:</strong> {report_name}_donnees_selection.csv</p>
-                    <p><strong>Contenu:</strong> Données filtrées selon la plage sélectionnée ({stats['temps_debut']:.1f}s à {stats['temps_fin']:.1f}s)</p>
-                    <p><strong>Points de données:</strong> {len(self.df_filtered):,}</p>
-                    <p><strong>🔒 Confidentialité:</strong> Contient uniquement la portion sélectionnée</p>
-                </div>"""
-            
-            if include_base_file:
-                files_section += f"""
-                <div class="file-item complete">
-                    <h4>🗂️ Fichier de base complet</h4>
-                    <p><strong>Fichier:</strong> {report_name}_donnees_completes.csv</p>
-                    <p><strong>Contenu:</strong> Toutes les données du trajet original, y compris les positions GPS complètes</p>
-                    <p><strong>⚠️ Attention:</strong> Ce fichier contient l'intégralité du parcours avec les positions de départ et d'arrivée exactes</p>
-                </div>"""
-            
-            files_section += """
-            </div>
-        </div>"""
-            
-            # Générer le HTML complet
-            html_content = f"""
-    <!DOCTYPE html>
-    <html lang="fr">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Rapport d'Analyse - {report_name}</title>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                margin: 40px;
-                background-color: #f8fafc;
-                color: #334155;
-                line-height: 1.6;
-            }}
-            .header {{
-                text-align: center;
-                margin-bottom: 40px;
-                padding: 30px;
-                background: linear-gradient(135deg, #3b82f6, #1e40af);
-                color: white;
-                border-radius: 12px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }}
-            .header h1 {{
-                margin: 0 0 10px 0;
-                font-size: 2.5em;
-            }}
-            .header h2 {{
-                margin: 0 0 15px 0;
-                font-weight: 300;
-                opacity: 0.9;
-            }}
-            .section {{
-                background: white;
-                margin: 30px 0;
-                padding: 30px;
-                border-radius: 12px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                border: 1px solid #e2e8f0;
-            }}
-            .section h2 {{
-                margin-top: 0;
-                color: #1e40af;
-                border-bottom: 2px solid #e2e8f0;
-                padding-bottom: 10px;
-            }}
-            .stats-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-                gap: 20px;
-                margin: 25px 0;
-            }}
-            .stat-item {{
-                background: linear-gradient(135deg, #f1f5f9, #e2e8f0);
-                padding: 20px;
-                border-radius: 8px;
-                text-align: center;
-                border: 1px solid #cbd5e1;
-            }}
-            .stat-value {{
-                font-size: 28px;
-                font-weight: bold;
-                color: #1e40af;
-                margin-bottom: 5px;
-            }}
-            .stat-label {{
-                color: #64748b;
-                font-size: 13px;
-                font-weight: 500;
-            }}
-            .graphs-container {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(450px, 1fr));
-                gap: 25px;
-                margin: 25px 0;
-            }}
-            .graph-item {{
-                text-align: center;
-                background: #f8fafc;
-                padding: 15px;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }}
-            .graph-item h3 {{
-                margin: 0 0 15px 0;
-                color: #475569;
-            }}
-            .graph-item img {{
-                max-width: 100%;
-                height: auto;
-                border: 1px solid #cbd5e1;
-                border-radius: 6px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .map-container {{
-                text-align: center;
-                margin: 25px 0;
-                background: #f8fafc;
-                padding: 20px;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }}
-            .map-container img {{
-                max-width: 100%;
-                height: auto;
-                border: 2px solid #cbd5e1;
-                border-radius: 8px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }}
-            .files-info {{
-                display: grid;
-                gap: 20px;
-            }}
-            .file-item {{
-                padding: 20px;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }}
-            .file-item.selection {{
-                background: #f0f9ff;
-                border-left: 4px solid #3b82f6;
-            }}
-            .file-item.complete {{
-                background: #fef3c7;
-                border-left: 4px solid #f59e0b;
-            }}
-            .file-item h4 {{
-                margin: 0 0 12px 0;
-                color: #1f2937;
-            }}
-            .file-item p {{
-                margin: 6px 0;
-                font-size: 14px;
-            }}
-            .comments {{
-                background: #fffbeb;
-                padding: 20px;
-                border-left: 4px solid #f59e0b;
-                border-radius: 8px;
-                white-space: pre-wrap;
-                font-family: 'Courier New', monospace;
-            }}
-            .info-box {{
-                background: #f0fdf4;
-                padding: 15px;
-                border-left: 4px solid #22c55e;
-                border-radius: 8px;
-                margin: 15px 0;
-                font-size: 13px;
-                font-weight: 500;
-            }}
-            .tech-info {{
-                background: #f8fafc;
-                padding: 20px;
-                border-radius: 8px;
-                border: 1px solid #e2e8f0;
-            }}
-            .tech-info p {{
-                margin: 8px 0;
-            }}
-            .footer {{
-                text-align: center;
-                margin-top: 50px;
-                color: #64748b;
-                font-size: 13px;
-            }}
-            @media print {{
-                body {{ margin: 20px; }}
-                .section {{ break-inside: avoid; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>📊 Rapport d'Analyse</h1>
-            <h2>{report_name}</h2>
-            <p>Généré le {datetime.now().strftime('%d %B %Y à %H:%M:%S')}</p>
-        </div>
-
-        <div class="section">
-            <h2>📈 Statistiques du Trajet Analysé</h2>
-            <div class="stats-grid">
-                <div class="stat-item">
-                    <div class="stat-value">{stats['distance']:.0f} m</div>
-                    <div class="stat-label">Distance ({stats['distance_type']})</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-value">{stats['duree']:.1f} min</div>
-                    <div class="stat-label">Durée</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-value">{stats['vitesse_moy']:.1f} km/h</div>
-                    <div class="stat-label">Vitesse Moyenne</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-value">{stats['vitesse_max']:.1f} km/h</div>
-                    <div class="stat-label">Vitesse Maximum</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-value">{stats['denivele']:.0f} m</div>
-                    <div class="stat-label">Dénivelé</div>
-                </div>
-                <div class="stat-item">
-                    <div class="stat-value">{stats['wh_discharged']:.1f} Wh</div>
-                    <div class="stat-label">Énergie Consommée</div>
-                </div>
-            </div>
-        </div>
+    def update_map_marker(self, lat, lon):
+        """Met à jour le marqueur sur la carte"""
+        if lat is None or lon is None or pd.isna(lat) or pd.isna(lon):
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return
+            
+        self.run_map_js(f"window.updateCursor({lat}, {lon});")
 
-        <div class="section">
-            <h2>🗺️ Carte GPS</h2>
-            <div class="map-container">
-                <img src="carte_gps.png" alt="Carte GPS du trajet analysé">
-            </div>
-            <div class="info-box">
-                📍 Carte générée avec marqueurs de départ (🟢) et d'arrivée (🔴)
-            </div>
-        </div>
+    def save_comments(self):
+        comments = self.comment_text.toPlainText()
+        data = {}
+        if os.path.exists(self.comments_file):
+            try:
+                with open(self.comments_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except:
+                data = {}
+        if self.current_file:
+            data[self.current_file] = comments
+            with open(self.comments_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+            self.save_comment_button.setText("Commentaires enregistrés ✓")
 
-        <div class="section">
-            <h2>📊 Graphiques d'Analyse</h2>
-            <div class="graphs-container">
-    """
+    
+    #--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+
+    def generate_report(self):
+        """Génère un rapport complet du trajet sélectionné avec haute résolution"""
+        if self.selection is None or len(self.selection) == 0:
+            QMessageBox.warning(self, "Attention", "Aucune donnée à inclure dans le rapport.")
+            return
+        
+        # Dialog personnalisé pour les options de rapport
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Génération du Rapport")
+        dialog.setFixedSize(450, 280)
+        
+        layout = QVBoxLayout()
+        
+        # Nom du rapport
+        layout.addWidget(QLabel("Nom du rapport:"))
+        name_input = QLineEdit(f"Rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        layout.addWidget(name_input)
+        
+        # Option fichier de base
+        layout.addWidget(QLabel(""))  # Espacement
+        include_base_file = QCheckBox("Inclure le fichier CSV de base complet")
+        include_base_file.setChecked(True)
+        layout.addWidget(include_base_file)
+        
+        info_label = QLabel("⚠️ Le fichier de base contient TOUTES les données y compris\nles positions GPS de départ/arrivée complètes du trajet entier.\nSi vous ne voulez pas partager ces informations, décochez cette option.")
+        info_label.setStyleSheet("color: #e67e22; font-size: 11px; background-color: #fef9e7; padding: 4px; border-radius: 4px;")
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        speed_colours_box = QCheckBox("Colorer le tracé de la carte selon la vitesse")
+        layout.addWidget(speed_colours_box)
+        
+        
+        # Boutons
+        buttons_layout = QHBoxLayout()
+        ok_button = QPushButton("Générer le Rapport")
+        ok_button.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-weight: bold;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #229954;
+            }
+        """)
+        cancel_button = QPushButton("Annuler")
+        
+        ok_button.clicked.connect(dialog.accept)
+        cancel_button.clicked.connect(dialog.reject)
+        
+        buttons_layout.addWidget(cancel_button)
+        buttons_layout.addWidget(ok_button)
+        layout.addLayout(buttons_layout)
+        
+        dialog.setLayout(layout)
+        
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+            
+        report_name = name_input.text().strip()
+        include_base = include_base_file.isChecked()
+        speed_colours = speed_colours_box.isChecked()
+        
+        if not report_name:
+            QMessageBox.warning(self, "Attention", "Veuillez saisir un nom de rapport.")
+            return
+        
+        try:
+            # Créer le dossier du rapport
+            reports_dir = REPORTS_FOLDER
+            if not os.path.exists(reports_dir):
+                os.makedirs(reports_dir)
+                
+            report_dir = os.path.join(reports_dir, report_name)
+            if not os.path.exists(report_dir):
+                os.makedirs(report_dir)
+            else:
+                reply = QMessageBox.question(
+                    self, 'Dossier existant', 
+                    f'Le dossier "{report_name}" existe déjà. Écraser le contenu?',
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                if reply == QMessageBox.StandardButton.No:
+                    return
             
-            # Ajouter les graphiques
+            # Dossier écrasé : pas de graphiques ni de carte d'un rapport précédent
             graphs_dir = os.path.join(report_dir, "graphiques")
-            if os.path.exists(graphs_dir):
-                for i in range(len(self.graphs)):
-                    graph_file = f"graphique_{i+1}.png"
-                    graph_path = os.path.join(graphs_dir, graph_file)
-                    if os.path.exists(graph_path):
-                        html_content += f'''
-                <div class="graph-item">
-                    <h3>Graphique {i+1}</h3>
-                    <img src="graphiques/{graph_file}" alt="Graphique {i+1}">
-                </div>'''
+            shutil.rmtree(graphs_dir, ignore_errors=True)
+            os.makedirs(graphs_dir)
+            old_map = os.path.join(report_dir, "carte_gps.png")
+            if os.path.exists(old_map):
+                os.remove(old_map)
+            graph_jobs = self.report_graph_jobs(graphs_dir)
+
+            # Dialogue de progression : une étape par fichier produit
+            progress = QProgressDialog("Génération du rapport haute résolution...", "Annuler", 0, len(graph_jobs) + 3, self)
+            progress.setWindowModality(Qt.WindowModality.WindowModal)
+            progress.setAutoClose(False)
+            progress.setAutoReset(False)
+            progress.show()
             
-            html_content += f"""
-            </div>
-        </div>
+            # Étape 1: Sauvegarder les données CSV
+            progress.setLabelText("💾 Sauvegarde des données CSV...")
+            progress.setValue(0)
+            QApplication.processEvents()
+            
+            if include_base and self.current_file:
+                # Copier le fichier original complet
+                base_filename = os.path.join(report_dir, f"{report_name}_donnees_completes.csv")
+                shutil.copy2(self.current_file, base_filename)
+            
+            # Sauvegarder les données filtrées
+            filtered_filename = os.path.join(report_dir, f"{report_name}_donnees_selection.csv")
+            self.selection.to_frame().to_csv(filtered_filename, index=False)
+            
+            progress.setValue(1)
 
-        {files_section}
+            # Étape 2: Graphiques 300 DPI rendus dans des processus, l'interface reste active
+            progress.setLabelText(f"📊 Génération des graphiques 300 DPI... 0/{len(graph_jobs)}")
+            self.report_thread = ReportGraphsThread(graph_jobs, self,
+                                                    map_job=self.report_map_job(report_dir, speed_colours))
+            self.report_thread.progress.connect(
+                lambda done, total, filename: self.on_report_graph_progress(progress, done, total, filename))
+            self.report_thread.map_started.connect(lambda: self.on_report_map_started(progress))
+            self.report_thread.completed.connect(
+                lambda errors, cancelled: self.on_report_graphs_finished(progress, report_dir, report_name,
+                                                                         include_base, errors, cancelled))
+            progress.canceled.connect(self.report_thread.cancel)
+            self.report_thread.start()
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération du rapport:\n{e}")
+            print(f"Erreur détaillée: {e}")
+            import traceback
+            traceback.print_exc()
 
-        <div class="section">
-            <h2>💬 Commentaires</h2>
-            <div class="comments">{comments}</div>
-        </div>
+    def on_report_graph_progress(self, progress, done, total, filename):
+        progress.setValue(1 + done)
+        progress.setLabelText(f"📊 Génération des graphiques 300 DPI... {done}/{total}\n{filename}")
+
+    def on_report_map_started(self, progress):
+        # Étape 3: Carte GPS haute résolution (dans le thread du rapport)
+        progress.setLabelText("🗺️ Génération de la carte GPS 1200x800px...")
+        progress.setValue(progress.maximum() - 2)
+
+    def on_report_graphs_finished(self, progress, report_dir, report_name, include_base, errors, cancelled):
+        """Graphiques et carte terminés : page HTML"""
+        # cancelled vient du signal : self.report_thread peut déjà être celui d'un autre rapport
+        if cancelled:
+            progress.close()
+            QMessageBox.information(self, "Rapport annulé", "La génération du rapport a été annulée.")
+            return
+        if errors:
+            print(f"{len(errors)} fichier(s) non générés: {errors}")
+        self.finalize_report(progress, report_dir, report_name, include_base)
 
-        <div class="section">
-            <h2>📋 Informations Techniques</h2>
-            <div class="tech-info">
-                <p><strong>Période analysée:</strong> {stats['temps_debut']:.1f}s à {stats['temps_fin']:.1f}s</p>
-                <p><strong>Nombre de points analysés:</strong> {len(self.df_filtered):,}</p>
-                <p><strong>Fichier source:</strong> {os.path.basename(self.current_file) if self.current_file else 'N/A'}</p>
-            </div>
-        </div>
+    def finalize_report(self, progress, report_dir, report_name, include_base):
+        """Finalise la génération du rapport"""
+        try:
+            # Étape 4: Générer le rapport HTML
+            progress.setLabelText("📝 Génération du rapport HTML...")
+            progress.setValue(progress.maximum() - 1)
+            QApplication.processEvents()
+            
+            self.generate_html_report_hd(report_dir, report_name, include_base)
+            
+            # Étape 5: Finalisation
+            progress.setValue(progress.maximum())
+            progress.close()
+            
+            # Compter les fichiers générés
+            graphs_dir = os.path.join(report_dir, "graphiques")
+            graph_count = len([f for f in os.listdir(graphs_dir) if f.endswith(".png")]) if os.path.isdir(graphs_dir) else 0
+            files_generated = []
+            files_generated.append(f"• {report_name}.html (rapport principal HD)")
+            files_generated.append(f"• {report_name}_donnees_selection.csv")
+            if include_base:
+                files_generated.append(f"• {report_name}_donnees_completes.csv")
+            files_generated.append("• carte_gps.png (1200x800px)")
+            files_generated.append(f"• {graph_count} graphiques (300 DPI)")
+            
+            QMessageBox.information(
+                self, 
+                "✅ Rapport Haute Résolution Généré", 
+                f"Rapport sauvegardé dans:\n{os.path.abspath(report_dir)}\n\n" +
+                f"Fichiers générés:\n" + "\n".join(files_generated)
+            )
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la finalisation:\n{e}")
 
-        <div class="footer">
-            <p>Rapport généré par STYX Analyse • {datetime.now().year}</p>
-        </div>
-    </body>
-    </html>"""
+    def report_graph_jobs(self, graphs_dir):
+        """Tâches de rendu des graphiques affichés (type et zoom actuels) pour le rapport"""
+        jobs = []
+        for i, graph in enumerate(self.graphs):
+            if graph.current_type not in GRAPH_STYLES:
+                continue
+            jobs.append({
+                "csv_path": self.current_file,
+                "start": self.selection.start,
+                "end": self.selection.end,
+                "graph_type": graph.current_type,
+                "path": os.path.join(graphs_dir, f"graphique_{i+1}.png"),
+                "xlim": tuple(graph.ax.get_xlim()),
+            })
+        return jobs
+
+    def report_map_job(self, report_dir, speed_colours=False):
+        """Arguments de render_static_map pour la carte 1200x800 du rapport (None sans GPS)"""
+        if self.selection is None or "Lat" not in self.selection.columns or "Lon" not in self.selection.columns:
+            return None
+        # Copies : la sélection peut changer pendant le rendu en arrière-plan
+        speeds = self.selection["Vitesse"] if speed_colours and "Vitesse" in self.selection.columns else None
+        return {
+            "latitudes": np.array(self.selection["Lat"], dtype=np.float64),
+            "longitudes": np.array(self.selection["Lon"], dtype=np.float64),
+            "path": os.path.join(report_dir, "carte_gps.png"),
+            "speeds": None if speeds is None else np.array(speeds, dtype=np.float64),
+        }
+
+    def generate_html_report_hd(self, report_dir, report_name, include_base_file):
+        """Génère le rapport HTML"""
+        try:
+            # Récupérer les statistiques
+            stats = self.get_report_statistics()
+            
+            # Récupérer les commentaires
+            comments = self.comment_text.toPlainText() or "Aucun commentaire"
+
+            graphs_dir = os.path.join(report_dir, "graphiques")
+            graph_files = [f"graphique_{i+1}.png" for i in range(len(self.graphs))
+                           if os.path.exists(os.path.join(graphs_dir, f"graphique_{i+1}.png"))]
+
+            html_content = build_report_html(
+                report_name, stats, len(self.selection), graph_files, comments, include_base_file,
+                os.path.basename(self.current_file) if self.current_file else None
+            )
             
             # Sauvegarder le fichier HTML
             html_path = os.path.join(report_dir, f"{report_name}.html")
@@ -2957,39 +5247,7 @@ class AnalysisPage(QWidget):
 
     def get_report_statistics(self):
         """Récupère les statistiques pour le rapport"""
-        stats = {}
-        
-        if "Distance_GPS" in self.df_filtered.columns:
-            dist_start = self.df_filtered["Distance_GPS"].iloc[0]
-            dist_end = self.df_filtered["Distance_GPS"].iloc[-1]
-            stats['distance'] = dist_end - dist_start
-            stats['distance_type'] = "GPS"
-        elif "Distance" in self.df_filtered.columns:
-            dist_start = self.df_filtered["Distance"].iloc[0]
-            dist_end = self.df_filtered["Distance"].iloc[-1]
-            stats['distance'] = dist_end - dist_start
-            stats['distance_type'] = "capteur"
-        else:
-            stats['distance'] = 0
-            stats['distance_type'] = "N/A"
-        
-        temps_start = self.df_filtered["Temps"].iloc[0] if "Temps" in self.df_filtered.columns else 0
-        temps_end = self.df_filtered["Temps"].iloc[-1] if "Temps" in self.df_filtered.columns else 0
-        stats['duree'] = (temps_end - temps_start) / 60
-        stats['temps_debut'] = temps_start
-        stats['temps_fin'] = temps_end
-        
-        stats['vitesse_moy'] = self.df_filtered["Vitesse"].mean() if "Vitesse" in self.df_filtered.columns else 0
-        stats['vitesse_max'] = self.df_filtered["Vitesse"].max() if "Vitesse" in self.df_filtered.columns else 0
-        
-        alt_max = self.df_filtered["Alt"].max() if "Alt" in self.df_filtered.columns else 0
-        alt_min = self.df_filtered["Alt"].min() if "Alt" in self.df_filtered.columns else 0
-        stats['denivele'] = alt_max - alt_min
-        
-        stats['wh_charged'] = self.df_filtered["WHCharged"].sum() if "WHCharged" in self.df_filtered.columns else 0
-        stats['wh_discharged'] = self.df_filtered["WHDischarged"].sum() if "WHDischarged" in self.df_filtered.columns else 0
-        
-        return stats
+        return self.stats_index.summary(self.selection.start, self.selection.end)
 
     def load_comments(self):
         if not self.current_file or not os.path.exists(self.comments_file):
@@ -3049,6 +5307,15 @@ class MainWindow(QWidget):
 
 # --- Point d'entrée ---
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "--rapport":
+        sys.exit(run_report_cli(sys.argv[2:]))
+    if not QT_AVAILABLE:
+        sys.exit(f"Interface indisponible, PyQt6 ne peut pas être chargé: {QT_IMPORT_ERROR}")
+    if len(sys.argv) > 1 and sys.argv[1] == "--surveiller":
+        sys.exit(run_inbox_cli(sys.argv[2:]))
+    if QWebEngineView is None:
+        sys.exit(f"Interface indisponible, QtWebEngine ne peut pas être chargé: {WEB_ENGINE_IMPORT_ERROR}")
     app = QApplication(sys.argv)
     window = MainWindow()
     window.showMaximized()